@@ -0,0 +1,59 @@
+"""
+Cold start import time of the bolsa modules, measured in fresh
+interpreters with `python -X importtime`.
+
+    python -m benchmarks.import_time [--runs N] [--budget-ms MS] [modules]
+
+Exits with status 1 when the median import time of a module is above
+`--budget-ms`.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ('bolsa', 'bolsa.backend', 'bolsa.pool')
+
+
+def import_time_us(module):
+    """ Cumulative import time of `module`, in microseconds. """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stderr
+
+    for line in stderr.splitlines():
+        _, _, cumulative_us, name = (
+            [part.strip() for part in line.replace(':', '|', 1).split('|')]
+        )
+        if name == module:
+            return int(cumulative_us)
+
+    raise ValueError(f'{module} import time not found')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float)
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    print(f'{"module":<20} {"median ms":>10} {"max ms":>10}')
+    for module in args.modules:
+        timings = [
+            import_time_us(module) / 1000 for _ in range(args.runs)
+        ]
+        median = statistics.median(timings)
+        print(f'{module:<20} {median:>10.1f} {max(timings):>10.1f}')
+        if args.budget_ms is not None and median > args.budget_ms:
+            over_budget = True
+
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+End to end load test of `B3AsyncBackendPool` against the local fake CEI
+server, entirely offline.
+
+    python -m benchmarks.load [--users N] [--rows N] [--latency S] ...
+
+Server latencies are measured from the request arrival to the response,
+so they include the injected latency. Client latencies per endpoint come
+from the bolsa instrumentation and also include queueing, retries and the
+body download. Memory is the peak RSS of the process, which runs both the
+server and the clients.
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import sys
+import time
+
+from bolsa.instrumentation import InMemoryExporter, Instrumentation
+from bolsa.pool import B3AsyncBackendPool
+from bolsa.resilience import AdaptiveConcurrencyLimiter, RetryPolicy
+from bolsa.testing.fake_cei import FakeCEIServer
+
+ENDPOINTS = (
+    'login_page', 'login', 'brokers', 'broker_accounts', 'assets_extract'
+)
+
+
+def percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else 0
+
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def peak_rss_mib():
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB and macOS bytes.
+    return peak_rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+async def run(args):
+    server = FakeCEIServer(
+        rows=args.rows,
+        latency=(args.latency, args.latency_max or args.latency),
+        error_rate=args.error_rate,
+        max_concurrency=args.server_max_concurrency,
+        retry_after=0,
+        session_ttl=args.session_ttl
+    )
+    base_url = await server.start()
+    exporter = InMemoryExporter()
+    pool = B3AsyncBackendPool(
+        max_concurrency=args.max_concurrency,
+        max_concurrency_per_user=args.max_concurrency_per_user,
+        base_url=base_url,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts),
+        concurrency_limiter=(
+            AdaptiveConcurrencyLimiter() if args.adaptive else None
+        ),
+        instrumentation=Instrumentation([exporter])
+    )
+
+    started_at = time.perf_counter()
+    try:
+        results = await pool.get_users_assets_extract(
+            [(f'user-{index}', 'password') for index in range(args.users)]
+        )
+    finally:
+        elapsed = time.perf_counter() - started_at
+        await pool.close()
+        await server.close()
+
+    failed_users = sum(1 for result in results if result.error)
+    requests = sum(server.statuses.values())
+    timings = [timing * 1000 for timing in server.timings]
+
+    print(f'users:        {args.users} ({failed_users} failed)')
+    print(f'requests:     {requests} {dict(sorted(server.statuses.items()))}')
+    print(f'elapsed:      {elapsed:.2f}s')
+    print(f'requests/s:   {requests / elapsed:.1f}')
+    print(f'latency p50:  {percentile(timings, 50):.1f}ms')
+    print(f'latency p99:  {percentile(timings, 99):.1f}ms')
+    print(f'retries:      {exporter.get_counter("bolsa_retries_total"):.0f}')
+    print(f'peak rss:     {peak_rss_mib():.1f} MiB')
+    print_client_metrics(exporter)
+
+
+def print_client_metrics(exporter):
+    print()
+    print(f'{"client":<22} {"count":>6} {"p50 ms":>8} {"p99 ms":>8}')
+    metrics = [
+        (endpoint, 'bolsa_request_seconds', {'endpoint': endpoint})
+        for endpoint in ENDPOINTS
+    ] + [
+        ('parse', 'bolsa_parse_seconds', {}),
+        ('login (total)', 'bolsa_login_seconds', {}),
+    ]
+    for label, name, labels in metrics:
+        samples = exporter.get_samples(name, **labels)
+        if not samples:
+            continue
+
+        print(
+            f'{label:<22} {len(samples):>6} '
+            f'{exporter.percentile(name, 50, **labels) * 1000:>8.1f} '
+            f'{exporter.percentile(name, 99, **labels) * 1000:>8.1f}'
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--latency-max', type=float)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--server-max-concurrency', type=int)
+    parser.add_argument('--session-ttl', type=float)
+    parser.add_argument('--max-concurrency', type=int, default=30)
+    parser.add_argument('--max-concurrency-per-user', type=int, default=4)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--adaptive', action='store_true')
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
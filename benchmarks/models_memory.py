@@ -0,0 +1,65 @@
+"""
+Per row memory of the asset extract models.
+
+    python -m benchmarks.models_memory [rows]
+"""
+import gc
+import sys
+import tracemalloc
+
+from bolsa.decoders import CompactRowDecoder, RowDecoder
+
+TICKERS = [f'TICK{index}' for index in range(500)]
+
+
+def create_rows(rows_count):
+    # Each cell is a fresh string, like the ones the parser produces.
+    return [
+        [
+            f'{1 + index % 28:02d}/{1 + index % 12:02d}/2020',
+            'C' if index % 3 else 'V',
+            'Mercado a Vista',
+            '',
+            f'{TICKERS[index % len(TICKERS)]} '[:-1],
+            f'{TICKERS[index % len(TICKERS)]}      ON      NM',
+            str(100 + index % 10),
+            '21,09',
+            '2.109,00',
+            '1',
+        ]
+        for index in range(rows_count)
+    ]
+
+
+def measure(row_decoder, rows_count):
+    gc.collect()
+    tracemalloc.start()
+    rows = create_rows(rows_count)
+    assets_extract = row_decoder.decode_rows(rows)
+    del rows
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del assets_extract
+
+    return current, peak
+
+
+def main():
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f'{rows_count} rows')
+    print(f'{"decoder":<28}{"bytes/row":>12}{"retained MiB":>14}')
+    for name, row_decoder in (
+        ('RowDecoder', RowDecoder()),
+        ('CompactRowDecoder', CompactRowDecoder()),
+        ('CompactRowDecoder(frozen)', CompactRowDecoder(frozen=True)),
+    ):
+        current, _ = measure(row_decoder, rows_count)
+        print(
+            f'{name:<28}{current / rows_count:>12.1f}'
+            f'{current / 2 ** 20:>14.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Time and peak memory of the response parsers and models, on the
+anonymized CEI pages of `bolsa.testing.pages`.
+
+    python -m benchmarks.parsers [--extractor streaming|beautifulsoup]
+                                 [--rows 10 100 ...] [--repeat N]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from bolsa.decoders import DEFAULT_ROW_DECODER
+from bolsa.models import BrokerAssetExtract
+from bolsa.parsers import BeautifulSoupHTMLExtractor, StreamingHTMLExtractor
+from bolsa.responses import (
+    GetBrokerAccountAssetExtractResponse,
+    GetBrokerAccountResponse,
+    GetBrokersResponse
+)
+from bolsa.testing import pages
+
+EXTRACTORS = {
+    'streaming': StreamingHTMLExtractor,
+    'beautifulsoup': BeautifulSoupHTMLExtractor,
+}
+DEFAULT_ROWS = (10, 100, 1000, 10000, 50000)
+ENCODING = 'utf-8'
+
+
+def create_from_response_fields(rows):
+    return [
+        BrokerAssetExtract.create_from_response_fields(
+            operation_date=operation_date,
+            action=action,
+            market_type=market_type,
+            raw_negotiation_code=raw_negotiation_code,
+            asset_specification=asset_specification,
+            unit_amount=unit_amount,
+            unit_price=unit_price,
+            total_price=total_price,
+            quotation_factor=quotation_factor
+        )
+        for operation_date, action, market_type, _, raw_negotiation_code, asset_specification, unit_amount, unit_price, total_price, quotation_factor in rows  # NOQA
+    ]
+
+
+def measure(function, *args, repeat=5):
+    """ Return the best time in seconds and the peak memory in bytes. """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak
+
+
+def create_cases(html_extractor, rows_counts):
+    yield (
+        'GetBrokersResponse',
+        GetBrokersResponse._parse_get_brokers,
+        (pages.brokers_page(), ENCODING, html_extractor)
+    )
+    yield (
+        'GetBrokerAccountResponse',
+        GetBrokerAccountResponse._parse_get_accounts,
+        (pages.accounts_postback(), ENCODING, html_extractor)
+    )
+    for rows_count in rows_counts:
+        body = pages.assets_postback(rows_count)
+        yield (
+            f'GetBrokerAccountAssetExtractResponse[{rows_count}]',
+            GetBrokerAccountAssetExtractResponse._parse_get_assets_extract,
+            (body, ENCODING, html_extractor, DEFAULT_ROW_DECODER)
+        )
+        yield (
+            f'GetBrokerAccountAssetExtractResponse columnar[{rows_count}]',
+            GetBrokerAccountAssetExtractResponse._parse_get_assets_extract_batch,  # NOQA
+            (body, ENCODING, html_extractor)
+        )
+        yield (
+            f'create_from_response_fields[{rows_count}]',
+            create_from_response_fields,
+            (pages.assets_rows(rows_count),)
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--extractor', choices=EXTRACTORS, default='streaming'
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    html_extractor = EXTRACTORS[args.extractor]()
+    print(f'extractor: {args.extractor}')
+    print(f'{"case":<52} {"best ms":>10} {"peak MiB":>10}')
+    for name, function, function_args in create_cases(
+        html_extractor, args.rows
+    ):
+        best, peak = measure(function, *function_args, repeat=args.repeat)
+        print(f'{name:<52} {best * 1000:>10.2f} {peak / 2 ** 20:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,30 @@
-from bolsa.backend import B3AsyncBackend  # NOQA
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bolsa.backend import B3AsyncBackend  # NOQA
+    from bolsa.pool import B3AsyncBackendPool  # NOQA
+
+# Submodules are only imported on first access, so `import bolsa` does not
+# load aiohttp or the parsers (PEP 562).
+_LAZY_ATTRIBUTES = {
+    'B3AsyncBackend': 'bolsa.backend',
+    'B3AsyncBackendPool': 'bolsa.pool',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from bolsa.exceptions import AsyncPostbackParseException
+
+UPDATE_PANEL_TYPE = 'updatePanel'
+HIDDEN_FIELD_TYPE = 'hiddenField'
+SEPARATOR = '|'
+
+
+@dataclass
+class AsyncPostbackDelta():
+    """
+    ASP.NET partial rendering response, made of `length|type|id|content|`
+    entries.
+    """
+
+    panels: Dict[str, str] = field(default_factory=dict)
+    hidden_fields: Dict[str, str] = field(default_factory=dict)
+    entries: List[Tuple[str, str, str]] = field(default_factory=list)
+
+    def panels_containing(self, element_ids):
+        """ Return the panels html that mention any of `element_ids`. """
+        return [
+            panel
+            for panel in self.panels.values()
+            if any(element_id in panel for element_id in element_ids)
+        ]
+
+
+def is_async_postback(body):
+    """ Check if a response body looks like an async postback delta. """
+    head = body[:16]
+    if isinstance(head, bytes):
+        head = head.decode('ascii', errors='replace')
+
+    length, separator, _ = head.partition(SEPARATOR)
+    return bool(separator) and length.isdigit()
+
+
+def parse_async_postback(text):
+    """ Split an async postback delta in a single pass over `text`. """
+    delta = AsyncPostbackDelta()
+    position = 0
+    text_length = len(text)
+
+    while position < text_length:
+        length_end = text.find(SEPARATOR, position)
+        type_end = text.find(SEPARATOR, length_end + 1)
+        id_end = text.find(SEPARATOR, type_end + 1)
+        if -1 in (length_end, type_end, id_end):
+            raise AsyncPostbackParseException(
+                f'Entrada incompleta na posição {position}'
+            )
+
+        try:
+            length = int(text[position:length_end])
+        except ValueError:
+            raise AsyncPostbackParseException(
+                f'Tamanho inválido na posição {position}'
+            )
+
+        entry_type = text[length_end + 1:type_end]
+        entry_id = text[type_end + 1:id_end]
+        content_end = id_end + 1 + length
+        if text[content_end:content_end + 1] != SEPARATOR:
+            raise AsyncPostbackParseException(
+                f'Conteúdo inválido na posição {id_end + 1}'
+            )
+
+        content = text[id_end + 1:content_end]
+        if entry_type == UPDATE_PANEL_TYPE:
+            delta.panels[entry_id] = content
+        elif entry_type == HIDDEN_FIELD_TYPE:
+            delta.hidden_fields[entry_id] = content
+        else:
+            delta.entries.append((entry_type, entry_id, content))
+
+        position = content_end + 1
+
+    return delta
@@ -1,36 +1,79 @@
 import asyncio
 import logging
+from contextlib import AsyncExitStack, asynccontextmanager
 from functools import cached_property
 
 import aiohttp
 
 from bolsa.connector import B3HttpClientConnector
+from bolsa.converters import parse_cei_date
 from bolsa.http_client import B3HttpClient
+from bolsa.models import Watermark
 from bolsa.responses import (
     GetBrokerAccountAssetExtractResponse,
     GetBrokerAccountResponse,
     GetBrokersResponse
 )
+from bolsa.watermarks import merge_assets_extract, sync_start_date
 
 logger = logging.getLogger(__name__)
 
-POOL_CONNECTOR = B3HttpClientConnector()
-
 
 class B3AsyncBackend():
 
-    def __init__(self, username, password, captcha_service):
-        self._connector = POOL_CONNECTOR.get_connector()
+    def __init__(
+        self,
+        username,
+        password,
+        captcha_service,
+        request_limiters=None,
+        session_store=None,
+        html_extractor=None,
+        parse_executor=None,
+        max_concurrency_per_broker=None,
+        columnar=False,
+        row_decoder=None,
+        retry_policy=None,
+        concurrency_limiter=None,
+        discovery_cache=None,
+        connector_manager=None,
+        base_url=None,
+        instrumentation=None
+    ):
+        self.connector_manager = (
+            connector_manager or B3HttpClientConnector.create()
+        )
         self.username = username
         self.password = password
         self.captcha_service = captcha_service
+        self._request_limiters = request_limiters or []
+        self.session_store = session_store
+        self.html_extractor = html_extractor
+        self.parse_executor = parse_executor
+        self.max_concurrency_per_broker = max_concurrency_per_broker
+        self.columnar = columnar
+        self.row_decoder = row_decoder
+        self.retry_policy = retry_policy
+        self.concurrency_limiter = concurrency_limiter
+        self.discovery_cache = discovery_cache
+        self.base_url = base_url
+        self.instrumentation = instrumentation
+
+    @cached_property
+    def _connector(self):
+        return self.connector_manager.acquire()
 
     @cached_property
     def _session(self):
         logger.info(f'Creating session for username: {self.username}')
+        trace_configs = None
+        if self.instrumentation is not None:
+            trace_configs = [self.instrumentation.trace_config()]
+
         return aiohttp.ClientSession(
             connector=self._connector,
-            connector_owner=False
+            connector_owner=False,
+            trace_configs=trace_configs
         )
 
     @cached_property
@@ -39,31 +82,68 @@ class B3AsyncBackend():
             username=self.username,
             password=self.password,
             session=self._session,
-            captcha_service=self.captcha_service
+            captcha_service=self.captcha_service,
+            session_store=self.session_store,
+            html_extractor=self.html_extractor,
+            retry_policy=self.retry_policy,
+            concurrency_limiter=self.concurrency_limiter,
+            base_url=self.base_url,
+            instrumentation=self.instrumentation
         )
 
+    @asynccontextmanager
+    async def _request_limit(self):
+        """ Hold every request limiter, in order, while a request runs. """
+        async with AsyncExitStack() as stack:
+            for limiter in self._request_limiters:
+                await stack.enter_async_context(limiter)
+            yield
+
     async def session_close(self):
         await self._session.close()
 
     async def connection_close(self):
-        await self._connector.close()
+        """ Release the shared connector, closed by its last user. """
+        connector = self.__dict__.pop('_connector', None)
+        if connector is not None:
+            await self.connector_manager.release(connector)
 
     async def get_brokers(self):
-        response = await self._http_client.get_brokers()
-        response_class = GetBrokersResponse(response)
+        async with self._request_limit():
+            response = await self._http_client.get_brokers()
+            response_class = GetBrokersResponse(
+                response=response,
+                html_extractor=self.html_extractor,
+                parse_executor=self.parse_executor,
+                form_state=self._http_client.form_state,
+                instrumentation=self.instrumentation
+            )
 
-        return await response_class.data()
+            return await response_class.data()
 
     async def get_broker_accounts(self, broker):
-        response = await self._http_client.get_broker_accounts(broker)
-        response_class = GetBrokerAccountResponse(
-            response=response,
-            broker=broker
-        )
+        async with self._request_limit():
+            response = await self._http_client.get_broker_accounts(broker)
+            response_class = GetBrokerAccountResponse(
+                response=response,
+                broker=broker,
+                html_extractor=self.html_extractor,
+                parse_executor=self.parse_executor,
+                form_state=self._http_client.form_state,
+                instrumentation=self.instrumentation
+            )
 
-        return await response_class.data()
+            return await response_class.data()
 
     async def get_brokers_with_accounts(self):
+        if self.discovery_cache is not None:
+            brokers = self.discovery_cache.get(self.username)
+            if brokers is not None:
+                logger.info(
+                    f'Using cached brokers for username: {self.username}'
+                )
+                return brokers
+
         brokers = await self.get_brokers()
         brokers_account_routine = [
             asyncio.create_task(
@@ -72,42 +152,289 @@ class B3AsyncBackend():
             for broker in brokers
         ]
 
-        return await asyncio.gather(*brokers_account_routine)
+        brokers = await asyncio.gather(*brokers_account_routine)
+        if self.discovery_cache is not None:
+            self.discovery_cache.set(self.username, brokers)
+
+        return brokers
 
     async def get_broker_account_portfolio_assets_extract(
         self,
         account_id,
         broker_value,
         broker_parse_extra_data,
-        account_parse_extra_data
+        account_parse_extra_data,
+        start_date=None
     ):
-        response = await self._http_client.get_broker_account_portfolio_assets_extract(  # NOQA
-            account_id,
-            broker_value,
-            broker_parse_extra_data,
-            account_parse_extra_data
-        )
-        response_class = GetBrokerAccountAssetExtractResponse(
-            response=response,
-            broker_value=broker_value
-        )
+        async with self._request_limit():
+            response = await self._http_client.get_broker_account_portfolio_assets_extract(  # NOQA
+                account_id,
+                broker_value,
+                broker_parse_extra_data,
+                account_parse_extra_data,
+                start_date=start_date
+            )
+            response_class = GetBrokerAccountAssetExtractResponse(
+                response=response,
+                broker_value=broker_value,
+                html_extractor=self.html_extractor,
+                parse_executor=self.parse_executor,
+                columnar=self.columnar,
+                row_decoder=self.row_decoder,
+                instrumentation=self.instrumentation
+            )
 
-        return await response_class.data()
+            return await response_class.data()
+
+    async def _get_broker_portfolio_assets_extract(self, broker):
+        return await self.get_broker_account_portfolio_assets_extract(
+            account_id=broker.accounts[0].id,
+            broker_value=broker.value,
+            broker_parse_extra_data=broker.parse_extra_data,
+            account_parse_extra_data=broker.accounts[0].parse_extra_data
+        )
 
     async def get_brokers_account_portfolio_assets_extract(self, brokers):
+        """
+        Return the assets extract of the first account of every broker.
+        Use `get_brokers_accounts_portfolio_assets_extract` for all of
+        them.
+        """
         brokers_account_assets_extract_routine = [
             asyncio.create_task(
-                self.get_broker_account_portfolio_assets_extract(
-                    account_id=broker.accounts[0].id,
-                    broker_value=broker.value,
-                    broker_parse_extra_data=broker.parse_extra_data,
-                    account_parse_extra_data=(
-                        broker.accounts[0].parse_extra_data
-                    )
-                )
+                self._get_broker_portfolio_assets_extract(broker)
             )
             for broker in brokers
             if len(broker.accounts) > 0
         ]
 
         return await asyncio.gather(*brokers_account_assets_extract_routine)
+
+    async def _get_account_portfolio_assets_extract(
+        self,
+        broker,
+        account,
+        broker_limiter,
+        start_date=None
+    ):
+        async with broker_limiter:
+            return await self.get_broker_account_portfolio_assets_extract(
+                account_id=account.id,
+                broker_value=broker.value,
+                broker_parse_extra_data=broker.parse_extra_data,
+                account_parse_extra_data=account.parse_extra_data,
+                start_date=start_date
+            )
+
+    async def _sync_account_portfolio_assets_extract(
+        self,
+        broker,
+        account,
+        broker_limiter,
+        watermark_store,
+        previous_assets_extract
+    ):
+        watermark = await watermark_store.get(
+            self.username,
+            broker.value,
+            account.id
+        )
+        start_date = sync_start_date(
+            broker.parse_extra_data.start_date,
+            watermark
+        )
+        logger.info(
+            f'B3AsyncBackend syncing account - username: {self.username} '
+            f'broker_value: {broker.value} account_id: {account.id} '
+            f'start_date: {start_date}'
+        )
+
+        assets_extract = await self._get_account_portfolio_assets_extract(
+            broker,
+            account,
+            broker_limiter,
+            start_date=start_date
+        )
+        assets_extract = merge_assets_extract(
+            previous_assets_extract.get((broker.value, account.id), []),
+            assets_extract,
+            start_date
+        )
+
+        return assets_extract, Watermark(
+            username=self.username,
+            broker_value=broker.value,
+            account_id=account.id,
+            synced_date=parse_cei_date(broker.parse_extra_data.end_date)
+        )
+
+    def _accounts_portfolio_assets_extract_routines(
+        self,
+        brokers,
+        max_concurrency_per_broker,
+        account_routine=None
+    ):
+        account_routine = (
+            account_routine or self._get_account_portfolio_assets_extract
+        )
+        max_concurrency_per_broker = (
+            max_concurrency_per_broker or self.max_concurrency_per_broker
+        )
+        routines = []
+        for broker in brokers:
+            broker_limiter = asyncio.Semaphore(
+                max_concurrency_per_broker or max(len(broker.accounts), 1)
+            )
+            routines.extend(
+                (
+                    (broker, account),
+                    account_routine(broker, account, broker_limiter)
+                )
+                for account in broker.accounts
+            )
+
+        return routines
+
+    async def get_brokers_accounts_portfolio_assets_extract(
+        self,
+        brokers,
+        max_concurrency_per_broker=None
+    ):
+        """
+        Return `(broker, account, assets_extract)` for every account of
+        every broker, running at most `max_concurrency_per_broker` requests
+        of the same broker at once.
+        """
+        routines = self._accounts_portfolio_assets_extract_routines(
+            brokers,
+            max_concurrency_per_broker
+        )
+
+        return await self._gather_accounts_routines(routines)
+
+    async def _gather_accounts_routines(self, routines):
+        accounts_assets_extract = await asyncio.gather(*[
+            asyncio.create_task(routine) for _, routine in routines
+        ])
+
+        return [
+            (broker, account, assets_extract)
+            for ((broker, account), _), assets_extract in zip(
+                routines,
+                accounts_assets_extract
+            )
+        ]
+
+    async def sync_accounts_portfolio_assets_extract(
+        self,
+        brokers,
+        watermark_store,
+        previous_assets_extract=None,
+        max_concurrency_per_broker=None
+    ):
+        """
+        Fetch every account only from its last synced date onwards.
+
+        `previous_assets_extract` maps `(broker_value, account_id)` to the
+        rows of the previous sync, which are merged with the new ones.
+        Return `(broker, account, assets_extract, watermark)` for every
+        account. The watermark store is only read here: once the rows are
+        persisted, save the new watermarks with `watermark_store.commit`.
+        """
+        previous_assets_extract = previous_assets_extract or {}
+
+        def sync_routine(broker, account, broker_limiter):
+            return self._sync_account_portfolio_assets_extract(
+                broker,
+                account,
+                broker_limiter,
+                watermark_store,
+                previous_assets_extract
+            )
+
+        routines = self._accounts_portfolio_assets_extract_routines(
+            brokers,
+            max_concurrency_per_broker,
+            account_routine=sync_routine
+        )
+
+        return [
+            (broker, account, assets_extract, watermark)
+            for broker, account, (assets_extract, watermark) in (
+                await self._gather_accounts_routines(routines)
+            )
+        ]
+
+    async def _iter_as_completed(self, routines, max_queue_size):
+        """
+        Yield `(key, result)` of each `(key, coroutine)` in completion
+        order.
+
+        Finished routines wait on a queue of `max_queue_size` results until
+        the consumer takes them. Closing the iterator early cancels the
+        routines still running.
+        """
+        queue = asyncio.Queue(maxsize=max_queue_size)
+
+        async def produce(key, routine):
+            try:
+                result = await routine
+            except Exception as error:
+                await queue.put((key, None, error))
+            else:
+                await queue.put((key, result, None))
+
+        tasks = [
+            asyncio.create_task(produce(key, routine))
+            for key, routine in routines
+        ]
+
+        try:
+            for _ in range(len(tasks)):
+                key, result, error = await queue.get()
+                if error:
+                    raise error
+
+                yield key, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_portfolio_assets_extract(self, brokers, max_queue_size=1):
+        """
+        Yield `(broker, assets_extract)` of the first account of each
+        broker as soon as it finishes.
+        """
+        routines = [
+            (broker, self._get_broker_portfolio_assets_extract(broker))
+            for broker in brokers
+            if len(broker.accounts) > 0
+        ]
+
+        async for broker, assets_extract in self._iter_as_completed(
+            routines,
+            max_queue_size
+        ):
+            yield broker, assets_extract
+
+    async def iter_accounts_portfolio_assets_extract(
+        self,
+        brokers,
+        max_queue_size=1,
+        max_concurrency_per_broker=None
+    ):
+        """
+        Yield `(broker, account, assets_extract)` for every account of
+        every broker as soon as it finishes.
+        """
+        routines = self._accounts_portfolio_assets_extract_routines(
+            brokers,
+            max_concurrency_per_broker
+        )
+
+        async for (broker, account), assets_extract in (
+            self._iter_as_completed(routines, max_queue_size)
+        ):
+            yield broker, account, assets_extract
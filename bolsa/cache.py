@@ -0,0 +1,165 @@
+import copy
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+
+from bolsa.models import (
+    Broker,
+    BrokerAccount,
+    BrokerAccountParseExtraData,
+    BrokerParseExtraData
+)
+from bolsa.session_store import username_key
+
+DEFAULT_TTL = 12 * 60 * 60
+
+
+def dump_brokers(brokers):
+    return [asdict(broker) for broker in brokers]
+
+
+def load_brokers(brokers_data):
+    return [
+        Broker(
+            value=broker_data['value'],
+            name=broker_data['name'],
+            parse_extra_data=BrokerParseExtraData(
+                **broker_data['parse_extra_data']
+            ),
+            accounts=[
+                BrokerAccount(
+                    id=account_data['id'],
+                    parse_extra_data=BrokerAccountParseExtraData(
+                        **account_data['parse_extra_data']
+                    )
+                )
+                for account_data in broker_data['accounts']
+            ]
+        )
+        for broker_data in brokers_data
+    ]
+
+
+class DiscoveryCache():
+    """
+    Brokers and accounts of each username, as returned by
+    `get_brokers_with_accounts`.
+
+    Entries expire after `ttl` seconds, or the ttl given to `set`, and the
+    least recently used ones are evicted past `max_entries` or, with
+    `max_bytes`, once the entries take more than that many bytes as JSON,
+    an estimate of the memory they hold. With a `path`
+    the entries are persisted to a JSON file. The brokers carry the dates
+    and form state of the page they came from, so keep the ttl short
+    enough for the extract end date to still be useful.
+    """
+
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        max_entries=1024,
+        max_bytes=None,
+        path=None
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self.size = 0
+        if path:
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, username):
+        """ Return a copy of the cached brokers of `username` or None. """
+        key = username_key(username)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, brokers = entry
+        if expires_at <= time.time():
+            self.invalidate(username)
+            return None
+
+        self._entries.move_to_end(key)
+
+        return copy.deepcopy(brokers)
+
+    def set(self, username, brokers, ttl=None):
+        key = username_key(username)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._add(key, expires_at, copy.deepcopy(brokers))
+        self._evict()
+
+        self._save()
+
+    @staticmethod
+    def _entry_size(brokers):
+        return len(json.dumps(dump_brokers(brokers)))
+
+    def _add(self, key, expires_at, brokers):
+        self._remove(key)
+        self._entries[key] = (expires_at, brokers)
+        self._sizes[key] = self._entry_size(brokers)
+        self.size += self._sizes[key]
+
+    def _remove(self, key):
+        if self._entries.pop(key, None) is None:
+            return False
+
+        self.size -= self._sizes.pop(key)
+        return True
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, username=None):
+        """ Forget `username`, or every username when none is given. """
+        if username is None:
+            self._entries.clear()
+            self._sizes.clear()
+            self.size = 0
+        elif not self._remove(username_key(username)):
+            return
+
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.path) as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+
+        now = time.time()
+        for key, expires_at, brokers_data in entries:
+            if expires_at > now:
+                self._add(key, expires_at, load_brokers(brokers_data))
+        self._evict()
+
+    def _save(self):
+        if not self.path:
+            return
+
+        entries = [
+            (key, expires_at, dump_brokers(brokers))
+            for key, (expires_at, brokers) in self._entries.items()
+        ]
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path))
+        )
+        with os.fdopen(file_descriptor, 'w') as cache_file:
+            json.dump(entries, cache_file)
+
+        os.replace(temp_path, self.path)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+
+import aiohttp
+
+from bolsa.captcha.CaptchaResolverServiceInterface import (
+    CaptchaResolverServiceInterface
+)
+from bolsa.captcha.exceptions.CaptchaResolverException import (
+    CaptchaResolverException
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTwoCaptchaResolverService(CaptchaResolverServiceInterface):
+    """
+    Solve reCAPTCHAs through the 2captcha HTTP API without blocking the
+    event loop: the task is submitted to `in.php` and `res.php` is polled
+    until the token is ready or `timeout` seconds have passed.
+    """
+
+    BASE_URL = 'https://2captcha.com'
+    NOT_READY = 'CAPCHA_NOT_READY'
+
+    def __init__(
+        self,
+        credential,
+        base_url=BASE_URL,
+        polling_interval=5,
+        initial_delay=15,
+        timeout=180,
+        session=None
+    ):
+        self._credential = credential
+        self.base_url = base_url.rstrip('/')
+        self.polling_interval = polling_interval
+        self.initial_delay = initial_delay
+        self.timeout = timeout
+        self.session = session
+
+    async def resolve(self, site_key, url):
+        logger.info('Resolving captcha.')
+        try:
+            if self.session:
+                solvedcaptcha = await asyncio.wait_for(
+                    self._resolve(self.session, site_key, url),
+                    self.timeout
+                )
+            else:
+                async with aiohttp.ClientSession() as session:
+                    solvedcaptcha = await asyncio.wait_for(
+                        self._resolve(session, site_key, url),
+                        self.timeout
+                    )
+        except asyncio.TimeoutError:
+            raise CaptchaResolverException(
+                f'Tempo esgotado ao tentar resolver captcha: {self.timeout}s'
+            )
+        except aiohttp.ClientError as error:
+            raise CaptchaResolverException(
+                f'Erro ao tentar resolver captcha: {error!r}'
+            )
+
+        logger.info('Captcha resolved.')
+
+        return solvedcaptcha
+
+    async def _resolve(self, session, site_key, url):
+        captcha_id = await self._call(session, 'in.php', {
+            'method': 'userrecaptcha',
+            'googlekey': site_key,
+            'pageurl': url,
+        })
+
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            result = await self._call(session, 'res.php', {
+                'action': 'get',
+                'id': captcha_id,
+            })
+            if result != self.NOT_READY:
+                return result
+
+            await asyncio.sleep(self.polling_interval)
+
+    async def _call(self, session, path, params):
+        params = {'key': self._credential, 'json': 1, **params}
+        async with session.get(
+            f'{self.base_url}/{path}',
+            params=params
+        ) as response:
+            data = await response.json(content_type=None)
+
+        if data.get('status') == 1 or data.get('request') == self.NOT_READY:
+            return data['request']
+
+        raise CaptchaResolverException(
+            f'Erro ao tentar resolver captcha: {data.get("request")}'
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from collections import deque
+
+from bolsa.captcha.CaptchaResolverServiceInterface import (
+    CaptchaResolverServiceInterface
+)
+
+logger = logging.getLogger(__name__)
+
+# reCAPTCHA tokens are valid for two minutes after being solved.
+DEFAULT_TOKEN_TTL = 100
+
+
+class _TokenPool():
+
+    def __init__(self):
+        self.tokens = deque()
+        self.waiters = deque()
+        self.solving = 0
+
+    def discard_expired(self, now):
+        while self.tokens and self.tokens[0][0] <= now:
+            self.tokens.popleft()
+
+    def pop_token(self, now):
+        self.discard_expired(now)
+        if not self.tokens:
+            return None
+
+        _, token = self.tokens.popleft()
+        return token
+
+    def pop_waiter(self):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                return waiter
+
+        return None
+
+    def missing(self, depth, now):
+        self.discard_expired(now)
+        waiters = sum(1 for waiter in self.waiters if not waiter.done())
+        return depth + waiters - len(self.tokens) - self.solving
+
+
+class PrefetchCaptchaResolverService(CaptchaResolverServiceInterface):
+    """
+    Keep up to `depth` solved tokens per site key, solved ahead of demand
+    by the wrapped `captcha_service`, so a login only waits for a solve
+    when the pool is empty.
+
+    The pool is refilled when tokens are taken or expire, tokens not used
+    within `token_ttl` seconds are discarded.
+    """
+
+    def __init__(
+        self,
+        captcha_service,
+        site_key=None,
+        url=None,
+        depth=2,
+        token_ttl=DEFAULT_TOKEN_TTL
+    ):
+        self.captcha_service = captcha_service
+        self.site_key = site_key
+        self.url = url
+        self.depth = depth
+        self.token_ttl = token_ttl
+        self._pools = {}
+        self._tasks = set()
+        self._timers = set()
+
+    def _pool(self, site_key, url):
+        pool = self._pools.get((site_key, url))
+        if pool is None:
+            pool = self._pools[(site_key, url)] = _TokenPool()
+
+        return pool
+
+    def start(self):
+        """ Start solving tokens for the known `site_key` and `url`. """
+        if not self.site_key or not self.url:
+            raise ValueError('start requires site_key and url')
+
+        self._refill(self.site_key, self.url)
+
+    async def resolve(self, site_key, url):
+        loop = asyncio.get_event_loop()
+        pool = self._pool(site_key, url)
+
+        token = pool.pop_token(loop.time())
+        if token is None:
+            waiter = loop.create_future()
+            pool.waiters.append(waiter)
+
+        self._refill(site_key, url)
+        if token is not None:
+            return token
+
+        return await waiter
+
+    def _refill(self, site_key, url):
+        pool = self._pool(site_key, url)
+        now = asyncio.get_event_loop().time()
+        for _ in range(pool.missing(self.depth, now)):
+            pool.solving += 1
+            task = asyncio.ensure_future(self._solve(pool, site_key, url))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _solve(self, pool, site_key, url):
+        try:
+            token = await self.captcha_service.resolve(site_key, url)
+        except Exception as error:
+            waiter = pool.pop_waiter()
+            if waiter:
+                waiter.set_exception(error)
+            else:
+                logger.warning(f'Captcha prefetch failed: {error!r}')
+            return
+        finally:
+            pool.solving -= 1
+
+        waiter = pool.pop_waiter()
+        if waiter:
+            waiter.set_result(token)
+        else:
+            expires_at = asyncio.get_event_loop().time() + self.token_ttl
+            pool.tokens.append((expires_at, token))
+            self._schedule_refill(expires_at, site_key, url)
+
+    def _schedule_refill(self, when, site_key, url):
+        """ Replace a token once it expires, even if the pool is idle. """
+        def refill():
+            self._timers.discard(timer)
+            self._refill(site_key, url)
+
+        timer = asyncio.get_event_loop().call_at(when, refill)
+        self._timers.add(timer)
+
+    async def close(self):
+        """ Cancel the solves in progress and the scheduled refills. """
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+
+        for task in list(self._tasks):
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,163 @@
+"""
+Export the assets extract of many CEI users to a CSV, JSONL or Parquet
+file.
+
+    bolsa credenciais.csv extrato.parquet [--max-concurrency N] ...
+
+The credentials file has one `username,password` pair per line; blank
+lines and lines starting with `#` are skipped. It is read lazily and the
+rows are written as each account finishes, so the memory use does not
+grow with the number of users.
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import sys
+
+from bolsa.sinks import SINKS
+
+
+def read_credentials(credentials_file):
+    """ Yield the `(username, password)` pairs of a credentials file. """
+    for line_number, row in enumerate(csv.reader(credentials_file), 1):
+        if not row or row[0].startswith('#'):
+            continue
+
+        if len(row) != 2:
+            raise ValueError(
+                f'Linha {line_number} do arquivo de credenciais deve ter '
+                f'usuário e senha'
+            )
+
+        yield row[0].strip(), row[1]
+
+
+def guess_format(output):
+    """ Sink format from the output file extension, if known. """
+    extension = os.path.splitext(output)[1].lstrip('.').lower()
+    if extension in SINKS:
+        return extension
+
+    return None
+
+
+def create_captcha_service(two_captcha_key):
+    if not two_captcha_key:
+        return None
+
+    from bolsa.captcha.services.AsyncTwoCaptchaResolverService import (
+        AsyncTwoCaptchaResolverService
+    )
+
+    return AsyncTwoCaptchaResolverService(two_captcha_key)
+
+
+async def export(args, sink):
+    """ Stream every user account to `sink`, returning the failed users. """
+    from bolsa.pool import B3AsyncBackendPool
+
+    pool = B3AsyncBackendPool(
+        captcha_service=create_captcha_service(args.two_captcha_key),
+        max_concurrency=args.max_concurrency,
+        max_concurrency_per_user=args.max_concurrency_per_user,
+        max_active_users=args.max_active_users,
+        base_url=args.base_url
+    )
+    failed_usernames = []
+    try:
+        with open(args.credentials, newline='', encoding='utf-8') as file:
+            async for result in pool.iter_users_assets_extract(
+                read_credentials(file),
+                max_queue_size=args.max_queue_size
+            ):
+                if result.error:
+                    failed_usernames.append(result.username)
+                else:
+                    sink.write(result)
+    finally:
+        await pool.close()
+
+    return failed_usernames
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog='bolsa',
+        description=(
+            'Exporta o extrato de negociação de vários usuários do CEI.'
+        )
+    )
+    parser.add_argument(
+        'credentials',
+        help='arquivo CSV com um "usuário,senha" por linha'
+    )
+    parser.add_argument('output', help='arquivo de saída')
+    parser.add_argument(
+        '--format',
+        choices=sorted(SINKS),
+        help='formato da saída, pela extensão do arquivo se omitido'
+    )
+    parser.add_argument('--max-concurrency', type=int, default=30)
+    parser.add_argument('--max-concurrency-per-user', type=int, default=4)
+    parser.add_argument('--max-active-users', type=int)
+    parser.add_argument(
+        '--max-queue-size',
+        type=int,
+        default=16,
+        help='contas prontas aguardando escrita'
+    )
+    parser.add_argument(
+        '--buffer-size',
+        type=int,
+        default=10000,
+        help='linhas acumuladas antes de cada escrita'
+    )
+    parser.add_argument(
+        '--two-captcha-key',
+        default=os.environ.get('TWO_CAPTCHA_KEY'),
+        help='chave do 2captcha, ou a variável TWO_CAPTCHA_KEY'
+    )
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--verbose', '-v', action='store_true')
+
+    return parser
+
+
+def main(argv=None):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    output_format = args.format or guess_format(args.output)
+    if output_format is None:
+        parser.error(
+            f'formato não identificado pela extensão de {args.output}, '
+            f'use --format'
+        )
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s {%(module)s} %(message)s',
+        level=logging.INFO if args.verbose else logging.WARNING
+    )
+
+    sink_class = SINKS[output_format]
+    with sink_class(args.output, buffer_size=args.buffer_size) as sink:
+        failed_usernames = asyncio.run(export(args, sink))
+
+    print(
+        f'{sink.rows_count} linhas exportadas para {args.output}',
+        file=sys.stderr
+    )
+    if failed_usernames:
+        print(
+            f'{len(failed_usernames)} usuários falharam: '
+            f'{", ".join(failed_usernames)}',
+            file=sys.stderr
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+from array import array
+from datetime import date
+
+from bolsa.constants import (
+    ASSET_ACTION_TYPE_MAPPER,
+    ASSET_MARKET_TYPE_MAPPER,
+    BrokerAssetExtractAction,
+    BrokerAssetExtractMarketType,
+    enum_value
+)
+from bolsa.converters import (
+    cei_price_to_cents,
+    cents_to_decimal,
+    parse_cei_date
+)
+from bolsa.models import BrokerAssetExtract, prices_in_cents
+
+ACTIONS = tuple(action.value for action in BrokerAssetExtractAction)
+MARKET_TYPES = tuple(
+    market_type.value for market_type in BrokerAssetExtractMarketType
+)
+
+COLUMNS_TYPECODE = {
+    'operation_date': 'l',
+    'action': 'B',
+    'market_type': 'B',
+    'raw_negotiation_code': 'L',
+    'asset_specification': 'L',
+    'unit_amount': 'q',
+    'unit_price': 'q',
+    'total_price': 'q',
+    'quotation_factor': 'q',
+}
+
+
+class AssetExtractBatch():
+    """
+    Column oriented `BrokerAssetExtract` rows.
+
+    Dates are stored as ordinals, prices as integer cents and text columns
+    as codes into shared dictionaries. Slicing shares the column buffers.
+    """
+
+    def __init__(self, columns, negotiation_codes, asset_specifications):
+        self._columns = {
+            name: memoryview(column) for name, column in columns.items()
+        }
+        self.negotiation_codes = negotiation_codes
+        self.asset_specifications = asset_specifications
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (
+                {
+                    name: array(column.format, column.tobytes())
+                    for name, column in self._columns.items()
+                },
+                self.negotiation_codes,
+                self.asset_specifications
+            )
+        )
+
+    def __len__(self):
+        return len(self._columns['operation_date'])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError('AssetExtractBatch slices must be contiguous')
+
+            return AssetExtractBatch(
+                {
+                    name: column[index]
+                    for name, column in self._columns.items()
+                },
+                self.negotiation_codes,
+                self.asset_specifications
+            )
+
+        columns = self._columns
+        return BrokerAssetExtract(
+            operation_date=date.fromordinal(columns['operation_date'][index]),
+            action=ACTIONS[columns['action'][index]],
+            market_type=MARKET_TYPES[columns['market_type'][index]],
+            raw_negotiation_code=self.negotiation_codes[
+                columns['raw_negotiation_code'][index]
+            ],
+            asset_specification=self.asset_specifications[
+                columns['asset_specification'][index]
+            ],
+            unit_amount=columns['unit_amount'][index],
+            unit_price=cents_to_decimal(columns['unit_price'][index]),
+            total_price=cents_to_decimal(columns['total_price'][index]),
+            quotation_factor=columns['quotation_factor'][index]
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, AssetExtractBatch):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f'AssetExtractBatch(rows={len(self)})'
+
+    def column(self, name):
+        """ Return the raw buffer of a column, without copying it. """
+        return self._columns[name]
+
+    def to_assets_extract(self):
+        return list(self)
+
+    def to_numpy(self):
+        """ Return every column as a NumPy array sharing its buffer. """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                'AssetExtractBatch.to_numpy requires numpy to be installed'
+            )
+
+        return {
+            name: numpy.frombuffer(column, dtype=column.format)
+            for name, column in self._columns.items()
+        }
+
+    @classmethod
+    def from_assets_extract(cls, assets_extract):
+        builder = AssetExtractBatchBuilder()
+        for asset_extract in assets_extract:
+            builder.append_asset_extract(asset_extract)
+
+        return builder.build()
+
+
+class AssetExtractBatchBuilder():
+
+    def __init__(self):
+        self._columns = {
+            name: array(typecode)
+            for name, typecode in COLUMNS_TYPECODE.items()
+        }
+        self._negotiation_codes = {}
+        self._asset_specifications = {}
+        self._actions = {value: code for code, value in enumerate(ACTIONS)}
+        self._market_types = {
+            value: code for code, value in enumerate(MARKET_TYPES)
+        }
+
+    @staticmethod
+    def _encode(dictionary, value):
+        code = dictionary.get(value)
+        if code is None:
+            code = dictionary[value] = len(dictionary)
+
+        return code
+
+    def _append(
+        self,
+        operation_date,
+        action,
+        market_type,
+        raw_negotiation_code,
+        asset_specification,
+        unit_amount,
+        unit_price,
+        total_price,
+        quotation_factor
+    ):
+        columns = self._columns
+        columns['operation_date'].append(operation_date)
+        columns['action'].append(self._actions[enum_value(action)])
+        columns['market_type'].append(
+            self._market_types[enum_value(market_type)]
+        )
+        columns['raw_negotiation_code'].append(
+            self._encode(self._negotiation_codes, raw_negotiation_code)
+        )
+        columns['asset_specification'].append(
+            self._encode(self._asset_specifications, asset_specification)
+        )
+        columns['unit_amount'].append(unit_amount)
+        columns['unit_price'].append(unit_price)
+        columns['total_price'].append(total_price)
+        columns['quotation_factor'].append(quotation_factor)
+
+    def append_response_fields(
+        self,
+        operation_date,
+        action,
+        market_type,
+        raw_negotiation_code,
+        asset_specification,
+        unit_amount,
+        unit_price,
+        total_price,
+        quotation_factor
+    ):
+        """ Append a row from the raw CEI table cells. """
+        self._append(
+            operation_date=parse_cei_date(operation_date).toordinal(),
+            action=ASSET_ACTION_TYPE_MAPPER[action],
+            market_type=ASSET_MARKET_TYPE_MAPPER[market_type],
+            raw_negotiation_code=raw_negotiation_code,
+            asset_specification=asset_specification,
+            unit_amount=int(unit_amount),
+            unit_price=cei_price_to_cents(unit_price),
+            total_price=cei_price_to_cents(total_price),
+            quotation_factor=int(quotation_factor)
+        )
+
+    def append_asset_extract(self, asset_extract):
+        unit_price, total_price = prices_in_cents(asset_extract)
+        self._append(
+            operation_date=asset_extract.operation_date.toordinal(),
+            action=asset_extract.action,
+            market_type=asset_extract.market_type,
+            raw_negotiation_code=asset_extract.raw_negotiation_code,
+            asset_specification=asset_extract.asset_specification,
+            unit_amount=asset_extract.unit_amount,
+            unit_price=unit_price,
+            total_price=total_price,
+            quotation_factor=asset_extract.quotation_factor
+        )
+
+    def build(self):
+        return AssetExtractBatch(
+            self._columns,
+            list(self._negotiation_codes),
+            list(self._asset_specifications)
+        )
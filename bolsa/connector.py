@@ -1,15 +1,78 @@
+import asyncio
+import logging
+
 from aiohttp import TCPConnector
 
 from bolsa.contrib.mixins.singleton import SingletonCreateMixin
 
+logger = logging.getLogger(__name__)
+
 
 class B3HttpClientConnector(SingletonCreateMixin):
+    """
+    Connection pool shared by every backend of the process.
+
+    The `TCPConnector` is only built by the first `acquire`, on the running
+    loop, and closed when the last backend holding it calls `release`.
+    Use `B3HttpClientConnector.create()` to get the shared instance.
+    """
 
-    def __init__(self, pool_size=30):
-        self.CONNECTOR = TCPConnector(
-            limit=pool_size,
-            ssl=False
+    def __init__(
+        self,
+        limit=30,
+        limit_per_host=0,
+        keepalive_timeout=15,
+        ttl_dns_cache=300,
+        ssl=False
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.ssl = ssl
+        self._connector = None
+        self._loop = None
+        self._references = 0
+
+    def _create_connector(self):
+        logger.info('B3HttpClientConnector creating connector')
+        return TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+            ssl=self.ssl
         )
 
-    def get_connector(self):
-        return self.CONNECTOR
+    def acquire(self):
+        """ Return the shared connector, holding a reference to it. """
+        loop = asyncio.get_event_loop()
+        if (
+            self._connector is None or
+            self._connector.closed or
+            self._loop is not loop
+        ):
+            self._connector = self._create_connector()
+            self._loop = loop
+            self._references = 0
+
+        self._references += 1
+
+        return self._connector
+
+    async def release(self, connector):
+        """ Drop a reference, closing the connector after the last one. """
+        if connector is not self._connector:
+            return
+
+        self._references -= 1
+        if self._references <= 0:
+            await self.close()
+
+    async def close(self):
+        """ Close the connector even if backends still hold it. """
+        connector, self._connector = self._connector, None
+        self._references = 0
+        if connector is not None:
+            logger.info('B3HttpClientConnector closing connector')
+            await connector.close()
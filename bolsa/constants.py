@@ -1,5 +1,7 @@
 from enum import Enum, unique
 
+CEI_DATE_FORMAT = '%d/%m/%Y'
+
 
 @unique
 class BrokerAssetExtractAction(Enum):
@@ -26,3 +28,11 @@ ASSET_MARKET_TYPE_MAPPER = {
     'Opção de Venda': BrokerAssetExtractMarketType.OPTIONS.value,
     'Exercicio de Opções': BrokerAssetExtractMarketType.OPTIONS.value
 }
+
+
+def enum_value(value):
+    """
+    Plain string of an action or market type, which compact models keep
+    as enum members.
+    """
+    return getattr(value, 'value', value)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from bolsa.constants import CEI_DATE_FORMAT
+
+PRICE_SEPARATORS = str.maketrans('', '', ',.')
+
+
+@lru_cache(maxsize=8192)
+def parse_cei_date(value):
+    """ Parse CEI dates like '05/06/2020', which repeat a lot. """
+    return datetime.strptime(value, CEI_DATE_FORMAT).date()
+
+
+def format_cei_date(value):
+    return value.strftime(CEI_DATE_FORMAT)
+
+
+def cei_price_to_cents(value):
+    """ Convert CEI prices like '1.485,12' to integer cents. """
+    return int(value.translate(PRICE_SEPARATORS))
+
+
+def cei_price_to_decimal(value):
+    return Decimal(cei_price_to_cents(value)).scaleb(-2)
+
+
+def decimal_to_cents(value):
+    return int(value * 100)
+
+
+def cents_to_decimal(value):
+    return Decimal(value).scaleb(-2)
@@ -0,0 +1,127 @@
+import sys
+
+from bolsa.constants import (
+    ASSET_ACTION_TYPE_MAPPER,
+    ASSET_MARKET_TYPE_MAPPER,
+    BrokerAssetExtractAction,
+    BrokerAssetExtractMarketType
+)
+from bolsa.converters import (
+    cei_price_to_cents,
+    cei_price_to_decimal,
+    parse_cei_date
+)
+from bolsa.models import (
+    BrokerAssetExtract,
+    CentsBrokerAssetExtract,
+    CompactBrokerAssetExtract,
+    FrozenCompactBrokerAssetExtract
+)
+
+
+class RowDecoder():
+    """
+    Decode the cells of the CEI assets table into `model_class` instances.
+
+    Dates go through a memoized parser and prices through `price_converter`,
+    so subclasses and callers may swap the numeric representation.
+    """
+
+    price_converter = staticmethod(cei_price_to_decimal)
+    action_mapper = ASSET_ACTION_TYPE_MAPPER
+    market_type_mapper = ASSET_MARKET_TYPE_MAPPER
+
+    def __init__(self, model_class=BrokerAssetExtract, price_converter=None):
+        self.model_class = model_class
+        if price_converter:
+            self.price_converter = price_converter
+
+    def _text(self, value):
+        return value
+
+    def decode(
+        self,
+        operation_date,
+        action,
+        market_type,
+        raw_negotiation_code,
+        asset_specification,
+        unit_amount,
+        unit_price,
+        total_price,
+        quotation_factor
+    ):
+        price_converter = self.price_converter
+        return self.model_class(
+            operation_date=parse_cei_date(operation_date),
+            action=self.action_mapper[action],
+            market_type=self.market_type_mapper[market_type],
+            raw_negotiation_code=self._text(raw_negotiation_code),
+            asset_specification=self._text(asset_specification),
+            unit_amount=int(unit_amount),
+            unit_price=price_converter(unit_price),
+            total_price=price_converter(total_price),
+            quotation_factor=int(quotation_factor)
+        )
+
+    def decode_rows(self, rows):
+        """ Decode table rows, skipping the unused fourth cell. """
+        decode = self.decode
+        return [
+            decode(
+                operation_date,
+                action,
+                market_type,
+                raw_negotiation_code,
+                asset_specification,
+                unit_amount,
+                unit_price,
+                total_price,
+                quotation_factor
+            )
+            for operation_date, action, market_type, _, raw_negotiation_code, asset_specification, unit_amount, unit_price, total_price, quotation_factor in rows  # NOQA
+        ]
+
+
+class CentsRowDecoder(RowDecoder):
+    """
+    Decode rows into `CentsBrokerAssetExtract`, keeping `unit_price` and
+    `total_price` as integer cents.
+    """
+
+    price_converter = staticmethod(cei_price_to_cents)
+
+    def __init__(self):
+        super().__init__(model_class=CentsBrokerAssetExtract)
+
+
+class CompactRowDecoder(RowDecoder):
+    """
+    Decode rows into slotted models holding enum members and interned
+    negotiation codes and specifications, so repeated values are shared.
+    """
+
+    action_mapper = {
+        key: BrokerAssetExtractAction(value)
+        for key, value in ASSET_ACTION_TYPE_MAPPER.items()
+    }
+    market_type_mapper = {
+        key: BrokerAssetExtractMarketType(value)
+        for key, value in ASSET_MARKET_TYPE_MAPPER.items()
+    }
+
+    def __init__(self, frozen=False, price_converter=None):
+        super().__init__(
+            model_class=(
+                FrozenCompactBrokerAssetExtract
+                if frozen
+                else CompactBrokerAssetExtract
+            ),
+            price_converter=price_converter
+        )
+
+    def _text(self, value):
+        return sys.intern(value)
+
+
+DEFAULT_ROW_DECODER = RowDecoder()
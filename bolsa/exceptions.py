@@ -0,0 +1,10 @@
+class SessionExpiredException(Exception):
+    pass
+
+
+class AsyncPostbackParseException(Exception):
+    pass
+
+
+class LoginException(Exception):
+    pass
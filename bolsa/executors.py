@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up():
+    return os.getpid()
+
+
+class ParseExecutor():
+    """
+    Run response parsing inline, in a thread pool or in a process pool so
+    CPU bound parsing does not block the event loop.
+    """
+
+    INLINE = 'inline'
+    THREAD = 'thread'
+    PROCESS = 'process'
+    MODES = (INLINE, THREAD, PROCESS)
+
+    def __init__(self, mode=INLINE, max_workers=None):
+        if mode not in self.MODES:
+            raise ValueError(f'Invalid parse executor mode: {mode}')
+
+        self.mode = mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.mode == self.THREAD:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='bolsa-parse'
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers
+                )
+
+        return self._executor
+
+    def start(self):
+        """ Fork every worker up front instead of on the first parse. """
+        if self.mode == self.INLINE:
+            return
+
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_warm_up) for _ in range(self.max_workers)
+        ]
+        for future in futures:
+            future.result()
+
+        logger.info(
+            f'ParseExecutor started - mode: {self.mode} '
+            f'max_workers: {self.max_workers}'
+        )
+
+    async def run(self, function, *args):
+        if self.mode == self.INLINE:
+            return function(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            partial(function, *args)
+        )
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,31 @@
+FORM_STATE_INPUT_IDS = (
+    '__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION'
+)
+
+
+class FormState():
+    """
+    Latest ASP.NET hidden fields received in a user session, sent back
+    with the next postback instead of loading the page again.
+    """
+
+    def __init__(self, fields=None):
+        self._fields = {}
+        if fields:
+            self.update(fields)
+
+    def update(self, fields):
+        self._fields.update(
+            (input_id, fields[input_id])
+            for input_id in FORM_STATE_INPUT_IDS
+            if input_id in fields
+        )
+
+    def is_complete(self):
+        return all(
+            input_id in self._fields for input_id in FORM_STATE_INPUT_IDS
+        )
+
+    @property
+    def fields(self):
+        return dict(self._fields)
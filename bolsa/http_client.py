@@ -1,18 +1,26 @@
+import asyncio
 import logging
 
-from bs4 import BeautifulSoup
+from yarl import URL
 
-from bolsa.connector import B3HttpClientConnector
+from bolsa.exceptions import LoginException, SessionExpiredException
+from bolsa.form_state import FORM_STATE_INPUT_IDS, FormState
+from bolsa.instrumentation import Instrumentation
+from bolsa.parsers import StreamingHTMLExtractor
+from bolsa.resilience import RetryPolicy
+from bolsa.session_store import dump_cookies, load_cookies
 
 logger = logging.getLogger(__name__)
 
-POOL_CONNECTOR = B3HttpClientConnector()
-
 
 class B3HttpClient():
     IS_LOGGED = False
     SESSION = None
     LOGIN_URL = 'https://ceiapp.b3.com.br/CEI_Responsivo/login.aspx'
+    LOGIN_PAGE = 'login.aspx'
+    ASSETS_PAGE = 'negociacao-de-ativos.aspx'
+    PAGE_REDIRECT_MARKER = b'|pageRedirect|'
+    CAPTCHA_ELEMENT_ID = 'ctl00_ContentPlaceHolder1_dvCaptcha'
 
     ASSETS_HOME_URL = (
         'https://ceiapp.b3.com.br/CEI_Responsivo/negociacao-de-ativos.aspx'
@@ -24,33 +32,233 @@ class B3HttpClient():
         'https://ceiapp.b3.com.br/CEI_Responsivo/negociacao-de-ativos.aspx'
     )
 
-    def __init__(self, username, password, session, captcha_service):
+    def __init__(
+        self,
+        username,
+        password,
+        session,
+        captcha_service,
+        session_store=None,
+        html_extractor=None,
+        retry_policy=None,
+        concurrency_limiter=None,
+        base_url=None,
+        instrumentation=None
+    ):
         self.username = username
         self.password = password
         self.session = session
         self.captcha_service = captcha_service
+        self.session_store = session_store
+        self.html_extractor = html_extractor or StreamingHTMLExtractor()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.concurrency_limiter = concurrency_limiter
+        self.instrumentation = instrumentation or Instrumentation()
+        self.form_state = FormState()
+        if base_url:
+            self._use_base_url(base_url)
+        self._login_task = None
+        self._login_generation = 0
+
+    def _use_base_url(self, base_url):
+        """ Send requests to another CEI host, like a local fake one. """
+        base_url = URL(base_url)
+        self.LOGIN_URL = str(base_url / self.LOGIN_PAGE)
+        self.ASSETS_HOME_URL = str(base_url / self.ASSETS_PAGE)
+        self.BROKERS_ACCOUNT_URL = self.ASSETS_HOME_URL
+        self.ASSETS_URL = self.ASSETS_HOME_URL
+
+    async def _restore_session(self):
+        if not self.session_store:
+            return False
+
+        cookies = await self.session_store.load(self.username)
+        if not cookies:
+            return False
+
+        load_cookies(self.session.cookie_jar, cookies, self.LOGIN_URL)
+        self.IS_LOGGED = True
+        logger.info(
+            f'B3HttpClient session restored - username: {self.username}'
+        )
+
+        return True
+
+    async def _login_once(self):
+        try:
+            if not await self._restore_session():
+                with self.instrumentation.timer('bolsa_login_seconds'):
+                    await self.login()
+                if self.session_store:
+                    await self.session_store.save(
+                        self.username,
+                        dump_cookies(self.session.cookie_jar)
+                    )
+
+            self._login_generation += 1
+        finally:
+            self._login_task = None
+
+    async def ensure_logged(self):
+        """ Login if needed, sharing a single in-flight login. """
+        if self.IS_LOGGED:
+            return
+
+        if self._login_task is None:
+            self._login_task = asyncio.ensure_future(self._login_once())
+
+        await asyncio.shield(self._login_task)
+
+    async def _relogin(self, login_generation):
+        # Only the first request noticing the expired session drops it;
+        # the others wait for the login it triggers. Dropping moves the
+        # generation too, so requests failing while that login is still in
+        # flight don't clear the cookies it is setting.
+        if login_generation == self._login_generation:
+            logger.info(
+                f'B3HttpClient session expired - username: {self.username}'
+            )
+            self.instrumentation.increment('bolsa_session_expired_total')
+            self._login_generation += 1
+            self.IS_LOGGED = False
+            self.session.cookie_jar.clear()
+            if self.session_store:
+                await self.session_store.delete(self.username)
+
+        await self.ensure_logged()
+
+    def _is_session_expired(self, response, body):
+        if response.url.path.lower().endswith(self.LOGIN_PAGE):
+            return True
+
+        redirect_index = body.find(self.PAGE_REDIRECT_MARKER)
+        if redirect_index == -1:
+            return False
+
+        redirect_url = body[redirect_index:redirect_index + 256].lower()
+        return self.LOGIN_PAGE.encode() in redirect_url
+
+    async def _fetch(self, method, url, endpoint, **kwargs):
+        with self.instrumentation.timer(
+            'bolsa_request_seconds', endpoint=endpoint, method=method
+        ):
+            response = await self.session.request(
+                method,
+                url,
+                trace_request_ctx={'endpoint': endpoint},
+                **kwargs
+            )
+            await response.read()
+
+        return response
+
+    async def _send(self, method, url, endpoint, **kwargs):
+        """ Do a single attempt, bounded by the timeout and the limiter. """
+        # The fetch coroutine is only created once it can be awaited, so a
+        # caller cancelled while queued on the limiter leaves none behind.
+        def fetch():
+            return asyncio.wait_for(
+                self._fetch(method, url, endpoint, **kwargs),
+                self.retry_policy.timeout
+            )
+
+        if not self.concurrency_limiter:
+            return await fetch()
+
+        async with self.concurrency_limiter.acquire(URL(url).host) as permit:
+            response = await fetch()
+            if self.retry_policy.is_retryable_response(response):
+                permit.drop()
+
+            return response
+
+    async def _send_with_retry(
+        self,
+        method,
+        url,
+        idempotent=None,
+        endpoint='unknown',
+        **kwargs
+    ):
+        def on_retry(reason):
+            self.instrumentation.increment(
+                'bolsa_retries_total', endpoint=endpoint, reason=reason
+            )
+
+        return await self.retry_policy.call(
+            lambda: self._send(method, url, endpoint, **kwargs),
+            retryable=self.retry_policy.is_idempotent(method, idempotent),
+            on_retry=on_retry
+        )
+
+    async def _request(
+        self,
+        method,
+        url,
+        idempotent=None,
+        endpoint='unknown',
+        **kwargs
+    ):
+        """
+        Do a logged request, replaying it once after a new login when CEI
+        redirects to the login page. `idempotent` flags POSTs that only
+        query data, so they can be retried like GETs. `endpoint` labels the
+        request metrics.
+        """
+        await self.ensure_logged()
+
+        login_generation = self._login_generation
+        response = await self._send_with_retry(
+            method, url, idempotent, endpoint, **kwargs
+        )
+        body = await response.read()
+        if not self._is_session_expired(response, body):
+            return response
+
+        await self._relogin(login_generation)
+
+        response = await self._send_with_retry(
+            method, url, idempotent, endpoint, **kwargs
+        )
+        body = await response.read()
+        if self._is_session_expired(response, body):
+            raise SessionExpiredException(
+                f'Sessão expirada após novo login - username: {self.username}'
+            )
+
+        return response
+
+    def _check_login_response(self, response):
+        # The retry policy returns the last response once the attempts
+        # run out, even a 429 or 503 without the login form.
+        if not 200 <= response.status < 300:
+            raise LoginException(
+                f'Falha no login - username: {self.username} '
+                f'url: {response.url} status: {response.status}'
+            )
 
     async def login(self):
-        async with self.session.get(
-            self.LOGIN_URL
-        ) as response:
-            loginPageContent = await response.text()
-            loginPageParsed = BeautifulSoup(loginPageContent, "html.parser")
-            view_state = loginPageParsed.find(id='__VIEWSTATE')['value']
-            viewstate_generator = loginPageParsed.find(
-                id='__VIEWSTATEGENERATOR'
-            )['value']
-            event_validation = loginPageParsed.find(
-                id='__EVENTVALIDATION'
-            )['value']
-
-            solvedcaptcha = None
-            if self.captcha_service:
-                site_key = loginPageParsed.find(
-                    id='ctl00_ContentPlaceHolder1_dvCaptcha'
-                ).get(
-                    'data-sitekey'
-                )
+        # Loading the login page is idempotent, unlike posting the login.
+        response = await self._send_with_retry(
+            'GET', self.LOGIN_URL, endpoint='login_page'
+        )
+        self._check_login_response(response)
+        login_page = self.html_extractor.extract(
+            await response.read(),
+            input_ids=FORM_STATE_INPUT_IDS,
+            element_ids=(self.CAPTCHA_ELEMENT_ID,),
+            encoding=response.get_encoding()
+        )
+        view_state = login_page.inputs['__VIEWSTATE']
+        viewstate_generator = login_page.inputs['__VIEWSTATEGENERATOR']
+        event_validation = login_page.inputs['__EVENTVALIDATION']
+
+        solvedcaptcha = None
+        if self.captcha_service:
+            site_key = login_page.elements[
+                self.CAPTCHA_ELEMENT_ID
+            ].get('data-sitekey')
+            with self.instrumentation.timer('bolsa_captcha_seconds'):
                 solvedcaptcha = await self.captcha_service.resolve(
                     site_key,
                     self.LOGIN_URL
@@ -87,35 +295,53 @@ class B3HttpClient():
 
         logger.info(f'B3HttpClient doing login - username: {self.username}')
 
-        async with self.session.post(
-            self.LOGIN_URL,
-            data=payload,
-            headers=headers,
-        ) as response:
-            logger.info(f'B3HttpClient login done - username: {self.username}')
+        with self.instrumentation.timer(
+            'bolsa_request_seconds', endpoint='login', method='POST'
+        ):
+            async with self.session.post(
+                self.LOGIN_URL,
+                data=payload,
+                headers=headers,
+                trace_request_ctx={'endpoint': 'login'}
+            ) as response:
+                self._check_login_response(response)
+                body = await response.text()
 
-            self.IS_LOGGED = True
+        logger.info(f'B3HttpClient login done - username: {self.username}')
 
-            return await response.text()
+        self.IS_LOGGED = True
 
-    async def get_brokers(self):
-        if not self.IS_LOGGED:
-            await self.login()
+        return body
 
+    async def get_brokers(self):
         logger.info(
             f'B3HttpClient getting brokers - username: {self.username}'
         )
 
-        response = await self.session.get(self.ASSETS_HOME_URL)
+        response = await self._request(
+            'GET', self.ASSETS_HOME_URL, endpoint='brokers'
+        )
         logger.info(
             f'B3HttpClient end getting brokers - username: {self.username}'
         )
 
         return response
 
+    async def load_form_state(self):
+        """ Load the assets page only to get its form hidden fields. """
+        response = await self._request(
+            'GET', self.ASSETS_HOME_URL, endpoint='brokers'
+        )
+        page = self.html_extractor.extract(
+            await response.read(),
+            input_ids=FORM_STATE_INPUT_IDS,
+            encoding=response.get_encoding()
+        )
+        self.form_state.update(page.inputs)
+
     async def get_broker_accounts(self, broker):
-        if not self.IS_LOGGED:
-            await self.login()
+        if not self.form_state.is_complete():
+            await self.load_form_state()
 
         default_account = '0'
         start_date = broker.parse_extra_data.start_date
@@ -127,31 +353,7 @@ class B3HttpClient():
                 '$ddlAgentes'
             ),
             '__EVENTTARGET': 'ctl00$ContentPlaceHolder1$ddlAgentes',
-            '__VIEWSTATE': (
-                '/wEPDwUKLTI2MTA0ODczNg9kFgJmD2QWAgIDD2QWCAIBDw8WAh4EVGV4dAUcR'
-                '0lPVkFOTkkgQ09STkFDSElOSSBEQSBTSUxWQWRkAgMPZBYCAgEPFgIeB1Zpc2'
-                'libGVoZAIFD2QWBAIBDw8WAh8ABRZOZWdvY2lhw6fDo28gZGUgYXRpdm9zZGQ'
-                'CAw9kFgICAw8PFgIfAAUzIC8gRXh0cmF0b3MgZSBJbmZvcm1hdGl2b3MgLyBO'
-                'ZWdvY2lhw6fDo28gZGUgYXRpdm9zZGQCBw9kFgICBQ9kFgJmD2QWCAIDDxBkE'
-                'BUFCVNlbGVjaW9uZR85MCAtIEVBU1lOVkVTVCAtIFRJVFVMTyBDViBTLkEuHj'
-                'MgLSBYUCBJTlZFU1RJTUVOVE9TIENDVFZNIFMvQSMzODYgLSBSSUNPIElOVkV'
-                'TVElNRU5UT1MgLSBHUlVQTyBYUCAzMDggLSBDTEVBUiBDT1JSRVRPUkEgLSBH'
-                'UlVQTyBYUBUFAi0xAjkwATMDMzg2AzMwOBQrAwVnZ2dnZxYBZmQCBQ8QDxYCH'
-                'gdFbmFibGVkaGQQFQEMU2VsZWNpb25lLi4uFQEBMBQrAwFnFgFmZAIHDw8WAh'
-                '8BZ2QWBAIFDw8WAh8ABQoxNS8wMy8yMDE5ZGQCBw8PFgIfAAUKMDQvMDkvMjA'
-                'yMGRkAgkPZBYIAgEPDxYCHwAFCjE1LzAzLzIwMTlkZAIDDw8WAh8ABQowNC8'
-                'wOS8yMDIwZGQCBQ8PFgIfAAUKMTUvMDMvMjAxOWRkAgcPDxYCHwAFCjA0LzA5'
-                'LzIwMjBkZGRxwKn9JGbY4ybO1hczEjDtoMNWHA=='
-            ),
-            '__VIEWSTATEGENERATOR': 'B345DEBA',
-            '__EVENTVALIDATION': (
-                '/wEdAA1HJ2+J0WZq5G92xJM7n1xbkdMq+p9EbLSDyFDpFsJg30jWLhbIoNprA'
-                'gvONYSktR9kUdPnKtUYGLSZMc/L6M60Vx7WZDZAC7VL6Ff5PQQ8Ml0aq/zmKf'
-                'YeYoLRE68kUnN+T4cvEJcdEKVEObT+JUFSdPwdZycbAgmz2rhziqC/I4jipT0'
-                'jOBb54glnPZxI9VIJZJh1VhVVa0UQ15FhckhgajRdmhEnQj18gON7y5L4CwGM'
-                'p96e++H/oSCxgpNo73nsffQOO+5kepETTltW2pZIXYv2PXYLNUXZnEOvnHkp6'
-                'xZ0N94='
-            ),
+            **self.form_state.fields,
             'ctl00$ContentPlaceHolder1$ddlAgentes': broker.value,
             'ctl00$ContentPlaceHolder1$ddlContas': default_account,
             'ctl00$ContentPlaceHolder1$txtDataDeBolsa': start_date,
@@ -175,8 +377,11 @@ class B3HttpClient():
             f' broker_value: {broker.value}'
         )
 
-        response = await self.session.post(
+        response = await self._request(
+            'POST',
             self.BROKERS_ACCOUNT_URL,
+            endpoint='broker_accounts',
+            idempotent=True,
             data=payload,
             headers=headers
         )
@@ -193,12 +398,10 @@ class B3HttpClient():
         account_id,
         broker_value,
         broker_parse_extra_data,
-        account_parse_extra_data
+        account_parse_extra_data,
+        start_date=None
     ):
-        if not self.IS_LOGGED:
-            await self.login()
-
-        start_date = broker_parse_extra_data.start_date
+        start_date = start_date or broker_parse_extra_data.start_date
         end_date = broker_parse_extra_data.end_date
 
         payload = {
@@ -238,8 +441,11 @@ class B3HttpClient():
             f'account_id: {account_id}'
         )
 
-        response = await self.session.post(
+        response = await self._request(
+            'POST',
             self.ASSETS_URL,
+            endpoint='assets_extract',
+            idempotent=True,
             data=payload,
             headers=headers
         )
@@ -0,0 +1,280 @@
+import asyncio
+import math
+import time
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+
+import aiohttp
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape_label_value(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+class MetricsExporterInterface(metaclass=ABCMeta):
+
+    @abstractmethod
+    def observe(self, name, value, labels):
+        """ Record a sample of the `name` histogram. """
+        raise NotImplementedError
+
+    @abstractmethod
+    def increment(self, name, value, labels):
+        """ Add `value` to the `name` counter. """
+        raise NotImplementedError
+
+
+class InMemoryExporter(MetricsExporterInterface):
+    """ Keep every sample and counter, mostly for tests and benchmarks. """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.counters = defaultdict(float)
+
+    def observe(self, name, value, labels):
+        self.samples[(name, _labels_key(labels))].append(value)
+
+    def increment(self, name, value, labels):
+        self.counters[(name, _labels_key(labels))] += value
+
+    def get_samples(self, name, **labels):
+        """ Samples of `name` whose labels include `labels`. """
+        labels = set(labels.items())
+        return [
+            value
+            for (sample_name, sample_labels), values in self.samples.items()
+            if sample_name == name and labels <= set(sample_labels)
+            for value in values
+        ]
+
+    def get_counter(self, name, **labels):
+        """ Sum of the `name` counters whose labels include `labels`. """
+        labels = set(labels.items())
+        return sum(
+            value
+            for (counter_name, counter_labels), value in self.counters.items()
+            if counter_name == name and labels <= set(counter_labels)
+        )
+
+    def percentile(self, name, percent, **labels):
+        samples = sorted(self.get_samples(name, **labels))
+        if not samples:
+            return None
+
+        index = max(0, math.ceil(len(samples) * percent / 100) - 1)
+        return samples[index]
+
+
+class PrometheusExporter(MetricsExporterInterface):
+    """ Aggregate histograms and counters in the Prometheus text format. """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}
+        self._counters = defaultdict(float)
+
+    def observe(self, name, value, labels):
+        key = (name, _labels_key(labels))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = [
+                [0] * len(self.buckets), 0, 0
+            ]
+
+        bucket_counts = histogram[0]
+        for index, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                bucket_counts[index] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def increment(self, name, value, labels):
+        self._counters[(name, _labels_key(labels))] += value
+
+    @staticmethod
+    def _format_labels(labels, **extra_labels):
+        labels = tuple(labels) + tuple(extra_labels.items())
+        if not labels:
+            return ''
+
+        formatted_labels = ','.join(
+            f'{name}="{_escape_label_value(value)}"' for name, value in labels
+        )
+        return f'{{{formatted_labels}}}'
+
+    def render(self):
+        lines = []
+        for name in sorted({name for name, _ in self._histograms}):
+            lines.append(f'# TYPE {name} histogram')
+            for (histogram_name, labels), histogram in sorted(
+                self._histograms.items()
+            ):
+                if histogram_name != name:
+                    continue
+
+                bucket_counts, total, count = histogram
+                for bucket, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(
+                        f'{name}_bucket'
+                        f'{self._format_labels(labels, le=bucket)} '
+                        f'{bucket_count}'
+                    )
+                lines.append(
+                    f'{name}_bucket{self._format_labels(labels, le="+Inf")} '
+                    f'{count}'
+                )
+                lines.append(
+                    f'{name}_sum{self._format_labels(labels)} {total}'
+                )
+                lines.append(
+                    f'{name}_count{self._format_labels(labels)} {count}'
+                )
+
+        for name in sorted({name for name, _ in self._counters}):
+            lines.append(f'# TYPE {name} counter')
+            for (counter_name, labels), value in sorted(
+                self._counters.items()
+            ):
+                if counter_name == name:
+                    lines.append(
+                        f'{name}{self._format_labels(labels)} {value}'
+                    )
+
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation():
+    """
+    Send request, parse, login and retry metrics to every exporter.
+
+    Without exporters every hook is a no-op, so the client always has one.
+    """
+
+    def __init__(self, exporters=()):
+        self.exporters = list(exporters)
+
+    def observe(self, name, value, **labels):
+        for exporter in self.exporters:
+            exporter.observe(name, value, labels)
+
+    def increment(self, name, value=1, **labels):
+        for exporter in self.exporters:
+            exporter.increment(name, value, labels)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """ Observe the seconds spent inside the block. """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    def trace_config(self):
+        """
+        aiohttp `TraceConfig` timing DNS, connection (with TLS) and the
+        time to the response headers, and counting the transferred bytes.
+        Requests are labeled with the `endpoint` of their
+        `trace_request_ctx`.
+        """
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(
+            self._on_response_chunk_received
+        )
+        trace_config.on_dns_resolvehost_start.append(self._on_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        trace_config.on_connection_create_start.append(self._on_start)
+        trace_config.on_connection_create_end.append(self._on_connection_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+        return trace_config
+
+    @staticmethod
+    def _endpoint(trace_config_ctx):
+        trace_request_ctx = trace_config_ctx.trace_request_ctx
+        if isinstance(trace_request_ctx, dict):
+            return trace_request_ctx.get('endpoint', 'unknown')
+
+        return 'unknown'
+
+    @staticmethod
+    def _now():
+        return asyncio.get_event_loop().time()
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        trace_config_ctx.request_started_at = self._now()
+
+    async def _on_request_end(self, session, trace_config_ctx, params):
+        self.observe(
+            'bolsa_http_response_seconds',
+            self._now() - trace_config_ctx.request_started_at,
+            endpoint=self._endpoint(trace_config_ctx),
+            status=params.response.status
+        )
+
+    async def _on_request_exception(self, session, trace_config_ctx, params):
+        self.increment(
+            'bolsa_http_errors_total',
+            endpoint=self._endpoint(trace_config_ctx),
+            error=type(params.exception).__name__
+        )
+
+    async def _on_request_chunk_sent(self, session, trace_config_ctx, params):
+        self.increment(
+            'bolsa_http_sent_bytes_total',
+            len(params.chunk),
+            endpoint=self._endpoint(trace_config_ctx)
+        )
+
+    async def _on_response_chunk_received(
+        self,
+        session,
+        trace_config_ctx,
+        params
+    ):
+        self.increment(
+            'bolsa_http_received_bytes_total',
+            len(params.chunk),
+            endpoint=self._endpoint(trace_config_ctx)
+        )
+
+    async def _on_start(self, session, trace_config_ctx, params):
+        trace_config_ctx.started_at = self._now()
+
+    async def _on_dns_end(self, session, trace_config_ctx, params):
+        self.observe(
+            'bolsa_http_dns_seconds',
+            self._now() - trace_config_ctx.started_at,
+            host=params.host
+        )
+
+    async def _on_connection_end(self, session, trace_config_ctx, params):
+        self.observe(
+            'bolsa_http_connect_seconds',
+            self._now() - trace_config_ctx.started_at,
+            endpoint=self._endpoint(trace_config_ctx)
+        )
+
+    async def _on_connection_reuse(self, session, trace_config_ctx, params):
+        self.increment(
+            'bolsa_http_connections_reused_total',
+            endpoint=self._endpoint(trace_config_ctx)
+        )
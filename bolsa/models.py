@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 
 from bolsa.constants import (
     ASSET_ACTION_TYPE_MAPPER,
@@ -9,10 +9,18 @@ from bolsa.constants import (
     BrokerAssetExtractAction,
     BrokerAssetExtractMarketType
 )
+from bolsa.converters import (
+    cei_price_to_decimal,
+    cents_to_decimal,
+    decimal_to_cents,
+    parse_cei_date
+)
 
 
 @dataclass
 class BrokerParseExtraData():
+    __slots__ = ('start_date', 'end_date')
+
     start_date: str
     end_date: str
 
@@ -29,6 +37,8 @@ class Broker():
 class BrokerAccountParseExtraData():
     """ Essential data to do other requests using account information. """
 
+    __slots__ = ('view_state', 'view_state_generator', 'event_validation')
+
     view_state: str
     view_state_generator: str
     event_validation: str
@@ -36,6 +46,8 @@ class BrokerAccountParseExtraData():
 
 @dataclass
 class BrokerAccount():
+    __slots__ = ('id', 'parse_extra_data')
+
     id: str
     parse_extra_data: BrokerAccountParseExtraData
 
@@ -67,7 +79,7 @@ class BrokerAssetExtract():
     ):
         action = ASSET_ACTION_TYPE_MAPPER[action]
         market_type = ASSET_MARKET_TYPE_MAPPER[market_type]
-        operation_date = datetime.strptime(operation_date, '%d/%m/%Y').date()
+        operation_date = parse_cei_date(operation_date)
         total_price = cls._format_string_to_decimal(total_price)
         unit_price = cls._format_string_to_decimal(unit_price)
         unit_amount = int(unit_amount)
@@ -87,6 +99,136 @@ class BrokerAssetExtract():
 
     @staticmethod
     def _format_string_to_decimal(value):
-        value = value.replace(',', '').replace('.', '')
-        value = f'{value[:-2]}.{value[-2:]}'
-        return Decimal(value)
+        return cei_price_to_decimal(value)
+
+
+@dataclass
+class CompactBrokerAssetExtract():
+    """ `BrokerAssetExtract` without a per instance `__dict__`. """
+
+    __slots__ = (
+        'operation_date',
+        'action',
+        'market_type',
+        'raw_negotiation_code',
+        'asset_specification',
+        'unit_amount',
+        'unit_price',
+        'total_price',
+        'quotation_factor',
+    )
+
+    operation_date: date
+    action: BrokerAssetExtractAction
+    market_type: BrokerAssetExtractMarketType
+    raw_negotiation_code: str
+    asset_specification: str
+    unit_amount: int
+    unit_price: Decimal
+    total_price: Decimal
+    quotation_factor: int
+
+
+@dataclass(frozen=True)
+class FrozenCompactBrokerAssetExtract():
+    """ Immutable and hashable `CompactBrokerAssetExtract`. """
+
+    __slots__ = CompactBrokerAssetExtract.__slots__
+
+    operation_date: date
+    action: BrokerAssetExtractAction
+    market_type: BrokerAssetExtractMarketType
+    raw_negotiation_code: str
+    asset_specification: str
+    unit_amount: int
+    unit_price: Decimal
+    total_price: Decimal
+    quotation_factor: int
+
+
+@dataclass
+class CentsBrokerAssetExtract():
+    """ `BrokerAssetExtract` with `unit_price` and `total_price` in cents. """
+
+    __slots__ = CompactBrokerAssetExtract.__slots__
+
+    operation_date: date
+    action: BrokerAssetExtractAction
+    market_type: BrokerAssetExtractMarketType
+    raw_negotiation_code: str
+    asset_specification: str
+    unit_amount: int
+    unit_price: int
+    total_price: int
+    quotation_factor: int
+
+
+def prices_in_cents(asset_extract):
+    """ `(unit_price, total_price)` of any asset extract model in cents. """
+    if isinstance(asset_extract, CentsBrokerAssetExtract):
+        return asset_extract.unit_price, asset_extract.total_price
+
+    return (
+        decimal_to_cents(asset_extract.unit_price),
+        decimal_to_cents(asset_extract.total_price)
+    )
+
+
+def prices_in_decimal(asset_extract):
+    """ `(unit_price, total_price)` of any asset extract model as Decimal. """
+    if isinstance(asset_extract, CentsBrokerAssetExtract):
+        return (
+            cents_to_decimal(asset_extract.unit_price),
+            cents_to_decimal(asset_extract.total_price)
+        )
+
+    return asset_extract.unit_price, asset_extract.total_price
+
+
+@dataclass
+class UserAssetsExtractResult():
+    """ Outcome of a single user run inside a `B3AsyncBackendPool`. """
+
+    username: str
+    brokers: List = field(default_factory=lambda: [])
+    assets_extract: List = field(default_factory=lambda: [])
+    error: Optional[Exception] = None
+
+
+@dataclass
+class UserAccountAssetsExtractResult():
+    """
+    Assets extract of a single account, streamed by `B3AsyncBackendPool`.
+    A failed user yields one result with only `username` and `error`.
+    """
+
+    username: str
+    broker: Optional[Broker] = None
+    account: Optional[BrokerAccount] = None
+    assets_extract: List = field(default_factory=lambda: [])
+    error: Optional[Exception] = None
+
+
+@dataclass
+class Watermark():
+    """
+    Last synced date of an account, to be committed to a watermark store
+    once its rows are persisted.
+    """
+
+    username: str
+    broker_value: str
+    account_id: str
+    synced_date: date
+
+
+@dataclass
+class AssetPosition():
+    """ Consolidated position of a ticker computed from its trades. """
+
+    ticker: str
+    market_type: BrokerAssetExtractMarketType
+    quantity: int
+    average_price: Decimal
+    total_cost: Decimal
+    realized_profit: Decimal
@@ -0,0 +1,245 @@
+import codecs
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+DEFAULT_ENCODING = 'utf-8'
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ExtractedPage():
+    """ Target elements found in a CEI page, indexed by element id. """
+
+    inputs: Dict[str, str] = field(default_factory=dict)
+    selects: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+    tables: Dict[str, List[List[str]]] = field(default_factory=dict)
+    elements: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
+class HTMLExtractorInterface(metaclass=ABCMeta):
+
+    @abstractmethod
+    def extract(
+        self,
+        body,
+        input_ids=(),
+        select_ids=(),
+        table_ids=(),
+        element_ids=(),
+        encoding=DEFAULT_ENCODING
+    ):
+        """
+        Return an `ExtractedPage` with the value of each input, the
+        `(value, text)` options of each select, the cell texts of each
+        table body row and the attributes of each element requested by id.
+        """
+        raise NotImplementedError
+
+
+class _TargetedHTMLParser(HTMLParser):
+
+    def __init__(self, input_ids, select_ids, table_ids, element_ids):
+        super().__init__(convert_charrefs=True)
+        self.input_ids = frozenset(input_ids)
+        self.select_ids = frozenset(select_ids)
+        self.table_ids = frozenset(table_ids)
+        self.element_ids = frozenset(element_ids)
+        self.pending = set().union(
+            self.input_ids, self.select_ids, self.table_ids, self.element_ids
+        )
+        self.page = ExtractedPage()
+
+        self._select_id = None
+        self._option = None
+        self._table_id = None
+        self._in_table_body = False
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        element_id = None
+        for name, value in attrs:
+            if name == 'id':
+                element_id = value
+                break
+
+        if element_id in self.pending:
+            self._start_target(tag, element_id, attrs)
+
+        if self._select_id and tag == 'option':
+            self._close_option()
+            self._option = [dict(attrs).get('value', ''), []]
+        elif self._table_id:
+            self._start_table_tag(tag)
+
+    def _start_target(self, tag, element_id, attrs):
+        if element_id in self.input_ids:
+            self.page.inputs[element_id] = dict(attrs).get('value', '')
+            self.pending.discard(element_id)
+        if element_id in self.element_ids:
+            self.page.elements[element_id] = dict(attrs)
+            self.pending.discard(element_id)
+        if element_id in self.select_ids and tag == 'select':
+            self._select_id = element_id
+            self.page.selects[element_id] = []
+        if element_id in self.table_ids and not self._table_id:
+            self._table_id = element_id
+            self.page.tables[element_id] = []
+
+    def _start_table_tag(self, tag):
+        if tag == 'tbody':
+            self._in_table_body = True
+        elif not self._in_table_body:
+            return
+        elif tag == 'tr':
+            self._close_row()
+            self._row = []
+        elif tag == 'td' and self._row is not None:
+            self._close_cell()
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self._select_id:
+            if tag == 'option':
+                self._close_option()
+            elif tag == 'select':
+                self._close_option()
+                self.pending.discard(self._select_id)
+                self._select_id = None
+        elif self._table_id and self._in_table_body:
+            if tag == 'td':
+                self._close_cell()
+            elif tag == 'tr':
+                self._close_row()
+            elif tag == 'tbody':
+                self._close_row()
+                self.pending.discard(self._table_id)
+                self._table_id = None
+                self._in_table_body = False
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option[1].append(data)
+        elif self._cell is not None:
+            data = data.strip()
+            if data:
+                self._cell.append(data)
+
+    def _close_option(self):
+        if self._option is not None:
+            value, text = self._option
+            self.page.selects[self._select_id].append((value, ''.join(text)))
+            self._option = None
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            self.page.tables[self._table_id].append(self._row)
+            self._row = None
+
+
+class StreamingHTMLExtractor(HTMLExtractorInterface):
+    """
+    Feed the body in chunks to an event based parser that only keeps the
+    requested elements, stopping as soon as all of them were found.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def extract(
+        self,
+        body,
+        input_ids=(),
+        select_ids=(),
+        table_ids=(),
+        element_ids=(),
+        encoding=DEFAULT_ENCODING
+    ):
+        parser = _TargetedHTMLParser(
+            input_ids, select_ids, table_ids, element_ids
+        )
+        decoder = None
+        if isinstance(body, bytes):
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+        for start in range(0, len(body), self.chunk_size):
+            chunk = body[start:start + self.chunk_size]
+            if decoder:
+                chunk = decoder.decode(chunk)
+
+            parser.feed(chunk)
+            if not parser.pending:
+                return parser.page
+
+        if decoder:
+            parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+
+        return parser.page
+
+
+class BeautifulSoupHTMLExtractor(HTMLExtractorInterface):
+    """
+    Build the whole page tree with BeautifulSoup, only imported when this
+    extractor is used.
+    """
+
+    def __init__(self, features='html.parser'):
+        self.features = features
+
+    def extract(
+        self,
+        body,
+        input_ids=(),
+        select_ids=(),
+        table_ids=(),
+        element_ids=(),
+        encoding=DEFAULT_ENCODING
+    ):
+        from bs4 import BeautifulSoup
+
+        if isinstance(body, bytes):
+            body = body.decode(encoding, errors='replace')
+
+        soup = BeautifulSoup(body, self.features)
+        page = ExtractedPage()
+
+        for input_id in input_ids:
+            element = soup.find(id=input_id)
+            if element:
+                page.inputs[input_id] = element.get('value', '')
+
+        for element_id in element_ids:
+            element = soup.find(id=element_id)
+            if element:
+                page.elements[element_id] = dict(element.attrs)
+
+        for select_id in select_ids:
+            select = soup.find('select', id=select_id)
+            if select:
+                page.selects[select_id] = [
+                    (option.get('value', ''), option.text)
+                    for option in select.find_all('option')
+                ]
+
+        for table_id in table_ids:
+            table = soup.find(id=table_id)
+            table_body = table.find('tbody') if table else None
+            if table_body:
+                page.tables[table_id] = [
+                    [
+                        cell.get_text(strip=True)
+                        for cell in row.find_all('td')
+                    ]
+                    for row in table_body.find_all('tr')
+                ]
+
+        return page
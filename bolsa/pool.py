@@ -0,0 +1,227 @@
+import asyncio
+import logging
+
+from bolsa.backend import B3AsyncBackend
+from bolsa.connector import B3HttpClientConnector
+from bolsa.models import (
+    UserAccountAssetsExtractResult,
+    UserAssetsExtractResult
+)
+
+logger = logging.getLogger(__name__)
+
+
+class B3AsyncBackendPool():
+    """
+    Run the CEI flow for many users sharing one connection pool.
+
+    `max_concurrency` caps the requests in flight for the whole pool,
+    `max_concurrency_per_user` caps them for a single user and
+    `max_active_users` caps how many users hold an open session at once.
+    Any other keyword argument is forwarded to each `B3AsyncBackend`.
+
+    The pool holds a reference to the shared connector until `close`, so
+    warm connections survive between users.
+    """
+
+    def __init__(
+        self,
+        captcha_service=None,
+        max_concurrency=30,
+        max_concurrency_per_user=4,
+        max_active_users=None,
+        session_store=None,
+        connector_manager=None,
+        **backend_kwargs
+    ):
+        self.captcha_service = captcha_service
+        self.session_store = session_store
+        self.backend_kwargs = backend_kwargs
+        self.connector_manager = (
+            connector_manager or B3HttpClientConnector.create()
+        )
+        self._connector = None
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_user = max_concurrency_per_user
+        self.max_active_users = max_active_users or max_concurrency
+        self._requests_semaphore = None
+        self._users_semaphore = None
+        self._semaphores_loop = None
+        self._backends = set()
+
+    def _create_semaphores(self):
+        # Python 3.8 binds a Semaphore to the current loop when it is
+        # built, so they are created on the loop running the pool.
+        loop = asyncio.get_event_loop()
+        if self._semaphores_loop is loop:
+            return
+
+        self._requests_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._users_semaphore = asyncio.Semaphore(self.max_active_users)
+        self._semaphores_loop = loop
+
+    def _create_backend(self, username, password):
+        # The user limiter is acquired first so a user waiting on its own
+        # cap never holds one of the pool slots.
+        return B3AsyncBackend(
+            username=username,
+            password=password,
+            captcha_service=self.captcha_service,
+            session_store=self.session_store,
+            connector_manager=self.connector_manager,
+            request_limiters=[
+                asyncio.Semaphore(self.max_concurrency_per_user),
+                self._requests_semaphore
+            ],
+            **self.backend_kwargs
+        )
+
+    async def _get_user_assets_extract(self, username, password):
+        async with self._users_semaphore:
+            backend = self._create_backend(username, password)
+            self._backends.add(backend)
+            logger.info(f'B3AsyncBackendPool starting username: {username}')
+
+            try:
+                brokers = await backend.get_brokers_with_accounts()
+                assets_extract = await (
+                    backend.get_brokers_accounts_portfolio_assets_extract(
+                        brokers
+                    )
+                )
+            except Exception as error:
+                logger.exception(
+                    f'B3AsyncBackendPool failed username: {username}'
+                )
+                return UserAssetsExtractResult(username=username, error=error)
+            finally:
+                self._backends.discard(backend)
+                await backend.session_close()
+                await backend.connection_close()
+
+            logger.info(f'B3AsyncBackendPool finished username: {username}')
+
+            return UserAssetsExtractResult(
+                username=username,
+                brokers=brokers,
+                assets_extract=assets_extract
+            )
+
+    async def _stream_user_assets_extract(self, username, password, queue):
+        async with self._users_semaphore:
+            backend = self._create_backend(username, password)
+            self._backends.add(backend)
+            logger.info(f'B3AsyncBackendPool starting username: {username}')
+
+            try:
+                brokers = await backend.get_brokers_with_accounts()
+                async for broker, account, assets_extract in (
+                    backend.iter_accounts_portfolio_assets_extract(brokers)
+                ):
+                    await queue.put(UserAccountAssetsExtractResult(
+                        username=username,
+                        broker=broker,
+                        account=account,
+                        assets_extract=assets_extract
+                    ))
+            except Exception as error:
+                logger.exception(
+                    f'B3AsyncBackendPool failed username: {username}'
+                )
+                await queue.put(
+                    UserAccountAssetsExtractResult(
+                        username=username,
+                        error=error
+                    )
+                )
+                return
+            finally:
+                self._backends.discard(backend)
+                await backend.session_close()
+                await backend.connection_close()
+
+            logger.info(f'B3AsyncBackendPool finished username: {username}')
+
+    async def get_users_assets_extract(self, credentials):
+        """
+        Fetch brokers, accounts and assets extract of every
+        `(username, password)` pair in `credentials`. The assets extract of
+        each user holds `(broker, account, assets_extract)` for every
+        account of every broker.
+
+        A failure of one user does not abort the others; it is reported
+        in the `error` attribute of its `UserAssetsExtractResult`.
+        """
+        if self._connector is None:
+            self._connector = self.connector_manager.acquire()
+        self._create_semaphores()
+
+        users_routine = [
+            self._get_user_assets_extract(username, password)
+            for username, password in credentials
+        ]
+
+        return await asyncio.gather(*users_routine)
+
+    async def iter_users_assets_extract(self, credentials, max_queue_size=1):
+        """
+        Yield an `UserAccountAssetsExtractResult` for every account of every
+        `(username, password)` pair in `credentials` as soon as it finishes.
+
+        `credentials` is consumed lazily, by `max_active_users` workers, and
+        finished accounts wait on a queue of `max_queue_size` results, so
+        only a bounded part of the results is held in memory. Accounts
+        yielded before a user fails are kept; the failure comes as a last
+        result with its `error`.
+        """
+        if self._connector is None:
+            self._connector = self.connector_manager.acquire()
+        self._create_semaphores()
+
+        queue = asyncio.Queue(maxsize=max_queue_size)
+        credentials = iter(credentials)
+
+        async def work():
+            for username, password in credentials:
+                await self._stream_user_assets_extract(
+                    username, password, queue
+                )
+
+        workers = [
+            asyncio.create_task(work()) for _ in range(self.max_active_users)
+        ]
+
+        async def produce():
+            try:
+                await asyncio.gather(*workers)
+            except Exception as error:
+                await queue.put(error)
+            else:
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                result = await queue.get()
+                if result is None:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+
+                yield result
+        finally:
+            tasks = [producer, *workers]
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self):
+        for backend in list(self._backends):
+            await backend.session_close()
+            await backend.connection_close()
+        self._backends.clear()
+
+        if self._connector is not None:
+            await self.connector_manager.release(self._connector)
+            self._connector = None
@@ -0,0 +1,150 @@
+from decimal import Decimal
+from operator import add
+
+from bolsa.columnar import ACTIONS, MARKET_TYPES, AssetExtractBatch
+from bolsa.constants import (
+    BrokerAssetExtractAction,
+    BrokerAssetExtractMarketType
+)
+from bolsa.converters import cents_to_decimal
+from bolsa.models import AssetPosition
+
+SELL_CODE = ACTIONS.index(BrokerAssetExtractAction.SELL.value)
+FRACTIONAL_CODE = MARKET_TYPES.index(
+    BrokerAssetExtractMarketType.FRACTIONAL.value
+)
+OPTIONS_CODE = MARKET_TYPES.index(BrokerAssetExtractMarketType.OPTIONS.value)
+FRACTIONAL_SUFFIX = 'F'
+AVERAGE_PRICE_EXPONENT = Decimal('0.0001')
+
+
+def _ticker(raw_negotiation_code, market_type_code):
+    # Fractional market trades the same share with an `F` suffix.
+    if (
+        market_type_code == FRACTIONAL_CODE
+        and raw_negotiation_code.endswith(FRACTIONAL_SUFFIX)
+    ):
+        return raw_negotiation_code[:-len(FRACTIONAL_SUFFIX)]
+
+    return raw_negotiation_code
+
+
+def _prorate(value, part, whole):
+    """ `value * part / whole` in integer cents, rounded half up. """
+    return (2 * value * part + whole) // (2 * whole)
+
+
+def calculate_positions(assets_extract):
+    """
+    Return the `AssetPosition` of every ticker traded in `assets_extract`,
+    a list of `BrokerAssetExtract` or an `AssetExtractBatch`.
+
+    Fractional and unit market trades of a share are merged. Costs come
+    from `total_price`, which already accounts for `quotation_factor`,
+    and follow the average cost method: sells realize the difference to
+    the average cost and keep it unchanged. Trades of the same day are
+    applied buys first.
+
+    Selling more than is held, like writing options, opens a short
+    position with a negative `quantity` and the sale proceeds as a negative
+    `total_cost`; buys cover it and realize the difference.
+    """
+    if not isinstance(assets_extract, AssetExtractBatch):
+        assets_extract = AssetExtractBatch.from_assets_extract(
+            assets_extract
+        )
+
+    if not len(assets_extract):
+        return []
+
+    dates = assets_extract.column('operation_date').tolist()
+    actions = assets_extract.column('action').tolist()
+    market_types = assets_extract.column('market_type').tolist()
+    negotiation_codes = assets_extract.column('raw_negotiation_code').tolist()
+    unit_amounts = assets_extract.column('unit_amount').tolist()
+    total_prices = assets_extract.column('total_price').tolist()
+
+    # Tickers are resolved once per distinct (code, market type) pair.
+    tickers = {}
+    pair_tickers = {}
+    options = set()
+    for negotiation_code, market_type in dict.fromkeys(
+        zip(negotiation_codes, market_types)
+    ):
+        ticker_code = tickers.setdefault(
+            _ticker(
+                assets_extract.negotiation_codes[negotiation_code],
+                market_type
+            ),
+            len(tickers)
+        )
+        pair_tickers[(negotiation_code, market_type)] = ticker_code
+        if market_type == OPTIONS_CODE:
+            options.add(ticker_code)
+
+    row_tickers = list(
+        map(pair_tickers.__getitem__, zip(negotiation_codes, market_types))
+    )
+
+    # The average cost of each ticker only depends on the order of its
+    # own trades, so one stable sort by date, buys first, serves them all.
+    date_actions = list(map(add, map(add, dates, dates), actions))
+    order = sorted(range(len(dates)), key=date_actions.__getitem__)
+
+    quantities = [0] * len(tickers)
+    costs = [0] * len(tickers)
+    realized_profits = [0] * len(tickers)
+    for ticker_code, action, amount, total_price in zip(
+        map(row_tickers.__getitem__, order),
+        map(actions.__getitem__, order),
+        map(unit_amounts.__getitem__, order),
+        map(total_prices.__getitem__, order)
+    ):
+        quantity = quantities[ticker_code]
+        is_sell = action == SELL_CODE
+
+        # Sells close long positions and buys cover short ones.
+        closed_amount = min(amount, max(quantity if is_sell else -quantity, 0))
+        if closed_amount:
+            closed_cost = _prorate(
+                costs[ticker_code], closed_amount, abs(quantity)
+            )
+            closed_price = _prorate(total_price, closed_amount, amount)
+            realized_profits[ticker_code] += (
+                closed_price - closed_cost
+                if is_sell
+                else -closed_cost - closed_price
+            )
+            costs[ticker_code] -= closed_cost
+            total_price -= closed_price
+
+        # Whatever is left opens or grows a position in the trade direction.
+        if is_sell:
+            costs[ticker_code] -= total_price
+            quantities[ticker_code] = quantity - amount
+        else:
+            costs[ticker_code] += total_price
+            quantities[ticker_code] = quantity + amount
+
+    return [
+        AssetPosition(
+            ticker=ticker,
+            market_type=(
+                BrokerAssetExtractMarketType.OPTIONS.value
+                if ticker_code in options
+                else BrokerAssetExtractMarketType.UNIT.value
+            ),
+            quantity=quantities[ticker_code],
+            average_price=(
+                (
+                    cents_to_decimal(costs[ticker_code])
+                    / quantities[ticker_code]
+                ).quantize(AVERAGE_PRICE_EXPONENT)
+                if quantities[ticker_code]
+                else AVERAGE_PRICE_EXPONENT * 0
+            ),
+            total_cost=cents_to_decimal(costs[ticker_code]),
+            realized_profit=cents_to_decimal(realized_profits[ticker_code])
+        )
+        for ticker_code, ticker in enumerate(tickers)
+    ]
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+RETRY_EXCEPTIONS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class RetryPolicy():
+    """
+    Retry failed requests with full jitter exponential backoff.
+
+    Only idempotent requests are retried: the HTTP idempotent methods and
+    the requests explicitly flagged as such, like the CEI query postbacks.
+    """
+
+    def __init__(
+        self,
+        max_attempts=3,
+        backoff_base=0.5,
+        backoff_max=10,
+        timeout=60,
+        retry_statuses=RETRY_STATUSES,
+        retry_exceptions=RETRY_EXCEPTIONS
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_exceptions = tuple(retry_exceptions)
+
+    def is_idempotent(self, method, idempotent=None):
+        if idempotent is not None:
+            return idempotent
+
+        return method.upper() in IDEMPOTENT_METHODS
+
+    def is_retryable_response(self, response):
+        return response.status in self.retry_statuses
+
+    def backoff(self, attempt, response=None):
+        """ Seconds to wait before the next attempt. """
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        )
+
+    @staticmethod
+    def _retry_after(response):
+        if response is None:
+            return None
+
+        try:
+            return float(response.headers['Retry-After'])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+    async def call(self, request_function, retryable=True, on_retry=None):
+        """
+        Await `request_function()` until it returns a non retryable
+        response, raises a non retryable error or the attempts run out.
+        The last response is returned even if its status is retryable.
+        `on_retry(reason)` is called before each new attempt with the
+        failed status or the error class name.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            response = None
+            try:
+                response = await request_function()
+            except self.retry_exceptions as e:
+                if not retryable or attempt >= self.max_attempts:
+                    raise
+
+                logger.warning(
+                    f'RetryPolicy request failed - attempt: {attempt} '
+                    f'error: {e!r}'
+                )
+                reason = type(e).__name__
+            else:
+                if (
+                    not retryable or
+                    attempt >= self.max_attempts or
+                    not self.is_retryable_response(response)
+                ):
+                    return response
+
+                logger.warning(
+                    f'RetryPolicy request failed - attempt: {attempt} '
+                    f'status: {response.status}'
+                )
+                reason = response.status
+
+            if on_retry:
+                on_retry(reason)
+
+            await asyncio.sleep(self.backoff(attempt, response))
+
+
+class _HostConcurrency():
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.latency = None
+        self.decreased_at = 0
+        self.condition = asyncio.Condition()
+
+    def available(self):
+        return self.in_flight < int(self.limit)
+
+
+class ConcurrencyPermit():
+
+    def __init__(self):
+        self.overloaded = False
+
+    def drop(self):
+        """ Mark the request as a sign of overload, like a 503 or 429. """
+        self.overloaded = True
+
+
+class AdaptiveConcurrencyLimiter():
+    """
+    AIMD concurrency limit per host.
+
+    Every successful request grows the limit by `increase / limit`, about
+    `increase` per round of requests. Errors, timeouts, dropped permits and
+    latencies above `latency_tolerance` times the average multiply it by
+    `decrease_factor`, at most once per round of in flight requests.
+    """
+
+    def __init__(
+        self,
+        initial_limit=4,
+        min_limit=1,
+        max_limit=64,
+        increase=1,
+        decrease_factor=0.5,
+        latency_tolerance=2.0,
+        latency_smoothing=0.1
+    ):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_smoothing = latency_smoothing
+        self._hosts = {}
+
+    def _host(self, host):
+        host_concurrency = self._hosts.get(host)
+        if host_concurrency is None:
+            host_concurrency = self._hosts[host] = _HostConcurrency(
+                self.initial_limit
+            )
+
+        return host_concurrency
+
+    def current_limit(self, host):
+        return int(self._host(host).limit)
+
+    @asynccontextmanager
+    async def acquire(self, host):
+        """ Hold one of the host slots while the request runs. """
+        host_concurrency = self._host(host)
+        async with host_concurrency.condition:
+            await host_concurrency.condition.wait_for(
+                host_concurrency.available
+            )
+            host_concurrency.in_flight += 1
+
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        permit = ConcurrencyPermit()
+        try:
+            yield permit
+        except Exception:
+            self._decrease(host_concurrency, started_at, loop.time())
+            raise
+        else:
+            if permit.overloaded:
+                self._decrease(host_concurrency, started_at, loop.time())
+            else:
+                self._on_success(
+                    host_concurrency, started_at, loop.time() - started_at
+                )
+        finally:
+            async with host_concurrency.condition:
+                host_concurrency.in_flight -= 1
+                host_concurrency.condition.notify_all()
+
+    def _on_success(self, host_concurrency, started_at, latency):
+        average = host_concurrency.latency
+        if average is None:
+            host_concurrency.latency = latency
+        else:
+            host_concurrency.latency = average + self.latency_smoothing * (
+                latency - average
+            )
+
+        if average and latency > average * self.latency_tolerance:
+            self._decrease(host_concurrency, started_at, started_at + latency)
+            return
+
+        host_concurrency.limit = min(
+            self.max_limit,
+            host_concurrency.limit + self.increase / host_concurrency.limit
+        )
+
+    def _decrease(self, host_concurrency, started_at, now):
+        # Requests started before the last decrease belong to the round
+        # already punished for the overload.
+        if started_at < host_concurrency.decreased_at:
+            return
+
+        host_concurrency.limit = max(
+            self.min_limit, host_concurrency.limit * self.decrease_factor
+        )
+        host_concurrency.decreased_at = now
+        logger.info(
+            f'AdaptiveConcurrencyLimiter decreased limit - '
+            f'limit: {int(host_concurrency.limit)}'
+        )
@@ -1,78 +1,198 @@
 import logging
 
-from bs4 import BeautifulSoup
-
+from bolsa.async_postback import is_async_postback, parse_async_postback
+from bolsa.columnar import AssetExtractBatchBuilder
+from bolsa.decoders import DEFAULT_ROW_DECODER
+from bolsa.executors import ParseExecutor
+from bolsa.form_state import FORM_STATE_INPUT_IDS
+from bolsa.instrumentation import Instrumentation
 from bolsa.models import (
     Broker,
     BrokerAccount,
     BrokerAccountParseExtraData,
-    BrokerAssetExtract,
     BrokerParseExtraData
 )
+from bolsa.parsers import StreamingHTMLExtractor
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HTML_EXTRACTOR = StreamingHTMLExtractor()
+DEFAULT_PARSE_EXECUTOR = ParseExecutor()
+DEFAULT_INSTRUMENTATION = Instrumentation()
+
+
+def extract_page(
+    html_extractor,
+    body,
+    encoding,
+    input_ids=(),
+    select_ids=(),
+    table_ids=(),
+    element_ids=()
+):
+    """
+    Extract the target elements from a full page or, for async postbacks,
+    only from the update panels that contain them.
+    """
+    if not is_async_postback(body):
+        return html_extractor.extract(
+            body,
+            input_ids=input_ids,
+            select_ids=select_ids,
+            table_ids=table_ids,
+            element_ids=element_ids,
+            encoding=encoding
+        )
 
-class GetBrokersResponse():
-    BROKERS_SELECT_ID = 'ctl00_ContentPlaceHolder1_ddlAgentes'
-    DEFAULT_INVALID_BROKER_VALUE = '-1'
+    delta = parse_async_postback(body.decode(encoding, errors='replace'))
+    panels = delta.panels_containing(
+        input_ids + select_ids + table_ids + element_ids
+    )
+    page = html_extractor.extract(
+        ''.join(panels),
+        input_ids=input_ids,
+        select_ids=select_ids,
+        table_ids=table_ids,
+        element_ids=element_ids
+    )
+    page.inputs.update(
+        (input_id, delta.hidden_fields[input_id])
+        for input_id in input_ids
+        if input_id in delta.hidden_fields
+    )
+
+    return page
+
+
+class B3Response():
+    """
+    Parsing happens in classmethods that only receive the raw body, so
+    they can be shipped to a thread or process `ParseExecutor`. Those that
+    parse a form also return its hidden fields, kept in `form_state`.
+    """
 
-    def __init__(self, response):
+    def __init__(
+        self,
+        response,
+        html_extractor=None,
+        parse_executor=None,
+        form_state=None,
+        instrumentation=None
+    ):
         self.response = response
+        self.html_extractor = html_extractor or DEFAULT_HTML_EXTRACTOR
+        self.parse_executor = parse_executor or DEFAULT_PARSE_EXECUTOR
+        self.form_state = form_state
+        self.instrumentation = instrumentation or DEFAULT_INSTRUMENTATION
+
+    async def _parse(self, parse_function, *args):
+        body = await self.response.read()
+
+        with self.instrumentation.timer(
+            'bolsa_parse_seconds', response=type(self).__name__
+        ):
+            return await self.parse_executor.run(
+                parse_function,
+                body,
+                self.response.get_encoding(),
+                self.html_extractor,
+                *args
+            )
+
+    async def _parse_form(self, parse_function, *args):
+        data, form_fields = await self._parse(parse_function, *args)
+        if self.form_state is not None:
+            self.form_state.update(form_fields)
+
+        return data
+
+
+class GetBrokersResponse(B3Response):
+    BROKERS_SELECT_ID = 'ctl00_ContentPlaceHolder1_ddlAgentes'
+    START_DATE_INPUT_ID = 'ctl00_ContentPlaceHolder1_txtDataDeBolsa'
+    END_DATE_INPUT_ID = 'ctl00_ContentPlaceHolder1_txtDataAteBolsa'
+    DEFAULT_INVALID_BROKER_VALUE = '-1'
 
     async def data(self):
-        html = await self.response.text()
-        return self._parse_get_brokers(html)
-
-    def _parse_get_brokers(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        brokers_select = soup.find('select', id=self.BROKERS_SELECT_ID)
-        brokers_option = brokers_select.find_all('option')
-
-        start_date = soup.find(
-            id='ctl00_ContentPlaceHolder1_txtDataDeBolsa'
-        )['value']
-        end_date = soup.find(
-            id='ctl00_ContentPlaceHolder1_txtDataAteBolsa'
-        )['value']
-
-        return [
+        return await self._parse_form(self._parse_get_brokers)
+
+    @classmethod
+    def _parse_get_brokers(cls, body, encoding, html_extractor):
+        page = extract_page(
+            html_extractor,
+            body,
+            encoding,
+            input_ids=(
+                cls.START_DATE_INPUT_ID,
+                cls.END_DATE_INPUT_ID,
+                *FORM_STATE_INPUT_IDS
+            ),
+            select_ids=(cls.BROKERS_SELECT_ID,)
+        )
+        brokers_option = page.selects.get(cls.BROKERS_SELECT_ID, [])
+
+        start_date = page.inputs[cls.START_DATE_INPUT_ID]
+        end_date = page.inputs[cls.END_DATE_INPUT_ID]
+
+        brokers = [
             Broker(
-                name=broker_option.text,
-                value=broker_option['value'],
+                name=name,
+                value=value,
                 parse_extra_data=BrokerParseExtraData(start_date, end_date)
             )
-            for broker_option in brokers_option
-            if broker_option['value'] != self.DEFAULT_INVALID_BROKER_VALUE
+            for value, name in brokers_option
+            if value != cls.DEFAULT_INVALID_BROKER_VALUE
         ]
 
+        return brokers, page.inputs
 
-class GetBrokerAccountResponse():
+
+class GetBrokerAccountResponse(B3Response):
     ACCOUNT_SELECT_ID = 'ctl00_ContentPlaceHolder1_ddlContas'
     BROKERS_SELECT_ID = 'ctl00_ContentPlaceHolder1_ddlAgentes'
 
-    def __init__(self, response, broker):
-        self.response = response
+    def __init__(
+        self,
+        response,
+        broker,
+        html_extractor=None,
+        parse_executor=None,
+        form_state=None,
+        instrumentation=None
+    ):
+        super().__init__(
+            response,
+            html_extractor,
+            parse_executor,
+            form_state,
+            instrumentation
+        )
         self.broker = broker
 
     async def data(self):
-        html = await self.response.text()
-
-        self.broker.accounts = self._parse_get_accounts(html)
+        self.broker.accounts = await self._parse_form(
+            self._parse_get_accounts
+        )
 
         return self.broker
 
-    def _parse_get_accounts(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        brokers_select = soup.find('select', id=self.ACCOUNT_SELECT_ID)
-        if not brokers_select:
-            return []
+    @classmethod
+    def _parse_get_accounts(cls, body, encoding, html_extractor):
+        page = extract_page(
+            html_extractor,
+            body,
+            encoding,
+            input_ids=FORM_STATE_INPUT_IDS,
+            select_ids=(cls.ACCOUNT_SELECT_ID,)
+        )
+        if cls.ACCOUNT_SELECT_ID not in page.selects:
+            return [], page.inputs
 
-        brokers_option = brokers_select.find_all('option')
+        brokers_option = page.selects[cls.ACCOUNT_SELECT_ID]
 
-        view_state = soup.find(id='__VIEWSTATE')['value']
-        view_state_generator = soup.find(id='__VIEWSTATEGENERATOR')['value']
-        event_validation = soup.find(id='__EVENTVALIDATION')['value']
+        view_state = page.inputs['__VIEWSTATE']
+        view_state_generator = page.inputs['__VIEWSTATEGENERATOR']
+        event_validation = page.inputs['__EVENTVALIDATION']
 
         parse_extra_data = BrokerAccountParseExtraData(
             view_state=view_state,
@@ -80,62 +200,61 @@ class GetBrokerAccountResponse():
             event_validation=event_validation,
         )
 
-        return [
+        accounts = [
             BrokerAccount(
-                id=broker_option['value'],
+                id=value,
                 parse_extra_data=parse_extra_data
             )
-            for broker_option in brokers_option
+            for value, _ in brokers_option
         ]
 
+        return accounts, page.inputs
+
 
-class GetBrokerAccountAssetExtractResponse:
+class GetBrokerAccountAssetExtractResponse(B3Response):
     ASSETS_TABLE_ID = (
         'ctl00_ContentPlaceHolder1_rptAgenteBolsa_ctl00_rptContaBolsa_ctl00_'
         'pnAtivosNegociados'
     )
 
-    def __init__(self, response, broker_value):
-        self.response = response
+    def __init__(
+        self,
+        response,
+        broker_value,
+        html_extractor=None,
+        parse_executor=None,
+        columnar=False,
+        row_decoder=None,
+        instrumentation=None
+    ):
+        super().__init__(
+            response,
+            html_extractor,
+            parse_executor,
+            instrumentation=instrumentation
+        )
         self.broker_value = broker_value
+        self.columnar = columnar
+        self.row_decoder = row_decoder or DEFAULT_ROW_DECODER
 
     async def data(self):
-        html = await self.response.text()
-
-        assets_extract = await self._parse_get_assets_extract(html)
-        return assets_extract
-
-    async def _parse_get_assets_extract(self, html):
-        assets_extract = []
-        soup = BeautifulSoup(html, 'html.parser')
-        assets_table = soup.find(id=self.ASSETS_TABLE_ID)
-
         logger.debug(
             f'GetBrokerAccountAssetExtractResponse start parsing asset extract'
             f' - broker value: {self.broker_value}'
         )
 
-        if not assets_table:
-            return assets_extract
-
-        table_body = assets_table.find('tbody')
-        rows = table_body.find_all('tr')
-        for row in rows:
-            operation_date, action, market_type, _, raw_negotiation_code, asset_specification, unit_amount, unit_price, total_price, quotation_factor = row.find_all(  # NOQA
-                'td'
+        if self.columnar:
+            assets_extract = await self._parse(
+                self._parse_get_assets_extract_batch
             )
-            asset_extract = BrokerAssetExtract.create_from_response_fields(
-                operation_date=operation_date.get_text(strip=True),
-                action=action.get_text(strip=True),
-                market_type=market_type.get_text(strip=True),
-                raw_negotiation_code=raw_negotiation_code.get_text(strip=True),
-                asset_specification=asset_specification.get_text(strip=True),
-                unit_amount=unit_amount.get_text(strip=True),
-                unit_price=unit_price.get_text(strip=True),
-                total_price=total_price.get_text(strip=True),
-                quotation_factor=quotation_factor.get_text(strip=True)
+        else:
+            assets_extract = await self._parse(
+                self._parse_get_assets_extract,
+                self.row_decoder
             )
-            assets_extract.append(asset_extract)
+        self.instrumentation.increment(
+            'bolsa_parsed_rows_total', len(assets_extract)
+        )
 
         logger.debug(
             f'GetBrokerAccountAssetExtractResponse end parsing asset extract '
@@ -143,3 +262,44 @@ class GetBrokerAccountAssetExtractResponse:
         )
 
         return assets_extract
+
+    @classmethod
+    def _get_assets_rows(cls, body, encoding, html_extractor):
+        page = extract_page(
+            html_extractor,
+            body,
+            encoding,
+            table_ids=(cls.ASSETS_TABLE_ID,)
+        )
+        return page.tables.get(cls.ASSETS_TABLE_ID, [])
+
+    @classmethod
+    def _parse_get_assets_extract_batch(cls, body, encoding, html_extractor):
+        builder = AssetExtractBatchBuilder()
+        for row in cls._get_assets_rows(body, encoding, html_extractor):
+            operation_date, action, market_type, _, raw_negotiation_code, asset_specification, unit_amount, unit_price, total_price, quotation_factor = row  # NOQA
+            builder.append_response_fields(
+                operation_date=operation_date,
+                action=action,
+                market_type=market_type,
+                raw_negotiation_code=raw_negotiation_code,
+                asset_specification=asset_specification,
+                unit_amount=unit_amount,
+                unit_price=unit_price,
+                total_price=total_price,
+                quotation_factor=quotation_factor
+            )
+
+        return builder.build()
+
+    @classmethod
+    def _parse_get_assets_extract(
+        cls,
+        body,
+        encoding,
+        html_extractor,
+        row_decoder
+    ):
+        return row_decoder.decode_rows(
+            cls._get_assets_rows(body, encoding, html_extractor)
+        )
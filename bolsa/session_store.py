@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from functools import partial
+from http.cookies import SimpleCookie
+
+from yarl import URL
+
+
+def dump_cookies(cookie_jar):
+    """ Serialize every cookie of an aiohttp cookie jar. """
+    return [morsel.OutputString() for morsel in cookie_jar]
+
+
+def load_cookies(cookie_jar, cookies, url):
+    """ Load cookies serialized by `dump_cookies` into a cookie jar. """
+    simple_cookie = SimpleCookie()
+    for cookie in cookies:
+        simple_cookie.load(cookie)
+
+    cookie_jar.update_cookies(simple_cookie, response_url=URL(url))
+
+
+def username_key(username):
+    """
+    Storage key of a username. Usernames are CPF/CNPJ numbers, so they
+    are never stored in clear.
+    """
+    return hashlib.sha256(username.encode()).hexdigest()
+
+
+async def _run_blocking(function, *args):
+    """ Run blocking I/O in the loop default executor. """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(function, *args))
+
+
+class SessionStoreInterface(metaclass=ABCMeta):
+
+    @abstractmethod
+    async def load(self, username):
+        """ Return the saved cookies of `username` or None. """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save(self, username, cookies):
+        """ Save the cookies of `username`. """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, username):
+        """ Forget the cookies of `username`. """
+        raise NotImplementedError
+
+
+class FileSessionStore(SessionStoreInterface):
+    """
+    Keep one JSON file per username inside `directory`. File access runs
+    in the loop default executor.
+    """
+
+    def __init__(self, directory, ttl=1800):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, username):
+        return os.path.join(self.directory, f'{username_key(username)}.json')
+
+    def _load(self, username):
+        try:
+            with open(self._path(username)) as session_file:
+                session = json.load(session_file)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - session['saved_at'] > self.ttl:
+            self._delete(username)
+            return None
+
+        return session['cookies']
+
+    def _save(self, username, cookies):
+        session = {'saved_at': time.time(), 'cookies': cookies}
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(file_descriptor, 'w') as session_file:
+            json.dump(session, session_file)
+
+        os.replace(temp_path, self._path(username))
+
+    def _delete(self, username):
+        try:
+            os.remove(self._path(username))
+        except FileNotFoundError:
+            pass
+
+    async def load(self, username):
+        return await _run_blocking(self._load, username)
+
+    async def save(self, username, cookies):
+        await _run_blocking(self._save, username, cookies)
+
+    async def delete(self, username):
+        await _run_blocking(self._delete, username)
+
+
+class SQLiteSessionStore(SessionStoreInterface):
+    """
+    Keep every username session in a single SQLite database. Queries run
+    in the loop default executor, one at a time.
+    """
+
+    def __init__(self, path, ttl=1800):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'username_key TEXT PRIMARY KEY, '
+            'cookies TEXT NOT NULL, '
+            'saved_at REAL NOT NULL)'
+        )
+        self._connection.commit()
+
+    def _load(self, username):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT cookies, saved_at FROM sessions '
+                'WHERE username_key = ?',
+                (username_key(username),)
+            ).fetchone()
+        if not row:
+            return None
+
+        cookies, saved_at = row
+        if time.time() - saved_at > self.ttl:
+            self._delete(username)
+            return None
+
+        return json.loads(cookies)
+
+    def _save(self, username, cookies):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sessions '
+                '(username_key, cookies, saved_at) VALUES (?, ?, ?)',
+                (username_key(username), json.dumps(cookies), time.time())
+            )
+            self._connection.commit()
+
+    def _delete(self, username):
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM sessions WHERE username_key = ?',
+                (username_key(username),)
+            )
+            self._connection.commit()
+
+    async def load(self, username):
+        return await _run_blocking(self._load, username)
+
+    async def save(self, username, cookies):
+        await _run_blocking(self._save, username, cookies)
+
+    async def delete(self, username):
+        await _run_blocking(self._delete, username)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,172 @@
+"""
+Streaming writers of `BrokerAssetExtract` rows, one row per asset with the
+user, broker and account it belongs to.
+
+Rows are buffered up to `buffer_size` and then written, so exporting many
+users never holds more than one buffer and the account being written.
+"""
+import csv
+import json
+from abc import ABCMeta, abstractmethod
+
+from bolsa.constants import enum_value
+from bolsa.models import prices_in_decimal
+
+FIELDS = (
+    'username',
+    'broker_value',
+    'broker_name',
+    'account_id',
+    'operation_date',
+    'action',
+    'market_type',
+    'raw_negotiation_code',
+    'asset_specification',
+    'unit_amount',
+    'unit_price',
+    'total_price',
+    'quotation_factor',
+)
+
+
+def asset_extract_records(result):
+    """ Flatten an `UserAccountAssetsExtractResult` into row dicts. """
+    for asset_extract in result.assets_extract:
+        unit_price, total_price = prices_in_decimal(asset_extract)
+        yield {
+            'username': result.username,
+            'broker_value': result.broker.value,
+            'broker_name': result.broker.name,
+            'account_id': result.account.id,
+            'operation_date': asset_extract.operation_date,
+            'action': enum_value(asset_extract.action),
+            'market_type': enum_value(asset_extract.market_type),
+            'raw_negotiation_code': asset_extract.raw_negotiation_code,
+            'asset_specification': asset_extract.asset_specification,
+            'unit_amount': asset_extract.unit_amount,
+            'unit_price': unit_price,
+            'total_price': total_price,
+            'quotation_factor': asset_extract.quotation_factor,
+        }
+
+
+class AssetExtractSink(metaclass=ABCMeta):
+    """ Buffer rows and hand them to `_write_rows` in batches. """
+
+    def __init__(self, path, buffer_size=10000):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.rows_count = 0
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, result):
+        """ Add the rows of an `UserAccountAssetsExtractResult`. """
+        for record in asset_extract_records(result):
+            self._buffer.append(record)
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+
+        self._write_rows(self._buffer)
+        self.rows_count += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    @abstractmethod
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+    @abstractmethod
+    def _close(self):
+        raise NotImplementedError
+
+
+class CSVSink(AssetExtractSink):
+
+    def __init__(self, path, buffer_size=10000):
+        super().__init__(path, buffer_size)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLinesSink(AssetExtractSink):
+    """ One JSON object per line, with dates and prices as strings. """
+
+    def __init__(self, path, buffer_size=10000):
+        super().__init__(path, buffer_size)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write_rows(self, rows):
+        self._file.writelines(
+            json.dumps(row, ensure_ascii=False, default=str) + '\n'
+            for row in rows
+        )
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetSink(AssetExtractSink):
+    """ Every flushed buffer becomes a row group of the Parquet file. """
+
+    def __init__(self, path, buffer_size=10000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('ParquetSink requires pyarrow to be installed')
+
+        super().__init__(path, buffer_size)
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([
+            ('username', pyarrow.string()),
+            ('broker_value', pyarrow.string()),
+            ('broker_name', pyarrow.string()),
+            ('account_id', pyarrow.string()),
+            ('operation_date', pyarrow.date32()),
+            ('action', pyarrow.string()),
+            ('market_type', pyarrow.string()),
+            ('raw_negotiation_code', pyarrow.string()),
+            ('asset_specification', pyarrow.string()),
+            ('unit_amount', pyarrow.int64()),
+            ('unit_price', pyarrow.decimal128(18, 2)),
+            ('total_price', pyarrow.decimal128(18, 2)),
+            ('quotation_factor', pyarrow.int64()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def _write_rows(self, rows):
+        # Table.from_pylist needs pyarrow 7, columns work since pyarrow 1.
+        columns = {name: [row[name] for row in rows] for name in FIELDS}
+        self._writer.write_table(
+            self._pyarrow.Table.from_pydict(columns, schema=self._schema)
+        )
+
+    def _close(self):
+        self._writer.close()
+
+
+SINKS = {
+    'csv': CSVSink,
+    'jsonl': JSONLinesSink,
+    'parquet': ParquetSink,
+}
@@ -0,0 +1,187 @@
+import sqlite3
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+from bolsa.constants import enum_value
+from bolsa.models import BrokerAssetExtract, prices_in_decimal
+from bolsa.session_store import username_key
+
+ASSETS_EXTRACT_COLUMNS = (
+    'operation_date',
+    'action',
+    'market_type',
+    'raw_negotiation_code',
+    'asset_specification',
+    'unit_amount',
+    'unit_price',
+    'total_price',
+    'quotation_factor',
+)
+
+CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS assets_extract (
+    username_key TEXT NOT NULL,
+    broker_value TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    operation_date TEXT NOT NULL,
+    action TEXT NOT NULL,
+    market_type TEXT NOT NULL,
+    raw_negotiation_code TEXT NOT NULL,
+    asset_specification TEXT NOT NULL,
+    unit_amount INTEGER NOT NULL,
+    unit_price TEXT NOT NULL,
+    total_price TEXT NOT NULL,
+    quotation_factor INTEGER NOT NULL,
+    occurrence INTEGER NOT NULL
+)
+'''
+
+CREATE_INDEXES = (
+    'CREATE UNIQUE INDEX IF NOT EXISTS assets_extract_natural_key '
+    'ON assets_extract (username_key, broker_value, account_id, '
+    'operation_date, action, market_type, raw_negotiation_code, '
+    'asset_specification, unit_amount, unit_price, total_price, '
+    'quotation_factor, occurrence)',
+    'CREATE INDEX IF NOT EXISTS assets_extract_negotiation_code '
+    'ON assets_extract (raw_negotiation_code, operation_date)',
+    'CREATE INDEX IF NOT EXISTS assets_extract_operation_date '
+    'ON assets_extract (operation_date)',
+    'CREATE INDEX IF NOT EXISTS assets_extract_broker '
+    'ON assets_extract (broker_value, operation_date)',
+)
+
+INSERT = (
+    'INSERT OR IGNORE INTO assets_extract (username_key, broker_value, '
+    'account_id, operation_date, action, market_type, raw_negotiation_code, '
+    'asset_specification, unit_amount, unit_price, total_price, '
+    'quotation_factor, occurrence) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+class SQLiteTradeStore():
+    """
+    Local history of `BrokerAssetExtract` rows.
+
+    CEI rows have no identifier and the same trade may legitimately happen
+    twice a day, so identical rows of an account are told apart by their
+    `occurrence` inside the ingested batch. Ingesting the same range again
+    is a no-op. Rows are keyed by the hashed username.
+    """
+
+    def __init__(self, path=':memory:', batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        with self._connection:
+            self._connection.execute(CREATE_TABLE)
+            for create_index in CREATE_INDEXES:
+                self._connection.execute(create_index)
+
+    @staticmethod
+    def _rows(username, broker_value, account_id, assets_extract):
+        occurrences = Counter()
+        for asset_extract in assets_extract:
+            unit_price, total_price = prices_in_decimal(asset_extract)
+            fields = (
+                asset_extract.operation_date.isoformat(),
+                enum_value(asset_extract.action),
+                enum_value(asset_extract.market_type),
+                asset_extract.raw_negotiation_code,
+                asset_extract.asset_specification,
+                asset_extract.unit_amount,
+                str(unit_price),
+                str(total_price),
+                asset_extract.quotation_factor,
+            )
+            occurrences[fields] += 1
+
+            yield (
+                (username_key(username), broker_value, account_id)
+                + fields
+                + (occurrences[fields],)
+            )
+
+    def add_assets_extract(
+        self,
+        username,
+        broker_value,
+        account_id,
+        assets_extract
+    ):
+        """ Insert rows of an account, returning how many were new. """
+        rows = self._rows(username, broker_value, account_id, assets_extract)
+        total_changes = self._connection.total_changes
+
+        with self._connection:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == self.batch_size:
+                    self._connection.executemany(INSERT, batch)
+                    batch = []
+
+            if batch:
+                self._connection.executemany(INSERT, batch)
+
+        return self._connection.total_changes - total_changes
+
+    def query(
+        self,
+        raw_negotiation_code=None,
+        start_date=None,
+        end_date=None,
+        broker_value=None,
+        username=None,
+        account_id=None
+    ):
+        """ Return the stored rows matching every given filter. """
+        filters = []
+        parameters = []
+        for column, operator, value in (
+            ('raw_negotiation_code', '=', raw_negotiation_code),
+            ('operation_date', '>=', start_date and start_date.isoformat()),
+            ('operation_date', '<=', end_date and end_date.isoformat()),
+            ('broker_value', '=', broker_value),
+            ('username_key', '=', username and username_key(username)),
+            ('account_id', '=', account_id),
+        ):
+            if value is not None:
+                filters.append(f'{column} {operator} ?')
+                parameters.append(value)
+
+        where = f' WHERE {" AND ".join(filters)}' if filters else ''
+        cursor = self._connection.execute(
+            f'SELECT {", ".join(ASSETS_EXTRACT_COLUMNS)} FROM assets_extract'
+            f'{where} ORDER BY operation_date, rowid',
+            parameters
+        )
+
+        return [
+            BrokerAssetExtract(
+                operation_date=date.fromisoformat(operation_date),
+                action=action,
+                market_type=market_type,
+                raw_negotiation_code=raw_negotiation_code,
+                asset_specification=asset_specification,
+                unit_amount=unit_amount,
+                unit_price=Decimal(unit_price),
+                total_price=Decimal(total_price),
+                quotation_factor=quotation_factor
+            )
+            for (
+                operation_date,
+                action,
+                market_type,
+                raw_negotiation_code,
+                asset_specification,
+                unit_amount,
+                unit_price,
+                total_price,
+                quotation_factor
+            ) in cursor
+        ]
+
+    def close(self):
+        self._connection.close()
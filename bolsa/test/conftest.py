@@ -0,0 +1,36 @@
+import pytest
+
+from bolsa.backend import B3AsyncBackend
+from bolsa.connector import B3HttpClientConnector
+from bolsa.testing.fake_cei import FakeCEIServer
+
+
+@pytest.fixture
+async def fake_cei():
+    server = FakeCEIServer(rows=20)
+    await server.start()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def create_backend(fake_cei):
+    backends = []
+
+    def create_backend(captcha_service=None, **kwargs):
+        backend = B3AsyncBackend(
+            username='username',
+            password='password',
+            captcha_service=captcha_service,
+            connector_manager=B3HttpClientConnector(),
+            base_url=fake_cei.base_url,
+            **kwargs
+        )
+        backends.append(backend)
+        return backend
+
+    yield create_backend
+
+    for backend in backends:
+        await backend.session_close()
+        await backend.connection_close()
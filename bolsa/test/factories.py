@@ -0,0 +1,44 @@
+from datetime import date
+from decimal import Decimal
+
+from bolsa.models import (
+    Broker,
+    BrokerAccount,
+    BrokerAccountParseExtraData,
+    BrokerAssetExtract,
+    BrokerParseExtraData
+)
+
+
+def create_broker(value, accounts_ids=('1',)):
+    parse_extra_data = BrokerAccountParseExtraData(
+        view_state='view-state',
+        view_state_generator='generator',
+        event_validation='event-validation'
+    )
+    return Broker(
+        value=value,
+        name=f'{value} - CORRETORA',
+        parse_extra_data=BrokerParseExtraData('15/03/2019', '04/09/2020'),
+        accounts=[
+            BrokerAccount(id=account_id, parse_extra_data=parse_extra_data)
+            for account_id in accounts_ids
+        ]
+    )
+
+
+def create_asset_extract(
+    operation_date=date(2020, 9, 4),
+    raw_negotiation_code='PETR4'
+):
+    return BrokerAssetExtract(
+        operation_date=operation_date,
+        action='buy',
+        market_type='unit',
+        raw_negotiation_code=raw_negotiation_code,
+        asset_specification='PETROBRAS   PN',
+        unit_amount=100,
+        unit_price=Decimal('21.09'),
+        total_price=Decimal('2109.00'),
+        quotation_factor=1
+    )
@@ -0,0 +1,63 @@
+import pytest
+
+from bolsa.async_postback import is_async_postback, parse_async_postback
+from bolsa.exceptions import AsyncPostbackParseException
+
+
+def build_delta(*entries):
+    return ''.join(
+        f'{len(content)}|{entry_type}|{entry_id}|{content}|'
+        for entry_type, entry_id, content in entries
+    )
+
+
+class TestParseAsyncPostback:
+
+    async def test_split_panels_hidden_fields_and_entries(self):
+        text = build_delta(
+            ('updatePanel', 'ctl00_updFiltro', '<select>|a|</select>'),
+            ('hiddenField', '__VIEWSTATE', '/wEPDw=='),
+            ('hiddenField', '__EVENTVALIDATION', '/wEdAA=='),
+            ('asyncPostBackControlIDs', '', ''),
+            ('pageTitle', '', 'Negociação')
+        )
+
+        delta = parse_async_postback(text)
+
+        assert delta.panels == {'ctl00_updFiltro': '<select>|a|</select>'}
+        assert delta.hidden_fields == {
+            '__VIEWSTATE': '/wEPDw==',
+            '__EVENTVALIDATION': '/wEdAA==',
+        }
+        assert delta.entries == [
+            ('asyncPostBackControlIDs', '', ''),
+            ('pageTitle', '', 'Negociação'),
+        ]
+
+    async def test_panels_containing(self):
+        delta = parse_async_postback(build_delta(
+            ('updatePanel', 'first', '<select id="ddlContas"></select>'),
+            ('updatePanel', 'second', '<table id="other"></table>')
+        ))
+
+        assert delta.panels_containing(('ddlContas',)) == [
+            '<select id="ddlContas"></select>'
+        ]
+
+    @pytest.mark.parametrize('text', [
+        '10|updatePanel|id|short|',
+        'x|updatePanel|id||',
+        '5|updatePanel',
+    ])
+    async def test_malformed_delta_raises(self, text):
+        with pytest.raises(AsyncPostbackParseException):
+            parse_async_postback(text)
+
+    @pytest.mark.parametrize('body, expected', [
+        (b'1|#||4|', True),
+        ('123|updatePanel|id|', True),
+        (b'<html></html>', False),
+        (b'\r\n<!DOCTYPE html>', False),
+    ])
+    async def test_is_async_postback(self, body, expected):
+        assert is_async_postback(body) is expected
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+from bolsa.backend import B3AsyncBackend
+from bolsa.cache import DiscoveryCache
+from bolsa.test.factories import create_broker
+
+
+class FakeExtractBackend(B3AsyncBackend):
+    """ Answer each broker extract after `broker_value` hundredths. """
+
+    def __init__(self):
+        super().__init__(
+            username='username',
+            password='password',
+            captcha_service=None
+        )
+        self.requests = []
+
+    async def get_broker_account_portfolio_assets_extract(
+        self,
+        account_id,
+        broker_value,
+        broker_parse_extra_data,
+        account_parse_extra_data,
+        start_date=None
+    ):
+        self.requests.append((broker_value, account_id))
+        if broker_value == '0':
+            raise ValueError('broken broker')
+
+        await asyncio.sleep(int(broker_value) / 100)
+        return [f'{broker_value}-{account_id}']
+
+
+class TestIterPortfolioAssetsExtract:
+
+    async def test_yield_in_completion_order(self):
+        backend = FakeExtractBackend()
+        brokers = [
+            create_broker('3'),
+            create_broker('1'),
+            create_broker('2'),
+            create_broker('4', accounts_ids=())
+        ]
+
+        results = [
+            (broker.value, assets_extract)
+            async for broker, assets_extract in (
+                backend.iter_portfolio_assets_extract(brokers)
+            )
+        ]
+
+        assert results == [('1', ['1-1']), ('2', ['2-1']), ('3', ['3-1'])]
+
+    async def test_broker_error_is_raised(self):
+        backend = FakeExtractBackend()
+        brokers = [create_broker('0'), create_broker('5')]
+
+        with pytest.raises(ValueError):
+            async for _ in backend.iter_portfolio_assets_extract(brokers):
+                pass
+
+
+class TestAccountsPortfolioAssetsExtract:
+
+    async def test_get_every_account_of_every_broker(self):
+        backend = FakeExtractBackend()
+        brokers = [
+            create_broker('1', accounts_ids=('10', '11', '12')),
+            create_broker('2', accounts_ids=('20',)),
+            create_broker('3', accounts_ids=())
+        ]
+
+        results = await backend.get_brokers_accounts_portfolio_assets_extract(
+            brokers
+        )
+
+        assert [
+            (broker.value, account.id, assets_extract)
+            for broker, account, assets_extract in results
+        ] == [
+            ('1', '10', ['1-10']),
+            ('1', '11', ['1-11']),
+            ('1', '12', ['1-12']),
+            ('2', '20', ['2-20']),
+        ]
+
+    async def test_max_concurrency_per_broker(self):
+        backend = FakeExtractBackend()
+        in_flight = []
+        max_in_flight = []
+        get_extract = backend.get_broker_account_portfolio_assets_extract
+
+        async def tracked_get_extract(**kwargs):
+            in_flight.append(kwargs['account_id'])
+            max_in_flight.append(len(in_flight))
+            result = await get_extract(**kwargs)
+            in_flight.remove(kwargs['account_id'])
+            return result
+
+        backend.get_broker_account_portfolio_assets_extract = (
+            tracked_get_extract
+        )
+        brokers = [create_broker('1', accounts_ids=('10', '11', '12', '13'))]
+
+        await backend.get_brokers_accounts_portfolio_assets_extract(
+            brokers,
+            max_concurrency_per_broker=2
+        )
+
+        assert max(max_in_flight) == 2
+
+    async def test_iter_every_account(self):
+        backend = FakeExtractBackend()
+        brokers = [
+            create_broker('2', accounts_ids=('20', '21')),
+            create_broker('1', accounts_ids=('10',))
+        ]
+
+        results = [
+            (broker.value, account.id)
+            async for broker, account, _ in (
+                backend.iter_accounts_portfolio_assets_extract(brokers)
+            )
+        ]
+
+        assert results[0] == ('1', '10')
+        assert sorted(results[1:]) == [('2', '20'), ('2', '21')]
+
+
+class FakeDiscoveryBackend(B3AsyncBackend):
+
+    def __init__(self, discovery_cache):
+        super().__init__(
+            username='username',
+            password='password',
+            captcha_service=None,
+            discovery_cache=discovery_cache
+        )
+        self.requests = 0
+
+    async def get_brokers(self):
+        self.requests += 1
+        return [create_broker('1', accounts_ids=()), create_broker('2')]
+
+    async def get_broker_accounts(self, broker):
+        self.requests += 1
+        broker.accounts = [create_broker(broker.value).accounts[0]]
+        return broker
+
+
+class TestGetBrokersWithAccountsCache:
+
+    async def test_known_username_skips_discovery_requests(self):
+        discovery_cache = DiscoveryCache()
+        backend = FakeDiscoveryBackend(discovery_cache)
+
+        brokers = await backend.get_brokers_with_accounts()
+        cached_brokers = await backend.get_brokers_with_accounts()
+
+        assert cached_brokers == brokers
+        assert backend.requests == 3
+
+        discovery_cache.invalidate('username')
+        await backend.get_brokers_with_accounts()
+        assert backend.requests == 6
@@ -0,0 +1,89 @@
+import time
+
+from bolsa.cache import DiscoveryCache
+from bolsa.test.factories import create_broker
+
+
+class TestDiscoveryCache:
+
+    async def test_get_returns_a_copy_of_the_brokers(self):
+        cache = DiscoveryCache()
+        brokers = [create_broker('3')]
+        cache.set('username', brokers)
+
+        cached_brokers = cache.get('username')
+        cached_brokers[0].accounts.clear()
+
+        assert cache.get('username') == brokers
+        assert cache.get('other username') is None
+
+    async def test_expired_entry_is_dropped(self):
+        cache = DiscoveryCache(ttl=60)
+        cache.set('username', [create_broker('3')])
+        cache.set('expired username', [create_broker('3')], ttl=0)
+
+        assert cache.get('username')
+        assert cache.get('expired username') is None
+        assert len(cache) == 1
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        cache = DiscoveryCache(max_entries=2)
+        cache.set('first', [create_broker('1')])
+        cache.set('second', [create_broker('2')])
+        cache.get('first')
+
+        cache.set('third', [create_broker('3')])
+
+        assert cache.get('second') is None
+        assert cache.get('first')
+        assert cache.get('third')
+
+    async def test_least_recently_used_entries_are_evicted_past_max_bytes(
+        self
+    ):
+        entry_size = DiscoveryCache._entry_size([create_broker('1')])
+        cache = DiscoveryCache(max_bytes=entry_size * 2)
+        cache.set('first', [create_broker('1')])
+        cache.set('second', [create_broker('2')])
+        cache.get('first')
+
+        cache.set('third', [create_broker('3')])
+
+        assert cache.get('second') is None
+        assert cache.get('first')
+        assert cache.get('third')
+        assert cache.size == entry_size * 2
+
+        cache.set('large', [create_broker('4', accounts_ids=('1', '2', '3'))])
+        assert cache.get('large') is None
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    async def test_invalidate(self):
+        cache = DiscoveryCache()
+        cache.set('first', [create_broker('1')])
+        cache.set('second', [create_broker('2')])
+
+        cache.invalidate('first')
+        assert cache.get('first') is None
+        assert cache.get('second')
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    async def test_entries_are_persisted(self, tmp_path):
+        path = str(tmp_path / 'discovery.json')
+        brokers = [create_broker('3', accounts_ids=('1', '2'))]
+        DiscoveryCache(path=path).set('username', brokers)
+
+        with open(path) as cache_file:
+            assert 'username' not in cache_file.read()
+
+        assert DiscoveryCache(path=path).get('username') == brokers
+
+    async def test_expired_persisted_entries_are_not_loaded(self, tmp_path):
+        path = str(tmp_path / 'discovery.json')
+        DiscoveryCache(path=path).set('username', [create_broker('3')], ttl=0)
+        time.sleep(0.001)
+
+        assert len(DiscoveryCache(path=path)) == 0
@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from bolsa.captcha.CaptchaResolverServiceInterface import (
+    CaptchaResolverServiceInterface
+)
+from bolsa.captcha.exceptions.CaptchaResolverException import (
+    CaptchaResolverException
+)
+from bolsa.captcha.services.AsyncTwoCaptchaResolverService import (
+    AsyncTwoCaptchaResolverService
+)
+from bolsa.captcha.services.PrefetchCaptchaResolverService import (
+    PrefetchCaptchaResolverService
+)
+
+SITE_KEY = 'site-key'
+PAGE_URL = 'https://ceiapp.b3.com.br/CEI_Responsivo/login.aspx'
+
+
+def create_solver_app(results, submit_result=None):
+    results = list(results)
+    app = web.Application()
+    app['submitted'] = []
+
+    async def submit(request):
+        app['submitted'].append(dict(request.query))
+        return web.json_response(
+            submit_result or {'status': 1, 'request': 'captcha-id'}
+        )
+
+    async def result(request):
+        assert request.query['id'] == 'captcha-id'
+        return web.json_response(results.pop(0))
+
+    app.router.add_get('/in.php', submit)
+    app.router.add_get('/res.php', result)
+
+    return app
+
+
+def create_resolver(server, **kwargs):
+    return AsyncTwoCaptchaResolverService(
+        'credential',
+        base_url=str(server.make_url('/')),
+        polling_interval=0,
+        initial_delay=0,
+        **kwargs
+    )
+
+
+class TestAsyncTwoCaptchaResolverService:
+
+    async def test_polls_until_solved(self, aiohttp_server):
+        app = create_solver_app([
+            {'status': 0, 'request': 'CAPCHA_NOT_READY'},
+            {'status': 1, 'request': 'token'},
+        ])
+        server = await aiohttp_server(app)
+
+        token = await create_resolver(server).resolve(SITE_KEY, PAGE_URL)
+
+        assert token == 'token'
+        assert app['submitted'] == [{
+            'key': 'credential',
+            'json': '1',
+            'method': 'userrecaptcha',
+            'googlekey': SITE_KEY,
+            'pageurl': PAGE_URL,
+        }]
+
+    async def test_api_error_raises(self, aiohttp_server):
+        app = create_solver_app(
+            [], submit_result={'status': 0, 'request': 'ERROR_WRONG_USER_KEY'}
+        )
+        server = await aiohttp_server(app)
+
+        with pytest.raises(CaptchaResolverException):
+            await create_resolver(server).resolve(SITE_KEY, PAGE_URL)
+
+    async def test_timeout_raises(self, aiohttp_server):
+        app = create_solver_app(
+            [{'status': 0, 'request': 'CAPCHA_NOT_READY'}] * 100
+        )
+        server = await aiohttp_server(app)
+        resolver = create_resolver(server, timeout=0.05)
+        resolver.polling_interval = 0.01
+
+        with pytest.raises(CaptchaResolverException):
+            await resolver.resolve(SITE_KEY, PAGE_URL)
+
+    async def test_resolve_can_be_cancelled(self, aiohttp_server):
+        app = create_solver_app(
+            [{'status': 0, 'request': 'CAPCHA_NOT_READY'}] * 100
+        )
+        server = await aiohttp_server(app)
+        resolver = create_resolver(server)
+        resolver.polling_interval = 0.01
+
+        task = asyncio.ensure_future(resolver.resolve(SITE_KEY, PAGE_URL))
+        await asyncio.sleep(0.02)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+class FakeCaptchaService(CaptchaResolverServiceInterface):
+
+    def __init__(self, delay=0, error=None):
+        self.delay = delay
+        self.error = error
+        self.solves = 0
+
+    async def resolve(self, site_key, url):
+        self.solves += 1
+        token = f'token-{self.solves}'
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+
+        return token
+
+
+class TestPrefetchCaptchaResolverService:
+
+    async def test_start_solves_tokens_ahead_of_demand(self):
+        captcha_service = FakeCaptchaService()
+        resolver = PrefetchCaptchaResolverService(
+            captcha_service, SITE_KEY, PAGE_URL, depth=3
+        )
+
+        resolver.start()
+        await asyncio.sleep(0.01)
+
+        assert captcha_service.solves == 3
+        assert await resolver.resolve(SITE_KEY, PAGE_URL) == 'token-1'
+        await asyncio.sleep(0.01)
+        assert captcha_service.solves == 4
+
+        await resolver.close()
+
+    async def test_prefetched_token_skips_solve_latency(self):
+        resolver = PrefetchCaptchaResolverService(
+            FakeCaptchaService(delay=0.05), SITE_KEY, PAGE_URL, depth=1
+        )
+        resolver.start()
+        await asyncio.sleep(0.06)
+
+        token = await asyncio.wait_for(
+            resolver.resolve(SITE_KEY, PAGE_URL), 0.01
+        )
+
+        assert token == 'token-1'
+        await resolver.close()
+
+    async def test_empty_pool_waits_for_a_solve(self):
+        captcha_service = FakeCaptchaService(delay=0.01)
+        resolver = PrefetchCaptchaResolverService(captcha_service, depth=0)
+
+        tokens = await asyncio.gather(*[
+            resolver.resolve(SITE_KEY, PAGE_URL) for _ in range(3)
+        ])
+
+        assert sorted(tokens) == ['token-1', 'token-2', 'token-3']
+        assert captcha_service.solves == 3
+
+    async def test_expired_tokens_are_discarded(self):
+        captcha_service = FakeCaptchaService()
+        resolver = PrefetchCaptchaResolverService(
+            captcha_service, SITE_KEY, PAGE_URL, depth=1, token_ttl=0.05
+        )
+        resolver.start()
+        await asyncio.sleep(0.07)
+
+        assert await resolver.resolve(SITE_KEY, PAGE_URL) == 'token-2'
+
+        await resolver.close()
+
+    async def test_idle_pool_replaces_expired_tokens(self):
+        captcha_service = FakeCaptchaService()
+        resolver = PrefetchCaptchaResolverService(
+            captcha_service, SITE_KEY, PAGE_URL, depth=2, token_ttl=0.05
+        )
+        resolver.start()
+        await asyncio.sleep(0.07)
+
+        assert captcha_service.solves == 4
+        assert [
+            token for _, token in resolver._pool(SITE_KEY, PAGE_URL).tokens
+        ] == ['token-3', 'token-4']
+
+        await resolver.close()
+        await asyncio.sleep(0.05)
+        assert captcha_service.solves == 4
+
+    async def test_solve_error_is_raised_to_the_waiting_login(self):
+        resolver = PrefetchCaptchaResolverService(
+            FakeCaptchaService(error=CaptchaResolverException('error')),
+            depth=0
+        )
+
+        with pytest.raises(CaptchaResolverException):
+            await resolver.resolve(SITE_KEY, PAGE_URL)
@@ -0,0 +1,82 @@
+import csv
+import io
+
+import pytest
+
+from bolsa.cli import (
+    create_parser,
+    export,
+    guess_format,
+    main,
+    read_credentials
+)
+from bolsa.sinks import CSVSink
+from bolsa.testing import pages
+from bolsa.testing.fake_cei import FakeCEIServer
+
+
+class TestReadCredentials:
+
+    def test_skips_blank_and_comment_lines(self):
+        credentials_file = io.StringIO(
+            '# usuario,senha\n'
+            'user-1,password-1\n'
+            '\n'
+            'user-2 ,"pass,word"\n'
+        )
+
+        assert list(read_credentials(credentials_file)) == [
+            ('user-1', 'password-1'),
+            ('user-2', 'pass,word'),
+        ]
+
+    def test_rejects_lines_without_password(self):
+        with pytest.raises(ValueError):
+            list(read_credentials(io.StringIO('user-1\n')))
+
+
+class TestGuessFormat:
+
+    def test_uses_the_output_extension(self):
+        assert guess_format('extract.CSV') == 'csv'
+        assert guess_format('/tmp/extract.jsonl') == 'jsonl'
+        assert guess_format('extract.parquet') == 'parquet'
+        assert guess_format('extract.txt') is None
+
+    def test_unknown_extension_without_format_exits(self, tmp_path):
+        with pytest.raises(SystemExit):
+            main(['credentials.csv', str(tmp_path / 'extract.txt')])
+
+
+class TestExport:
+
+    async def test_streams_every_user_account(self, tmp_path):
+        server = FakeCEIServer(rows=5)
+        base_url = await server.start()
+        credentials_path = tmp_path / 'credentials.csv'
+        credentials_path.write_text(
+            ''.join(f'user-{index},password\n' for index in range(3)) +
+            ',password\n'
+        )
+        output_path = tmp_path / 'extract.csv'
+        args = create_parser().parse_args([
+            str(credentials_path),
+            str(output_path),
+            '--base-url', base_url,
+            '--max-active-users', '2',
+            '--max-queue-size', '1',
+        ])
+
+        try:
+            with CSVSink(output_path, buffer_size=7) as sink:
+                failed_usernames = await export(args, sink)
+        finally:
+            await server.close()
+
+        with open(output_path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert failed_usernames == ['']
+        assert len(rows) == 3 * len(pages.BROKERS) * len(pages.ACCOUNTS) * 5
+        assert {row['username'] for row in rows} == {
+            'user-0', 'user-1', 'user-2'
+        }
@@ -0,0 +1,61 @@
+import pickle
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from bolsa.columnar import AssetExtractBatch, AssetExtractBatchBuilder
+from bolsa.models import BrokerAssetExtract
+
+RESPONSE_FIELDS = [
+    ('05/06/2020', 'C', 'Merc. Fracionário', 'AZUL4F',
+     'AZUL        PN      N2', '2', '21,09', '42,18', '1'),
+    ('08/06/2020', 'V', 'Mercado a Vista', 'PETR4',
+     'PETROBRAS   PN', '100', '1.485,12', '148.512,00', '1'),
+    ('08/06/2020', 'C', 'Merc. Fracionário', 'AZUL4F',
+     'AZUL        PN      N2', '3', '20,00', '60,00', '1'),
+]
+
+
+@pytest.fixture
+def batch():
+    builder = AssetExtractBatchBuilder()
+    for fields in RESPONSE_FIELDS:
+        builder.append_response_fields(*fields)
+
+    return builder.build()
+
+
+class TestAssetExtractBatch:
+
+    async def test_rows_match_broker_asset_extract(self, batch):
+        expected = [
+            BrokerAssetExtract.create_from_response_fields(*fields)
+            for fields in RESPONSE_FIELDS
+        ]
+
+        assert len(batch) == 3
+        assert batch.to_assets_extract() == expected
+        assert batch[1].unit_price == Decimal('1485.12')
+        assert batch[1].operation_date == date(2020, 6, 8)
+
+    async def test_text_columns_are_dictionary_encoded(self, batch):
+        assert batch.negotiation_codes == ['AZUL4F', 'PETR4']
+        assert list(batch.column('raw_negotiation_code')) == [0, 1, 0]
+
+    async def test_slice_shares_buffers(self, batch):
+        sliced = batch[1:]
+
+        assert len(sliced) == 2
+        assert sliced[0] == batch[1]
+        assert sliced.column('unit_price').obj is (
+            batch.column('unit_price').obj
+        )
+
+    async def test_pickle_roundtrip(self, batch):
+        assert pickle.loads(pickle.dumps(batch[1:])) == batch[1:]
+
+    async def test_from_assets_extract(self, batch):
+        rebuilt = AssetExtractBatch.from_assets_extract(list(batch))
+
+        assert rebuilt == batch
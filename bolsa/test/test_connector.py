@@ -0,0 +1,57 @@
+from bolsa.backend import B3AsyncBackend
+from bolsa.connector import B3HttpClientConnector
+
+
+def create_backend(connector_manager):
+    return B3AsyncBackend(
+        username='username',
+        password='password',
+        captcha_service=None,
+        connector_manager=connector_manager
+    )
+
+
+class TestB3HttpClientConnector:
+
+    async def test_create_returns_the_shared_instance(self):
+        assert B3HttpClientConnector.create() is B3HttpClientConnector.create()
+
+    async def test_connector_is_created_lazily_with_the_settings(self):
+        connector_manager = B3HttpClientConnector(
+            limit=10, limit_per_host=5, keepalive_timeout=30
+        )
+        backend = create_backend(connector_manager)
+
+        assert connector_manager._connector is None
+
+        connector = backend._connector
+        assert connector.limit == 10
+        assert connector.limit_per_host == 5
+
+        await backend.connection_close()
+
+    async def test_connector_is_closed_by_its_last_user(self):
+        connector_manager = B3HttpClientConnector()
+        first_backend = create_backend(connector_manager)
+        second_backend = create_backend(connector_manager)
+        connector = first_backend._connector
+
+        assert second_backend._connector is connector
+
+        await first_backend.connection_close()
+        await first_backend.connection_close()
+        assert not connector.closed
+
+        await second_backend.connection_close()
+        assert connector.closed
+
+    async def test_closed_connector_is_recreated(self):
+        connector_manager = B3HttpClientConnector()
+        connector = connector_manager.acquire()
+        await connector_manager.release(connector)
+
+        new_connector = connector_manager.acquire()
+
+        assert new_connector is not connector
+        assert not new_connector.closed
+        await connector_manager.close()
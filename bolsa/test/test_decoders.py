@@ -0,0 +1,106 @@
+from dataclasses import FrozenInstanceError
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from bolsa.columnar import AssetExtractBatch
+from bolsa.constants import (
+    BrokerAssetExtractAction,
+    BrokerAssetExtractMarketType
+)
+from bolsa.decoders import CentsRowDecoder, CompactRowDecoder, RowDecoder
+from bolsa.models import BrokerAssetExtract, CentsBrokerAssetExtract
+from bolsa.portfolio import calculate_positions
+from bolsa.store import SQLiteTradeStore
+
+ROW = [
+    '05/06/2020', 'C', 'Merc. Fracionário', '', 'AZUL4F',
+    'AZUL        PN      N2', '2', '1.021,09', '2.042,18', '1'
+]
+
+
+class TestRowDecoder:
+
+    async def test_decode_rows_matches_create_from_response_fields(self):
+        asset_extract, = RowDecoder().decode_rows([ROW])
+
+        assert asset_extract == BrokerAssetExtract.create_from_response_fields(
+            *ROW[:3], *ROW[4:]
+        )
+
+    async def test_cents_decoder(self):
+        asset_extract, = CentsRowDecoder().decode_rows([ROW])
+
+        assert isinstance(asset_extract, CentsBrokerAssetExtract)
+        assert not hasattr(asset_extract, '__dict__')
+        assert asset_extract.operation_date == date(2020, 6, 5)
+        assert asset_extract.unit_price == 102109
+        assert asset_extract.total_price == 204218
+
+    async def test_cents_rows_in_the_columnar_builder(self):
+        batch = AssetExtractBatch.from_assets_extract(
+            CentsRowDecoder().decode_rows([ROW])
+        )
+
+        assert list(batch) == RowDecoder().decode_rows([ROW])
+
+    async def test_cents_rows_in_the_portfolio_engine(self):
+        position, = calculate_positions(CentsRowDecoder().decode_rows([ROW]))
+
+        assert position.average_price == Decimal('1021.0900')
+        assert position.total_cost == Decimal('2042.18')
+
+    async def test_cents_rows_in_the_store(self):
+        trade_store = SQLiteTradeStore()
+
+        trade_store.add_assets_extract(
+            'username', '386', '12345', CentsRowDecoder().decode_rows([ROW])
+        )
+
+        assert trade_store.query() == RowDecoder().decode_rows([ROW])
+
+
+class TestCompactRowDecoder:
+
+    async def test_decode_into_slotted_models(self):
+        first, second = CompactRowDecoder().decode_rows([list(ROW), list(ROW)])
+
+        assert not hasattr(first, '__dict__')
+        assert first.action is BrokerAssetExtractAction.BUY
+        assert first.market_type is BrokerAssetExtractMarketType.FRACTIONAL
+        assert first.raw_negotiation_code is second.raw_negotiation_code
+        assert first.unit_price == Decimal('1021.09')
+
+    async def test_frozen_models(self):
+        asset_extract, = CompactRowDecoder(frozen=True).decode_rows([ROW])
+
+        with pytest.raises(FrozenInstanceError):
+            asset_extract.unit_amount = 3
+
+        assert hash(asset_extract)
+
+    async def test_compact_rows_in_the_columnar_builder(self):
+        rows = [ROW, ROW]
+
+        batch = AssetExtractBatch.from_assets_extract(
+            CompactRowDecoder().decode_rows(rows)
+        )
+
+        assert list(batch) == RowDecoder().decode_rows(rows)
+
+    async def test_compact_rows_in_the_portfolio_engine(self):
+        rows = [ROW, ROW]
+
+        assert calculate_positions(
+            CompactRowDecoder(frozen=True).decode_rows(rows)
+        ) == calculate_positions(RowDecoder().decode_rows(rows))
+
+    async def test_compact_rows_in_the_store(self):
+        trade_store = SQLiteTradeStore()
+
+        trade_store.add_assets_extract(
+            'username', '386', '12345', CompactRowDecoder().decode_rows([ROW])
+        )
+
+        assert trade_store.query() == RowDecoder().decode_rows([ROW])
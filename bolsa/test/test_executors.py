@@ -0,0 +1,45 @@
+import pytest
+
+from bolsa.executors import ParseExecutor
+from bolsa.responses import GetBrokersResponse
+
+BROKERS_PAGE = b'''
+<select id="ctl00_ContentPlaceHolder1_ddlAgentes">
+    <option value="-1">Selecione</option>
+    <option value="386">386 - RICO INVESTIMENTOS</option>
+</select>
+<input id="ctl00_ContentPlaceHolder1_txtDataDeBolsa" value="15/03/2019" />
+<input id="ctl00_ContentPlaceHolder1_txtDataAteBolsa" value="04/09/2020" />
+'''
+
+
+class FakeResponse:
+
+    async def read(self):
+        return BROKERS_PAGE
+
+    def get_encoding(self):
+        return 'utf-8'
+
+
+class TestParseExecutor:
+
+    @pytest.mark.parametrize('mode', ParseExecutor.MODES)
+    async def test_parse_response(self, mode):
+        parse_executor = ParseExecutor(mode=mode, max_workers=1)
+        parse_executor.start()
+
+        try:
+            brokers = await GetBrokersResponse(
+                FakeResponse(),
+                parse_executor=parse_executor
+            ).data()
+        finally:
+            parse_executor.shutdown()
+
+        assert [broker.value for broker in brokers] == ['386']
+        assert brokers[0].parse_extra_data.end_date == '04/09/2020'
+
+    async def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            ParseExecutor(mode='gpu')
@@ -0,0 +1,127 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from bolsa.captcha.CaptchaResolverServiceInterface import (
+    CaptchaResolverServiceInterface
+)
+from bolsa.exceptions import LoginException
+from bolsa.instrumentation import InMemoryExporter, Instrumentation
+from bolsa.resilience import RetryPolicy
+from bolsa.testing import pages
+
+
+class SlowCaptchaService(CaptchaResolverServiceInterface):
+
+    async def resolve(self, site_key, url):
+        await asyncio.sleep(0.05)
+        return 'token'
+
+
+class TestFakeCEIServer:
+
+    async def test_whole_flow(self, fake_cei, create_backend):
+        backend = create_backend()
+
+        brokers = await backend.get_brokers_with_accounts()
+        results = await backend.get_brokers_accounts_portfolio_assets_extract(
+            brokers
+        )
+
+        assert [broker.value for broker in brokers] == [
+            value for value, _ in pages.BROKERS
+        ]
+        assert len(results) == len(pages.BROKERS) * len(pages.ACCOUNTS)
+        assert all(len(assets) == 20 for _, _, assets in results)
+        assert set(fake_cei.statuses) == {200}
+
+    async def test_expired_session_does_relogin(
+        self, fake_cei, create_backend
+    ):
+        backend = create_backend()
+        brokers = await backend.get_brokers_with_accounts()
+
+        fake_cei.expire_sessions()
+        results = await backend.get_brokers_accounts_portfolio_assets_extract(
+            brokers
+        )
+
+        assert all(len(assets) == 20 for _, _, assets in results)
+        assert len(fake_cei._sessions) == 1
+
+    async def test_concurrent_expired_requests_drop_the_session_once(
+        self, fake_cei, create_backend
+    ):
+        exporter = InMemoryExporter()
+        backend = create_backend(
+            captcha_service=SlowCaptchaService(),
+            instrumentation=Instrumentation([exporter])
+        )
+        brokers = await backend.get_brokers_with_accounts()
+        cookie_jar = backend._session.cookie_jar
+        clear = cookie_jar.clear
+        clears = []
+
+        def counting_clear(predicate=None):
+            # aiohttp expires cookies with a predicate, only count full
+            # clears.
+            if predicate is None:
+                clears.append(predicate)
+            clear(predicate)
+
+        cookie_jar.clear = counting_clear
+
+        fake_cei.expire_sessions()
+        results = await backend.get_brokers_accounts_portfolio_assets_extract(
+            brokers
+        )
+
+        assert len(results) == len(pages.BROKERS) * len(pages.ACCOUNTS)
+        assert len(clears) == 1
+        assert exporter.get_counter('bolsa_session_expired_total') == 1
+        assert len(exporter.get_samples('bolsa_login_seconds')) == 2
+
+    async def test_server_errors_are_retried(self, fake_cei, create_backend):
+        backend = create_backend(
+            retry_policy=RetryPolicy(max_attempts=10, backoff_base=0)
+        )
+        await backend.get_brokers_with_accounts()
+        fake_cei.error_rate = 0.5
+
+        brokers = await backend.get_brokers_with_accounts()
+
+        assert len(brokers) == len(pages.BROKERS)
+        assert fake_cei.statuses[503]
+
+    async def test_persistent_throttling_fails_the_login(
+        self, fake_cei, create_backend
+    ):
+        backend = create_backend(
+            retry_policy=RetryPolicy(max_attempts=3, backoff_base=0)
+        )
+        fake_cei.max_concurrency = 0
+        fake_cei.retry_after = 0
+
+        with pytest.raises(LoginException, match='status: 429'):
+            await backend.get_brokers()
+
+        assert fake_cei.statuses == {429: 3}
+
+    async def test_stale_form_state_is_rejected(self, fake_cei):
+        form_state = {
+            '__VIEWSTATE': pages.VIEW_STATE,
+            '__VIEWSTATEGENERATOR': pages.VIEW_STATE_GENERATOR,
+            '__EVENTVALIDATION': pages.EVENT_VALIDATION,
+        }
+        async with aiohttp.ClientSession() as session:
+            await session.post(
+                f'{fake_cei.base_url}login.aspx',
+                data={**form_state, 'ctl00$ContentPlaceHolder1$txtLogin': 'a'}
+            )
+            response = await session.post(
+                f'{fake_cei.base_url}negociacao-de-ativos.aspx',
+                data={**form_state, '__VIEWSTATE': 'stale'}
+            )
+
+        assert response.status == 500
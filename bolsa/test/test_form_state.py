@@ -0,0 +1,22 @@
+from bolsa.form_state import FormState
+
+
+class TestFormState:
+
+    async def test_keeps_only_the_latest_hidden_fields(self):
+        form_state = FormState({'__VIEWSTATE': 'first', 'other': 'value'})
+
+        assert not form_state.is_complete()
+
+        form_state.update({
+            '__VIEWSTATE': 'second',
+            '__VIEWSTATEGENERATOR': 'B345DEBA',
+            '__EVENTVALIDATION': 'event-validation',
+        })
+
+        assert form_state.is_complete()
+        assert form_state.fields == {
+            '__VIEWSTATE': 'second',
+            '__VIEWSTATEGENERATOR': 'B345DEBA',
+            '__EVENTVALIDATION': 'event-validation',
+        }
@@ -0,0 +1,277 @@
+import asyncio
+import gc
+
+import pytest
+from aiohttp import CookieJar
+from yarl import URL
+
+from bolsa.exceptions import SessionExpiredException
+from bolsa.http_client import B3HttpClient
+from bolsa.models import Broker, BrokerParseExtraData
+from bolsa.resilience import AdaptiveConcurrencyLimiter, RetryPolicy
+from bolsa.session_store import SessionStoreInterface
+
+ASSETS_URL = URL(B3HttpClient.ASSETS_URL)
+LOGIN_URL = URL(B3HttpClient.LOGIN_URL)
+
+
+class FakeResponse:
+
+    def __init__(self, url, body=b'', status=200, headers=None):
+        self.url = url
+        self._body = body
+        self.status = status
+        self.headers = headers or {}
+
+    async def read(self):
+        return self._body
+
+    def get_encoding(self):
+        return 'utf-8'
+
+
+class FakeSession:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = 0
+        self.calls = []
+        self.cookie_jar = CookieJar()
+
+    async def request(self, method, url, **kwargs):
+        self.requests += 1
+        self.calls.append((method, kwargs))
+        await asyncio.sleep(0)
+        return self.responses.pop(0)
+
+
+class CountingLoginHttpClient(B3HttpClient):
+    logins = 0
+
+    async def login(self):
+        await asyncio.sleep(0.01)
+        self.logins += 1
+        self.IS_LOGGED = True
+
+
+class MemorySessionStore(SessionStoreInterface):
+
+    def __init__(self, sessions=None):
+        self.sessions = sessions or {}
+
+    async def load(self, username):
+        return self.sessions.get(username)
+
+    async def save(self, username, cookies):
+        self.sessions[username] = cookies
+
+    async def delete(self, username):
+        self.sessions.pop(username, None)
+
+
+def create_client(responses, session_store=None):
+    return CountingLoginHttpClient(
+        username='username',
+        password='password',
+        session=FakeSession(responses),
+        captcha_service=None,
+        session_store=session_store
+    )
+
+
+class TestB3HttpClientLogin:
+
+    async def test_concurrent_requests_share_a_single_login(self):
+        client = create_client([FakeResponse(ASSETS_URL)] * 5)
+
+        await asyncio.gather(*[
+            client._request('GET', B3HttpClient.ASSETS_URL)
+            for _ in range(5)
+        ])
+
+        assert client.logins == 1
+        assert client.session.requests == 5
+
+    async def test_redirect_to_login_page_does_relogin_and_replay(self):
+        expected_response = FakeResponse(ASSETS_URL, b'<table></table>')
+        client = create_client([FakeResponse(LOGIN_URL), expected_response])
+
+        response = await client._request('GET', B3HttpClient.ASSETS_URL)
+
+        assert response is expected_response
+        assert client.logins == 2
+
+    async def test_async_postback_redirect_to_login_is_detected(self):
+        expired_response = FakeResponse(
+            ASSETS_URL,
+            b'1|#||4|28|pageRedirect||%2fCEI_Responsivo%2fLogin.aspx|'
+        )
+        client = create_client([expired_response, FakeResponse(ASSETS_URL)])
+
+        await client._request('POST', B3HttpClient.ASSETS_URL)
+
+        assert client.logins == 2
+
+    async def test_concurrent_expired_requests_share_a_single_relogin(self):
+        client = create_client(
+            [FakeResponse(LOGIN_URL)] * 3 + [FakeResponse(ASSETS_URL)] * 3
+        )
+
+        await asyncio.gather(*[
+            client._request('GET', B3HttpClient.ASSETS_URL)
+            for _ in range(3)
+        ])
+
+        assert client.logins == 2
+
+    async def test_still_expired_after_relogin_raises(self):
+        client = create_client([FakeResponse(LOGIN_URL)] * 2)
+
+        with pytest.raises(SessionExpiredException):
+            await client._request('GET', B3HttpClient.ASSETS_URL)
+
+
+class TestB3HttpClientSessionStore:
+
+    async def test_saved_session_skips_login(self):
+        session_store = MemorySessionStore(
+            {'username': ['ASP.NET_SessionId=abc123; Path=/']}
+        )
+        client = create_client([FakeResponse(ASSETS_URL)], session_store)
+
+        await client._request('GET', B3HttpClient.ASSETS_URL)
+
+        assert client.logins == 0
+
+    async def test_expired_saved_session_is_replaced(self):
+        session_store = MemorySessionStore(
+            {'username': ['ASP.NET_SessionId=old; Path=/']}
+        )
+        client = create_client(
+            [FakeResponse(LOGIN_URL), FakeResponse(ASSETS_URL)],
+            session_store
+        )
+
+        await client._request('GET', B3HttpClient.ASSETS_URL)
+
+        assert client.logins == 1
+        assert session_store.sessions['username'] == []
+
+
+class TestB3HttpClientRetry:
+
+    async def test_server_errors_are_retried(self):
+        expected_response = FakeResponse(ASSETS_URL)
+        client = create_client([
+            FakeResponse(ASSETS_URL, status=503), expected_response
+        ])
+        client.retry_policy = RetryPolicy(backoff_base=0)
+
+        response = await client._request('GET', B3HttpClient.ASSETS_URL)
+
+        assert response is expected_response
+        assert client.session.requests == 2
+
+    async def test_query_postbacks_are_retried(self):
+        client = create_client([
+            FakeResponse(ASSETS_URL, status=502), FakeResponse(ASSETS_URL)
+        ])
+        client.retry_policy = RetryPolicy(backoff_base=0)
+
+        await client._request(
+            'POST', B3HttpClient.ASSETS_URL, idempotent=True
+        )
+
+        assert client.session.requests == 2
+
+    async def test_non_idempotent_post_is_not_retried(self):
+        failed_response = FakeResponse(ASSETS_URL, status=503)
+        client = create_client([failed_response, FakeResponse(ASSETS_URL)])
+        client.retry_policy = RetryPolicy(backoff_base=0)
+
+        response = await client._request('POST', B3HttpClient.ASSETS_URL)
+
+        assert response is failed_response
+        assert client.session.requests == 1
+
+    async def test_overloaded_host_decreases_concurrency_limit(self):
+        client = create_client([
+            FakeResponse(ASSETS_URL, status=429), FakeResponse(ASSETS_URL)
+        ])
+        client.retry_policy = RetryPolicy(backoff_base=0)
+        client.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=8
+        )
+
+        await client._request('GET', B3HttpClient.ASSETS_URL)
+
+        assert client.concurrency_limiter.current_limit(ASSETS_URL.host) == 4
+
+    @pytest.mark.filterwarnings('error')
+    async def test_cancel_while_queued_on_the_limiter(self):
+        client = create_client([])
+        client.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=1
+        )
+
+        async with client.concurrency_limiter.acquire(ASSETS_URL.host):
+            task = asyncio.ensure_future(
+                client._send('GET', B3HttpClient.ASSETS_URL, 'assets')
+            )
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        del task
+        gc.collect()
+
+        assert client.session.requests == 0
+
+
+FORM_STATE_PAGE = b'''
+<input type="hidden" id="__VIEWSTATE" value="page-view-state" />
+<input type="hidden" id="__VIEWSTATEGENERATOR" value="B345DEBA" />
+<input type="hidden" id="__EVENTVALIDATION" value="page-event-validation" />
+'''
+
+
+def create_broker():
+    return Broker(
+        value='386',
+        name='386 - RICO INVESTIMENTOS',
+        parse_extra_data=BrokerParseExtraData('15/03/2019', '04/09/2020')
+    )
+
+
+class TestB3HttpClientFormState:
+
+    async def test_accounts_postback_sends_the_session_form_state(self):
+        client = create_client([FakeResponse(ASSETS_URL)])
+        client.form_state.update({
+            '__VIEWSTATE': 'view-state',
+            '__VIEWSTATEGENERATOR': 'B345DEBA',
+            '__EVENTVALIDATION': 'event-validation',
+        })
+
+        await client.get_broker_accounts(create_broker())
+
+        (method, kwargs), = client.session.calls
+        assert method == 'POST'
+        assert kwargs['data']['__VIEWSTATE'] == 'view-state'
+        assert kwargs['data']['__EVENTVALIDATION'] == 'event-validation'
+
+    async def test_missing_form_state_is_loaded_once(self):
+        client = create_client([
+            FakeResponse(ASSETS_URL, FORM_STATE_PAGE),
+            FakeResponse(ASSETS_URL),
+            FakeResponse(ASSETS_URL),
+        ])
+
+        await client.get_broker_accounts(create_broker())
+        await client.get_broker_accounts(create_broker())
+
+        methods = [method for method, _ in client.session.calls]
+        assert methods == ['GET', 'POST', 'POST']
+        assert client.session.calls[1][1]['data']['__VIEWSTATE'] == (
+            'page-view-state'
+        )
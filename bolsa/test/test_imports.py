@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+
+def loaded_modules(statement, modules):
+    """ Run `statement` in a fresh interpreter and list loaded `modules`. """
+    output = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            f'import sys; {statement}; '
+            f'print(",".join(m for m in {modules!r} if m in sys.modules))'
+        ],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout.strip()
+
+    return output.split(',') if output else []
+
+
+class TestLazyImports:
+
+    async def test_import_bolsa_does_not_load_heavy_modules(self):
+        assert loaded_modules(
+            'import bolsa',
+            ('aiohttp', 'bs4', 'bolsa.backend', 'bolsa.pool')
+        ) == []
+
+    async def test_backend_does_not_load_beautifulsoup(self):
+        assert loaded_modules('import bolsa.backend', ('bs4',)) == []
+
+    async def test_lazy_attributes_are_resolved_on_access(self):
+        assert loaded_modules(
+            'import bolsa; bolsa.B3AsyncBackendPool',
+            ('bolsa.backend', 'bolsa.pool')
+        ) == ['bolsa.backend', 'bolsa.pool']
@@ -0,0 +1,147 @@
+import pytest
+
+from bolsa.instrumentation import (
+    InMemoryExporter,
+    Instrumentation,
+    PrometheusExporter
+)
+from bolsa.resilience import RetryPolicy
+from bolsa.testing import pages
+
+ENDPOINTS = {
+    'login_page', 'login', 'brokers', 'broker_accounts', 'assets_extract'
+}
+
+
+class TestInMemoryExporter:
+
+    def test_filters_samples_by_labels(self):
+        exporter = InMemoryExporter()
+        instrumentation = Instrumentation([exporter])
+
+        instrumentation.observe('latency', 1, endpoint='a', status=200)
+        instrumentation.observe('latency', 2, endpoint='a', status=500)
+        instrumentation.observe('latency', 3, endpoint='b', status=200)
+
+        assert exporter.get_samples('latency', endpoint='a') == [1, 2]
+        assert exporter.get_samples('latency', status=200) == [1, 3]
+        assert exporter.get_samples('latency') == [1, 2, 3]
+
+    def test_percentile(self):
+        exporter = InMemoryExporter()
+        instrumentation = Instrumentation([exporter])
+        for value in range(1, 101):
+            instrumentation.observe('latency', value)
+
+        assert exporter.percentile('latency', 50) == 50
+        assert exporter.percentile('latency', 99) == 99
+        assert exporter.percentile('latency', 100) == 100
+        assert exporter.percentile('missing', 50) is None
+
+    def test_sums_counters(self):
+        exporter = InMemoryExporter()
+        instrumentation = Instrumentation([exporter])
+
+        instrumentation.increment('retries', reason=503)
+        instrumentation.increment('retries', 2, reason=429)
+
+        assert exporter.get_counter('retries') == 3
+        assert exporter.get_counter('retries', reason=429) == 2
+
+
+class TestPrometheusExporter:
+
+    def test_renders_histograms_and_counters(self):
+        exporter = PrometheusExporter(buckets=(0.1, 1))
+        instrumentation = Instrumentation([exporter])
+
+        instrumentation.observe('latency_seconds', 0.05, endpoint='login')
+        instrumentation.observe('latency_seconds', 0.5, endpoint='login')
+        instrumentation.increment('retries_total', reason='Timeout"Error')
+
+        assert exporter.render() == (
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{endpoint="login",le="0.1"} 1\n'
+            'latency_seconds_bucket{endpoint="login",le="1"} 2\n'
+            'latency_seconds_bucket{endpoint="login",le="+Inf"} 2\n'
+            'latency_seconds_sum{endpoint="login"} 0.55\n'
+            'latency_seconds_count{endpoint="login"} 2\n'
+            '# TYPE retries_total counter\n'
+            'retries_total{reason="Timeout\\"Error"} 1.0\n'
+        )
+
+    def test_renders_nothing_without_metrics(self):
+        assert PrometheusExporter().render() == '\n'
+
+
+class TestInstrumentation:
+
+    def test_timer_observes_elapsed_time(self):
+        exporter = InMemoryExporter()
+        instrumentation = Instrumentation([exporter])
+
+        with pytest.raises(ValueError):
+            with instrumentation.timer('block_seconds', block='a'):
+                raise ValueError()
+
+        [elapsed] = exporter.get_samples('block_seconds', block='a')
+        assert elapsed >= 0
+
+    async def test_whole_flow_metrics(self, fake_cei, create_backend):
+        exporter = InMemoryExporter()
+        backend = create_backend(instrumentation=Instrumentation([exporter]))
+
+        brokers = await backend.get_brokers_with_accounts()
+        await backend.get_brokers_accounts_portfolio_assets_extract(brokers)
+
+        for endpoint in ENDPOINTS:
+            assert exporter.get_samples(
+                'bolsa_http_response_seconds', endpoint=endpoint, status=200
+            )
+            assert exporter.get_counter(
+                'bolsa_http_received_bytes_total', endpoint=endpoint
+            ) > 0
+        assert exporter.get_counter('bolsa_http_sent_bytes_total') > 0
+        assert len(exporter.get_samples(
+            'bolsa_request_seconds', endpoint='assets_extract'
+        )) == len(pages.BROKERS) * len(pages.ACCOUNTS)
+        assert exporter.get_samples('bolsa_http_connect_seconds')
+        assert len(exporter.get_samples('bolsa_login_seconds')) == 1
+        assert exporter.get_samples(
+            'bolsa_parse_seconds',
+            response='GetBrokerAccountAssetExtractResponse'
+        )
+        assert exporter.get_counter('bolsa_parsed_rows_total') == (
+            20 * len(pages.BROKERS) * len(pages.ACCOUNTS)
+        )
+        assert exporter.get_counter('bolsa_retries_total') == 0
+
+    async def test_retries_are_counted(self, fake_cei, create_backend):
+        exporter = InMemoryExporter()
+        backend = create_backend(
+            instrumentation=Instrumentation([exporter]),
+            retry_policy=RetryPolicy(max_attempts=10, backoff_base=0)
+        )
+        fake_cei.error_rate = 0.3
+
+        await backend.get_brokers_with_accounts()
+
+        assert exporter.get_counter('bolsa_retries_total', reason=503) == (
+            fake_cei.statuses[503]
+        )
+        assert exporter.get_samples(
+            'bolsa_http_response_seconds', status=503
+        )
+
+    async def test_session_expiration_is_counted(
+        self, fake_cei, create_backend
+    ):
+        exporter = InMemoryExporter()
+        backend = create_backend(instrumentation=Instrumentation([exporter]))
+        await backend.get_brokers()
+
+        fake_cei.expire_sessions()
+        await backend.get_brokers()
+
+        assert exporter.get_counter('bolsa_session_expired_total') == 1
+        assert len(exporter.get_samples('bolsa_login_seconds')) == 2
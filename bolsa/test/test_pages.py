@@ -0,0 +1,69 @@
+from bolsa.decoders import DEFAULT_ROW_DECODER
+from bolsa.form_state import FORM_STATE_INPUT_IDS
+from bolsa.http_client import B3HttpClient
+from bolsa.parsers import BeautifulSoupHTMLExtractor, StreamingHTMLExtractor
+from bolsa.responses import (
+    GetBrokerAccountAssetExtractResponse,
+    GetBrokerAccountResponse,
+    GetBrokersResponse
+)
+from bolsa.testing import pages
+
+EXTRACTORS = (StreamingHTMLExtractor(), BeautifulSoupHTMLExtractor())
+
+
+class TestPages:
+
+    async def test_login_page(self):
+        for html_extractor in EXTRACTORS:
+            page = html_extractor.extract(
+                pages.login_page(),
+                input_ids=FORM_STATE_INPUT_IDS,
+                element_ids=(B3HttpClient.CAPTCHA_ELEMENT_ID,)
+            )
+
+            assert page.inputs['__VIEWSTATE'] == pages.VIEW_STATE
+            assert page.elements[B3HttpClient.CAPTCHA_ELEMENT_ID][
+                'data-sitekey'
+            ] == pages.SITE_KEY
+
+    async def test_brokers_page(self):
+        for html_extractor in EXTRACTORS:
+            brokers, form_fields = GetBrokersResponse._parse_get_brokers(
+                pages.brokers_page(), 'utf-8', html_extractor
+            )
+
+            assert [broker.value for broker in brokers] == [
+                value for value, _ in pages.BROKERS
+            ]
+            assert form_fields['__EVENTVALIDATION'] == pages.EVENT_VALIDATION
+
+    async def test_accounts_postback(self):
+        for html_extractor in EXTRACTORS:
+            accounts, form_fields = (
+                GetBrokerAccountResponse._parse_get_accounts(
+                    pages.accounts_postback('3'), 'utf-8', html_extractor
+                )
+            )
+
+            assert [account.id for account in accounts] == list(
+                pages.ACCOUNTS
+            )
+            assert form_fields['__VIEWSTATE'] == f'{pages.VIEW_STATE}3'
+
+    async def test_assets_postback(self):
+        expected_assets_extract = DEFAULT_ROW_DECODER.decode_rows(
+            pages.assets_rows(100)
+        )
+
+        for html_extractor in EXTRACTORS:
+            assets_extract = (
+                GetBrokerAccountAssetExtractResponse._parse_get_assets_extract(
+                    pages.assets_postback(100),
+                    'utf-8',
+                    html_extractor,
+                    DEFAULT_ROW_DECODER
+                )
+            )
+
+            assert assets_extract == expected_assets_extract
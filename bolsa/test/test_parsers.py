@@ -0,0 +1,75 @@
+import pytest
+
+from bolsa.parsers import BeautifulSoupHTMLExtractor, StreamingHTMLExtractor
+
+PAGE = '''
+<html>
+<body>
+<form>
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="abc&amp;123" />
+<div id="ctl00_ContentPlaceHolder1_dvCaptcha" data-sitekey="site-key"></div>
+<select id="ctl00_ContentPlaceHolder1_ddlAgentes">
+    <option value="-1">Selecione</option>
+    <option value="386">386 - RICO INVESTIMENTOS</option>
+    <option value="308">308 - CLEAR CORRETORA</option>
+</select>
+<div id="assets">
+<table>
+<thead><tr><th>Data</th><th>Código</th></tr></thead>
+<tbody>
+<tr><td> 05/06/2020 </td><td><span> AZUL4F </span></td></tr>
+<tr><td>08/06/2020</td><td>PETR4</td></tr>
+</tbody>
+</table>
+</div>
+</form>
+</body>
+</html>
+'''
+
+
+@pytest.fixture(params=[
+    StreamingHTMLExtractor(chunk_size=16),
+    BeautifulSoupHTMLExtractor()
+], ids=['streaming', 'beautifulsoup'])
+def html_extractor(request):
+    return request.param
+
+
+class TestHTMLExtractor:
+
+    async def test_extract_target_elements(self, html_extractor):
+        page = html_extractor.extract(
+            PAGE.encode(),
+            input_ids=('__VIEWSTATE',),
+            select_ids=('ctl00_ContentPlaceHolder1_ddlAgentes',),
+            table_ids=('assets',),
+            element_ids=('ctl00_ContentPlaceHolder1_dvCaptcha',)
+        )
+
+        assert page.inputs == {'__VIEWSTATE': 'abc&123'}
+        assert page.selects == {
+            'ctl00_ContentPlaceHolder1_ddlAgentes': [
+                ('-1', 'Selecione'),
+                ('386', '386 - RICO INVESTIMENTOS'),
+                ('308', '308 - CLEAR CORRETORA'),
+            ]
+        }
+        assert page.tables == {
+            'assets': [['05/06/2020', 'AZUL4F'], ['08/06/2020', 'PETR4']]
+        }
+        assert page.elements[
+            'ctl00_ContentPlaceHolder1_dvCaptcha'
+        ]['data-sitekey'] == 'site-key'
+
+    async def test_missing_elements_are_not_extracted(self, html_extractor):
+        page = html_extractor.extract(
+            PAGE,
+            input_ids=('__EVENTVALIDATION',),
+            select_ids=('ctl00_ContentPlaceHolder1_ddlContas',),
+            table_ids=('missing',)
+        )
+
+        assert page.inputs == {}
+        assert page.selects == {}
+        assert page.tables == {}
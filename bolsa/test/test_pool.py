@@ -0,0 +1,170 @@
+import asyncio
+
+from bolsa.backend import B3AsyncBackend
+from bolsa.connector import B3HttpClientConnector
+from bolsa.pool import B3AsyncBackendPool
+from bolsa.testing import pages
+
+
+class FakeBackend(B3AsyncBackend):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def _fake_request(self):
+        async with self._request_limit():
+            FakeBackend.in_flight += 1
+            FakeBackend.max_in_flight = max(
+                FakeBackend.max_in_flight, FakeBackend.in_flight
+            )
+            await asyncio.sleep(0.01)
+            FakeBackend.in_flight -= 1
+
+    async def get_brokers_with_accounts(self):
+        if self.username == 'broken':
+            raise ValueError('broken user')
+
+        await asyncio.gather(*[self._fake_request() for _ in range(5)])
+        return ['broker']
+
+    async def get_brokers_accounts_portfolio_assets_extract(self, brokers):
+        return [('broker', 'account', ['asset'])]
+
+    async def iter_accounts_portfolio_assets_extract(self, brokers):
+        for account in ('account-1', 'account-2'):
+            yield 'broker', account, ['asset']
+
+    async def session_close(self):
+        pass
+
+
+class TestB3AsyncBackendPool:
+
+    async def test_get_users_assets_extract_respects_concurrency(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        FakeBackend.max_in_flight = 0
+        pool = B3AsyncBackendPool(
+            max_concurrency=4,
+            max_concurrency_per_user=2
+        )
+
+        results = await pool.get_users_assets_extract(
+            [(f'user-{index}', 'password') for index in range(10)]
+        )
+
+        assert FakeBackend.max_in_flight == 4
+        assert [result.username for result in results] == [
+            f'user-{index}' for index in range(10)
+        ]
+        assert all(
+            result.assets_extract == [('broker', 'account', ['asset'])]
+            for result in results
+        )
+
+    async def test_get_users_assets_extract_isolates_user_errors(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        pool = B3AsyncBackendPool()
+
+        ok_result, broken_result = await pool.get_users_assets_extract(
+            [('ok', 'password'), ('broken', 'password')]
+        )
+
+        assert ok_result.error is None
+        assert ok_result.brokers == ['broker']
+        assert isinstance(broken_result.error, ValueError)
+        assert broken_result.assets_extract == []
+
+    async def test_get_users_assets_extract_fetches_every_account(
+        self, fake_cei
+    ):
+        pool = B3AsyncBackendPool(
+            connector_manager=B3HttpClientConnector(),
+            base_url=fake_cei.base_url
+        )
+
+        [result] = await pool.get_users_assets_extract([('user', 'password')])
+        await pool.close()
+
+        assert [
+            (broker.value, account.id)
+            for broker, account, _ in result.assets_extract
+        ] == [
+            (broker_value, account_id)
+            for broker_value, _ in pages.BROKERS
+            for account_id in pages.ACCOUNTS
+        ]
+        assert all(
+            len(assets_extract) == 20
+            for _, _, assets_extract in result.assets_extract
+        )
+
+    def test_pool_can_be_built_outside_the_running_loop(self, monkeypatch):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        pool = B3AsyncBackendPool(
+            max_concurrency=1,
+            connector_manager=B3HttpClientConnector()
+        )
+        credentials = [('user-1', 'password'), ('user-2', 'password')]
+
+        for _ in range(2):
+            results = asyncio.run(pool.get_users_assets_extract(credentials))
+            asyncio.run(pool.close())
+
+            assert [result.error for result in results] == [None, None]
+
+    async def test_pool_holds_the_connector_until_close(self, monkeypatch):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        connector_manager = B3HttpClientConnector()
+        pool = B3AsyncBackendPool(connector_manager=connector_manager)
+
+        await pool.get_users_assets_extract([('user', 'password')])
+        connector = connector_manager._connector
+        assert not connector.closed
+
+        await pool.close()
+        assert connector.closed
+
+    async def test_iter_users_assets_extract_streams_accounts(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        pool = B3AsyncBackendPool(max_active_users=2)
+        credentials = iter(
+            [(f'user-{index}', 'password') for index in range(5)] +
+            [('broken', 'password')]
+        )
+
+        results = [
+            result
+            async for result in pool.iter_users_assets_extract(credentials)
+        ]
+
+        assert sorted(result.username for result in results) == [
+            'broken', 'user-0', 'user-0', 'user-1', 'user-1', 'user-2',
+            'user-2', 'user-3', 'user-3', 'user-4', 'user-4'
+        ]
+        assert all(
+            result.assets_extract == ['asset']
+            for result in results
+            if result.error is None
+        )
+        [broken_result] = [result for result in results if result.error]
+        assert broken_result.username == 'broken'
+        assert isinstance(broken_result.error, ValueError)
+
+    async def test_iter_users_assets_extract_stops_early(self, monkeypatch):
+        monkeypatch.setattr('bolsa.pool.B3AsyncBackend', FakeBackend)
+        pool = B3AsyncBackendPool(max_active_users=2)
+        credentials = iter(
+            [(f'user-{index}', 'password') for index in range(5)]
+        )
+
+        results = pool.iter_users_assets_extract(credentials)
+        await results.__anext__()
+        await results.aclose()
+
+        assert pool._backends == set()
+        assert len(list(credentials)) == 3
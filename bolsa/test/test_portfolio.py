@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+from bolsa.columnar import AssetExtractBatchBuilder
+from bolsa.models import AssetPosition, BrokerAssetExtract
+from bolsa.portfolio import calculate_positions
+
+RESPONSE_FIELDS = [
+    ('05/06/2020', 'C', 'Mercado a Vista', 'AZUL4', 'AZUL PN N2',
+     '100', '20,00', '2.000,00', '1'),
+    ('05/06/2020', 'C', 'Merc. Fracionário', 'AZUL4F', 'AZUL PN N2',
+     '50', '23,00', '1.150,00', '1'),
+    ('10/06/2020', 'V', 'Mercado a Vista', 'AZUL4', 'AZUL PN N2',
+     '30', '25,00', '750,00', '1'),
+    ('10/06/2020', 'V', 'Mercado a Vista', 'PETR4', 'PETROBRAS PN',
+     '10', '30,00', '300,00', '1'),
+    ('10/06/2020', 'C', 'Mercado a Vista', 'PETR4', 'PETROBRAS PN',
+     '10', '28,00', '280,00', '1'),
+    ('11/06/2020', 'C', 'Opção de Compra', 'PETRF300', 'PETR F 30',
+     '100', '0,50', '50,00', '1'),
+]
+
+
+def create_assets_extract():
+    return [
+        BrokerAssetExtract.create_from_response_fields(*fields)
+        for fields in RESPONSE_FIELDS
+    ]
+
+
+class TestCalculatePositions:
+
+    async def test_positions(self):
+        positions = calculate_positions(create_assets_extract())
+
+        assert positions == [
+            AssetPosition(
+                ticker='AZUL4',
+                market_type='unit',
+                quantity=120,
+                average_price=Decimal('21.0000'),
+                total_cost=Decimal('2520.00'),
+                realized_profit=Decimal('120.00')
+            ),
+            AssetPosition(
+                ticker='PETR4',
+                market_type='unit',
+                quantity=0,
+                average_price=Decimal('0.0000'),
+                total_cost=Decimal('0.00'),
+                realized_profit=Decimal('20.00')
+            ),
+            AssetPosition(
+                ticker='PETRF300',
+                market_type='options',
+                quantity=100,
+                average_price=Decimal('0.5000'),
+                total_cost=Decimal('50.00'),
+                realized_profit=Decimal('0.00')
+            ),
+        ]
+
+    async def test_batch_and_list_give_the_same_positions(self):
+        builder = AssetExtractBatchBuilder()
+        for fields in RESPONSE_FIELDS:
+            builder.append_response_fields(*fields)
+
+        assert calculate_positions(builder.build()) == calculate_positions(
+            create_assets_extract()
+        )
+
+    async def test_written_option_bought_back_another_day(self):
+        positions = calculate_positions([
+            BrokerAssetExtract.create_from_response_fields(*fields)
+            for fields in [
+                ('10/06/2020', 'V', 'Opção de Venda', 'PETRR300', 'PETR R 30',
+                 '100', '0,50', '50,00', '1'),
+                ('15/06/2020', 'C', 'Opção de Venda', 'PETRR300', 'PETR R 30',
+                 '100', '0,20', '20,00', '1'),
+            ]
+        ])
+
+        assert positions == [
+            AssetPosition(
+                ticker='PETRR300',
+                market_type='options',
+                quantity=0,
+                average_price=Decimal('0.0000'),
+                total_cost=Decimal('0.00'),
+                realized_profit=Decimal('30.00')
+            ),
+        ]
+
+    async def test_short_position_partially_covered(self):
+        positions = calculate_positions([
+            BrokerAssetExtract.create_from_response_fields(*fields)
+            for fields in [
+                ('10/06/2020', 'V', 'Mercado a Vista', 'AZUL4', 'AZUL PN N2',
+                 '100', '20,00', '2.000,00', '1'),
+                ('15/06/2020', 'C', 'Mercado a Vista', 'AZUL4', 'AZUL PN N2',
+                 '150', '18,00', '2.700,00', '1'),
+            ]
+        ])
+
+        assert positions == [
+            AssetPosition(
+                ticker='AZUL4',
+                market_type='unit',
+                quantity=50,
+                average_price=Decimal('18.0000'),
+                total_cost=Decimal('900.00'),
+                realized_profit=Decimal('200.00')
+            ),
+        ]
+
+    async def test_open_short_position(self):
+        position, = calculate_positions([
+            BrokerAssetExtract.create_from_response_fields(
+                '10/06/2020', 'V', 'Opção de Compra', 'PETRF300', 'PETR F 30',
+                '200', '0,50', '100,00', '1'
+            ),
+        ])
+
+        assert position.quantity == -200
+        assert position.average_price == Decimal('0.5000')
+        assert position.total_cost == Decimal('-100.00')
+        assert position.realized_profit == Decimal('0.00')
+
+    async def test_empty(self):
+        assert calculate_positions([]) == []
@@ -0,0 +1,146 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from bolsa.resilience import AdaptiveConcurrencyLimiter, RetryPolicy
+
+HOST = 'ceiapp.b3.com.br'
+
+
+class FakeResponse:
+
+    def __init__(self, status=200, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+
+def create_request_function(results):
+    results = list(results)
+
+    async def request_function():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    return request_function
+
+
+class TestRetryPolicy:
+
+    async def test_backoff_is_jittered_and_capped(self):
+        retry_policy = RetryPolicy(backoff_base=1, backoff_max=5)
+
+        assert all(
+            0 <= retry_policy.backoff(attempt) <= min(5, 2 ** (attempt - 1))
+            for attempt in range(1, 10)
+        )
+
+    async def test_backoff_honors_retry_after(self):
+        retry_policy = RetryPolicy(backoff_max=5)
+
+        assert retry_policy.backoff(
+            1, FakeResponse(503, {'Retry-After': '2'})
+        ) == 2
+
+    async def test_only_idempotent_methods_are_retryable_by_default(self):
+        retry_policy = RetryPolicy()
+
+        assert retry_policy.is_idempotent('GET')
+        assert not retry_policy.is_idempotent('POST')
+        assert retry_policy.is_idempotent('POST', idempotent=True)
+
+    async def test_errors_are_retried_until_attempts_run_out(self):
+        retry_policy = RetryPolicy(max_attempts=3, backoff_base=0)
+        request_function = create_request_function(
+            [
+                asyncio.TimeoutError(),
+                asyncio.TimeoutError(),
+                aiohttp.ClientConnectionError(),
+                FakeResponse()
+            ]
+        )
+
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await retry_policy.call(request_function)
+
+    async def test_retryable_status_is_retried(self):
+        retry_policy = RetryPolicy(backoff_base=0)
+        expected_response = FakeResponse()
+        request_function = create_request_function(
+            [asyncio.TimeoutError(), FakeResponse(500), expected_response]
+        )
+
+        assert await retry_policy.call(request_function) is expected_response
+
+    async def test_not_retryable_call_raises_the_first_error(self):
+        retry_policy = RetryPolicy(backoff_base=0)
+        request_function = create_request_function(
+            [asyncio.TimeoutError(), FakeResponse()]
+        )
+
+        with pytest.raises(asyncio.TimeoutError):
+            await retry_policy.call(request_function, retryable=False)
+
+
+class TestAdaptiveConcurrencyLimiter:
+
+    async def test_limit_caps_concurrent_requests(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        in_flight = []
+
+        async def request():
+            async with limiter.acquire(HOST):
+                in_flight.append(1)
+                assert len(in_flight) <= 2
+                await asyncio.sleep(0.01)
+                in_flight.pop()
+
+        await asyncio.gather(*[request() for _ in range(6)])
+
+    async def test_successes_increase_limit_additively(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+        for _ in range(4):
+            async with limiter.acquire(HOST):
+                pass
+
+        assert limiter.current_limit(HOST) == 3
+
+    async def test_errors_decrease_limit_multiplicatively(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with limiter.acquire(HOST):
+                raise asyncio.TimeoutError()
+
+        async with limiter.acquire(HOST) as permit:
+            permit.drop()
+
+        assert limiter.current_limit(HOST) == 2
+
+    async def test_concurrent_errors_decrease_limit_once(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1)
+
+        async def overloaded_request():
+            async with limiter.acquire(HOST) as permit:
+                await asyncio.sleep(0.01)
+                permit.drop()
+
+        await asyncio.gather(*[overloaded_request() for _ in range(8)])
+
+        assert limiter.current_limit(HOST) == 4
+
+    async def test_latency_spike_decreases_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=8, latency_tolerance=2
+        )
+
+        async with limiter.acquire(HOST):
+            await asyncio.sleep(0.01)
+        async with limiter.acquire(HOST):
+            await asyncio.sleep(0.05)
+
+        assert limiter.current_limit(HOST) == 4
@@ -0,0 +1,156 @@
+from datetime import date
+from decimal import Decimal
+
+from bolsa.form_state import FormState
+from bolsa.models import Broker, BrokerParseExtraData
+from bolsa.responses import (
+    GetBrokerAccountAssetExtractResponse,
+    GetBrokerAccountResponse,
+    GetBrokersResponse
+)
+
+ASSETS_TABLE_ID = GetBrokerAccountAssetExtractResponse.ASSETS_TABLE_ID
+
+BROKERS_PAGE = '''
+<select id="ctl00_ContentPlaceHolder1_ddlAgentes">
+    <option value="-1">Selecione</option>
+    <option value="386">386 - RICO INVESTIMENTOS</option>
+</select>
+<input id="ctl00_ContentPlaceHolder1_txtDataDeBolsa" value="15/03/2019" />
+<input id="ctl00_ContentPlaceHolder1_txtDataAteBolsa" value="04/09/2020" />
+'''
+
+FORM_STATE_INPUTS = '''
+<input type="hidden" id="__VIEWSTATE" value="page-view-state" />
+<input type="hidden" id="__VIEWSTATEGENERATOR" value="B345DEBA" />
+<input type="hidden" id="__EVENTVALIDATION" value="page-event-validation" />
+'''
+
+ACCOUNTS_PANEL = '''
+<select id="ctl00_ContentPlaceHolder1_ddlContas">
+    <option value="12345">12345</option>
+    <option value="67890">67890</option>
+</select>
+'''
+
+ASSETS_PANEL = f'''
+<div id="{ASSETS_TABLE_ID}">
+<table><tbody>
+<tr>
+<td>05/06/2020</td><td>C</td><td>Merc. Fracionário</td><td></td>
+<td>AZUL4F</td><td>AZUL        PN      N2</td><td>2</td><td>21,09</td>
+<td>42,18</td><td>1</td>
+</tr>
+</tbody></table>
+</div>
+'''
+
+
+def build_delta(*entries):
+    return ''.join(
+        f'{len(content)}|{entry_type}|{entry_id}|{content}|'
+        for entry_type, entry_id, content in entries
+    ).encode()
+
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+    def get_encoding(self):
+        return 'utf-8'
+
+
+def create_broker():
+    return Broker(
+        value='386',
+        name='386 - RICO INVESTIMENTOS',
+        parse_extra_data=BrokerParseExtraData('15/03/2019', '04/09/2020')
+    )
+
+
+class TestGetBrokersResponse:
+
+    async def test_data(self):
+        response = GetBrokersResponse(FakeResponse(BROKERS_PAGE.encode()))
+
+        assert await response.data() == [create_broker()]
+
+    async def test_data_keeps_page_form_state(self):
+        form_state = FormState()
+        response = GetBrokersResponse(
+            FakeResponse((BROKERS_PAGE + FORM_STATE_INPUTS).encode()),
+            form_state=form_state
+        )
+
+        await response.data()
+
+        assert form_state.fields == {
+            '__VIEWSTATE': 'page-view-state',
+            '__VIEWSTATEGENERATOR': 'B345DEBA',
+            '__EVENTVALIDATION': 'page-event-validation',
+        }
+
+
+class TestGetBrokerAccountResponse:
+
+    async def test_data_from_async_postback(self):
+        body = build_delta(
+            ('updatePanel', 'ctl00_ContentPlaceHolder1_updFiltro',
+             ACCOUNTS_PANEL),
+            ('hiddenField', '__VIEWSTATE', 'view-state'),
+            ('hiddenField', '__VIEWSTATEGENERATOR', 'B345DEBA'),
+            ('hiddenField', '__EVENTVALIDATION', 'event-validation')
+        )
+        form_state = FormState({'__VIEWSTATE': 'page-view-state'})
+        response = GetBrokerAccountResponse(
+            FakeResponse(body),
+            broker=create_broker(),
+            form_state=form_state
+        )
+
+        broker = await response.data()
+
+        assert form_state.fields['__VIEWSTATE'] == 'view-state'
+        assert [account.id for account in broker.accounts] == [
+            '12345', '67890'
+        ]
+        parse_extra_data = broker.accounts[0].parse_extra_data
+        assert parse_extra_data.view_state == 'view-state'
+        assert parse_extra_data.view_state_generator == 'B345DEBA'
+        assert parse_extra_data.event_validation == 'event-validation'
+
+    async def test_data_without_accounts(self):
+        body = build_delta(('updatePanel', 'panel', '<div></div>'))
+        response = GetBrokerAccountResponse(
+            FakeResponse(body),
+            broker=create_broker()
+        )
+
+        broker = await response.data()
+
+        assert broker.accounts == []
+
+
+class TestGetBrokerAccountAssetExtractResponse:
+
+    async def test_data_from_async_postback(self):
+        body = build_delta(
+            ('updatePanel', 'ctl00_ContentPlaceHolder1_updFiltro', '<div/>'),
+            ('updatePanel', 'ctl00_ContentPlaceHolder1_updAtivos',
+             ASSETS_PANEL)
+        )
+        response = GetBrokerAccountAssetExtractResponse(
+            FakeResponse(body),
+            broker_value='386'
+        )
+
+        assets_extract, = await response.data()
+
+        assert assets_extract.operation_date == date(2020, 6, 5)
+        assert assets_extract.raw_negotiation_code == 'AZUL4F'
+        assert assets_extract.total_price == Decimal('42.18')
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from aiohttp import CookieJar
+from yarl import URL
+
+from bolsa.http_client import B3HttpClient
+from bolsa.session_store import (
+    FileSessionStore,
+    SQLiteSessionStore,
+    dump_cookies,
+    load_cookies
+)
+
+COOKIES = ['ASP.NET_SessionId=abc123; Path=/; HttpOnly']
+
+
+@pytest.fixture(params=['file', 'sqlite'])
+def session_store_factory(request, tmp_path):
+    def factory(ttl=1800):
+        if request.param == 'file':
+            return FileSessionStore(str(tmp_path / 'sessions'), ttl=ttl)
+        return SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl=ttl)
+
+    return factory
+
+
+class TestSessionStore:
+
+    async def test_save_and_load_cookies(self, session_store_factory):
+        session_store = session_store_factory()
+
+        await session_store.save('12345678900', COOKIES)
+
+        assert await session_store.load('12345678900') == COOKIES
+        assert await session_store.load('00987654321') is None
+
+    async def test_expired_session_is_not_loaded(self, session_store_factory):
+        session_store = session_store_factory(ttl=-1)
+
+        await session_store.save('12345678900', COOKIES)
+
+        assert await session_store.load('12345678900') is None
+
+    async def test_delete_session(self, session_store_factory):
+        session_store = session_store_factory()
+        await session_store.save('12345678900', COOKIES)
+
+        await session_store.delete('12345678900')
+
+        assert await session_store.load('12345678900') is None
+
+    async def test_concurrent_sessions(self, session_store_factory):
+        session_store = session_store_factory()
+        usernames = [f'user-{index}' for index in range(20)]
+
+        await asyncio.gather(*[
+            session_store.save(username, [f'id={username}'])
+            for username in usernames
+        ])
+        sessions = await asyncio.gather(*[
+            session_store.load(username) for username in usernames
+        ])
+
+        assert sessions == [[f'id={username}'] for username in usernames]
+
+    async def test_io_runs_outside_the_event_loop_thread(
+        self, session_store_factory
+    ):
+        session_store = session_store_factory()
+        threads = []
+        save = session_store._save
+
+        def recording_save(*args):
+            threads.append(threading.get_ident())
+            save(*args)
+
+        session_store._save = recording_save
+
+        await session_store.save('12345678900', COOKIES)
+
+        assert threads and threads != [threading.get_ident()]
+
+    async def test_file_name_does_not_expose_username(self, tmp_path):
+        session_store = FileSessionStore(str(tmp_path))
+
+        await session_store.save('12345678900', COOKIES)
+
+        assert not any('12345678900' in name for name in os.listdir(tmp_path))
+
+
+class TestCookiesSerialization:
+
+    async def test_dump_and_load_cookie_jar(self):
+        url = URL(B3HttpClient.LOGIN_URL)
+        cookie_jar = CookieJar()
+        cookie_jar.update_cookies({'ASP.NET_SessionId': 'abc123'}, url)
+
+        restored_cookie_jar = CookieJar()
+        load_cookies(
+            restored_cookie_jar,
+            dump_cookies(cookie_jar),
+            B3HttpClient.LOGIN_URL
+        )
+
+        cookies = restored_cookie_jar.filter_cookies(url)
+        assert cookies['ASP.NET_SessionId'].value == 'abc123'
@@ -0,0 +1,126 @@
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from bolsa.models import (
+    Broker,
+    BrokerAccount,
+    BrokerAssetExtract,
+    BrokerParseExtraData,
+    CentsBrokerAssetExtract,
+    UserAccountAssetsExtractResult
+)
+from bolsa.sinks import FIELDS, CSVSink, JSONLinesSink, ParquetSink
+
+
+def create_result(rows_count=3):
+    asset_extract = BrokerAssetExtract(
+        operation_date=date(2020, 6, 5),
+        action='buy',
+        market_type='unit',
+        raw_negotiation_code='ITSA4',
+        asset_specification='ITAUSA PN N1',
+        unit_amount=100,
+        unit_price=Decimal('10.50'),
+        total_price=Decimal('1050.00'),
+        quotation_factor=1
+    )
+    return UserAccountAssetsExtractResult(
+        username='user',
+        broker=Broker(
+            value='386',
+            name='RICO',
+            parse_extra_data=BrokerParseExtraData('01/01/2020', '01/02/2020')
+        ),
+        account=BrokerAccount(id='123', parse_extra_data=None),
+        assets_extract=[asset_extract] * rows_count
+    )
+
+
+class TestCSVSink:
+
+    def test_writes_header_and_rows(self, tmp_path):
+        path = tmp_path / 'extract.csv'
+
+        with CSVSink(path) as sink:
+            sink.write(create_result())
+
+        with open(path, newline='') as file:
+            rows = list(csv.DictReader(file))
+        assert len(rows) == 3
+        assert tuple(rows[0]) == FIELDS
+        assert rows[0]['username'] == 'user'
+        assert rows[0]['broker_value'] == '386'
+        assert rows[0]['operation_date'] == '2020-06-05'
+        assert rows[0]['unit_price'] == '10.50'
+
+    def test_flushes_when_the_buffer_is_full(self, tmp_path):
+        sink = CSVSink(tmp_path / 'extract.csv', buffer_size=2)
+
+        sink.write(create_result(rows_count=5))
+
+        assert sink.rows_count == 4
+        sink.close()
+        assert sink.rows_count == 5
+
+
+class TestJSONLinesSink:
+
+    def test_writes_a_json_object_per_row(self, tmp_path):
+        path = tmp_path / 'extract.jsonl'
+
+        with JSONLinesSink(path) as sink:
+            sink.write(create_result(rows_count=2))
+            sink.write(create_result(rows_count=0))
+
+        with open(path) as file:
+            rows = [json.loads(line) for line in file]
+        assert len(rows) == 2
+        assert rows[0]['account_id'] == '123'
+        assert rows[0]['total_price'] == '1050.00'
+        assert rows[0]['unit_amount'] == 100
+
+    def test_writes_cents_rows_in_reais(self, tmp_path):
+        path = tmp_path / 'extract.jsonl'
+        result = create_result(rows_count=0)
+        result.assets_extract = [
+            CentsBrokerAssetExtract(
+                operation_date=date(2020, 6, 5),
+                action='buy',
+                market_type='unit',
+                raw_negotiation_code='ITSA4',
+                asset_specification='ITAUSA PN N1',
+                unit_amount=100,
+                unit_price=1050,
+                total_price=105000,
+                quotation_factor=1
+            )
+        ]
+
+        with JSONLinesSink(path) as sink:
+            sink.write(result)
+
+        with open(path) as file:
+            row, = [json.loads(line) for line in file]
+        assert row['unit_price'] == '10.50'
+        assert row['total_price'] == '1050.00'
+
+
+class TestParquetSink:
+
+    def test_writes_a_row_group_per_flush(self, tmp_path):
+        pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+        path = tmp_path / 'extract.parquet'
+
+        with ParquetSink(path, buffer_size=2) as sink:
+            sink.write(create_result(rows_count=3))
+
+        parquet_file = pyarrow_parquet.ParquetFile(path)
+        assert parquet_file.metadata.num_rows == 3
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.read().column('unit_price').to_pylist() == [
+            Decimal('10.50')
+        ] * 3
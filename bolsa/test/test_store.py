@@ -0,0 +1,63 @@
+from datetime import date
+
+from bolsa.store import SQLiteTradeStore
+from bolsa.test.factories import create_asset_extract
+
+
+class TestSQLiteTradeStore:
+
+    async def test_add_assets_extract_is_idempotent(self):
+        trade_store = SQLiteTradeStore(batch_size=2)
+        petr4 = create_asset_extract(date(2020, 6, 5), 'PETR4')
+        assets_extract = [
+            petr4,
+            petr4,
+            create_asset_extract(date(2020, 6, 5), 'VALE3')
+        ]
+
+        inserted = trade_store.add_assets_extract(
+            'username', '386', '12345', assets_extract
+        )
+        inserted_again = trade_store.add_assets_extract(
+            'username', '386', '12345', assets_extract
+        )
+
+        assert inserted == 3
+        assert inserted_again == 0
+        assert trade_store.query(username='username') == assets_extract
+
+    async def test_username_is_not_saved_in_clear(self, tmp_path):
+        path = str(tmp_path / 'trades.db')
+        trade_store = SQLiteTradeStore(path)
+        trade_store.add_assets_extract(
+            '12345678900', '386', '12345', [create_asset_extract()]
+        )
+        trade_store.close()
+
+        with open(path, 'rb') as database_file:
+            assert b'12345678900' not in database_file.read()
+
+    async def test_query_filters(self):
+        trade_store = SQLiteTradeStore()
+        petr4_2019 = create_asset_extract(date(2019, 12, 31), 'PETR4')
+        petr4_2020 = create_asset_extract(date(2020, 6, 5), 'PETR4')
+        trade_store.add_assets_extract(
+            'username', '386', '12345', [petr4_2019, petr4_2020]
+        )
+        trade_store.add_assets_extract(
+            'username', '308', '67890',
+            [create_asset_extract(date(2020, 6, 5), 'VALE3')]
+        )
+        trade_store.add_assets_extract(
+            'other', '308', '67890', [petr4_2020]
+        )
+
+        assert trade_store.query(
+            raw_negotiation_code='PETR4',
+            start_date=date(2020, 1, 1),
+            end_date=date(2020, 12, 31)
+        ) == [petr4_2020, petr4_2020]
+        assert trade_store.query(
+            raw_negotiation_code='PETR4',
+            broker_value='386'
+        ) == [petr4_2019, petr4_2020]
@@ -0,0 +1,128 @@
+from datetime import date
+
+from bolsa.backend import B3AsyncBackend
+from bolsa.models import Watermark
+from bolsa.test.factories import create_asset_extract, create_broker
+from bolsa.watermarks import (
+    FileWatermarkStore,
+    MemoryWatermarkStore,
+    merge_assets_extract,
+    sync_start_date
+)
+
+
+class FakeSyncBackend(B3AsyncBackend):
+
+    def __init__(self):
+        super().__init__(
+            username='username',
+            password='password',
+            captcha_service=None
+        )
+        self.start_dates = []
+
+    async def get_broker_account_portfolio_assets_extract(
+        self,
+        account_id,
+        broker_value,
+        broker_parse_extra_data,
+        account_parse_extra_data,
+        start_date=None
+    ):
+        self.start_dates.append(start_date)
+        return [create_asset_extract(date(2020, 9, 4))]
+
+
+class TestSyncHelpers:
+
+    async def test_sync_start_date(self):
+        assert sync_start_date('15/03/2019', None) == '15/03/2019'
+        assert sync_start_date('15/03/2019', date(2020, 9, 3)) == '03/09/2020'
+        assert sync_start_date('15/03/2019', date(2018, 1, 1)) == '15/03/2019'
+
+    async def test_merge_assets_extract_replaces_fetched_range(self):
+        old_asset_extract = create_asset_extract(date(2020, 9, 2))
+        stale_asset_extract = create_asset_extract(date(2020, 9, 3))
+        new_asset_extract = create_asset_extract(date(2020, 9, 3))
+
+        merged = merge_assets_extract(
+            [old_asset_extract, stale_asset_extract],
+            [new_asset_extract, new_asset_extract],
+            '03/09/2020'
+        )
+
+        assert merged == [
+            old_asset_extract, new_asset_extract, new_asset_extract
+        ]
+
+
+class TestFileWatermarkStore:
+
+    async def test_watermarks_survive_reload(self, tmp_path):
+        path = str(tmp_path / 'watermarks.json')
+        await FileWatermarkStore(path).set(
+            'username', '386', '12345', date(2020, 9, 4)
+        )
+
+        watermark_store = FileWatermarkStore(path)
+
+        assert await watermark_store.get(
+            'username', '386', '12345'
+        ) == date(2020, 9, 4)
+        assert await watermark_store.get('username', '386', '0') is None
+
+    async def test_username_is_not_saved_in_clear(self, tmp_path):
+        path = tmp_path / 'watermarks.json'
+        await FileWatermarkStore(str(path)).commit([
+            Watermark('12345678900', '386', '12345', date(2020, 9, 4)),
+            Watermark('12345678900', '386', '67890', date(2020, 9, 4)),
+        ])
+
+        assert '12345678900' not in path.read_text()
+        assert await FileWatermarkStore(str(path)).get(
+            '12345678900', '386', '67890'
+        ) == date(2020, 9, 4)
+
+
+class TestSyncAccountsPortfolioAssetsExtract:
+
+    async def test_second_sync_only_fetches_new_range(self):
+        backend = FakeSyncBackend()
+        watermark_store = MemoryWatermarkStore()
+
+        (_, _, first_sync, watermark), = (
+            await backend.sync_accounts_portfolio_assets_extract(
+                [create_broker('386', accounts_ids=('12345',))],
+                watermark_store
+            )
+        )
+        await watermark_store.commit([watermark])
+        (_, _, second_sync, _), = (
+            await backend.sync_accounts_portfolio_assets_extract(
+                [create_broker('386', accounts_ids=('12345',))],
+                watermark_store,
+                previous_assets_extract={('386', '12345'): first_sync}
+            )
+        )
+
+        assert backend.start_dates == ['15/03/2019', '04/09/2020']
+        assert second_sync == first_sync
+        assert watermark == Watermark(
+            'username', '386', '12345', date(2020, 9, 4)
+        )
+
+    async def test_watermarks_move_only_when_committed(self):
+        backend = FakeSyncBackend()
+        watermark_store = MemoryWatermarkStore()
+
+        await backend.sync_accounts_portfolio_assets_extract(
+            [create_broker('386', accounts_ids=('12345',))],
+            watermark_store
+        )
+        await backend.sync_accounts_portfolio_assets_extract(
+            [create_broker('386', accounts_ids=('12345',))],
+            watermark_store
+        )
+
+        assert backend.start_dates == ['15/03/2019', '15/03/2019']
+        assert await watermark_store.get('username', '386', '12345') is None
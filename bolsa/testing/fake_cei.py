@@ -0,0 +1,207 @@
+"""
+Local stand-in for the CEI pages used by `B3HttpClient`, to run the whole
+flow offline in tests and load tests.
+
+    server = FakeCEIServer(rows=1000, latency=0.05)
+    base_url = await server.start()
+    backend = B3AsyncBackend(..., base_url=base_url)
+"""
+import asyncio
+import random
+import secrets
+import time
+from collections import Counter
+from functools import lru_cache
+
+from aiohttp import web
+
+from bolsa.testing import pages
+
+BASE_PATH = '/CEI_Responsivo/'
+LOGIN_PATH = f'{BASE_PATH}login.aspx'
+ASSETS_PATH = f'{BASE_PATH}negociacao-de-ativos.aspx'
+SESSION_COOKIE = 'ASP.NET_SessionId'
+LOGIN_REDIRECT = pages.async_postback(
+    [('pageRedirect', '', '%2fCEI_Responsivo%2fLogin.aspx')]
+)
+HOME_REDIRECT = pages.async_postback(
+    [('pageRedirect', '', '%2fCEI_Responsivo%2fhome.aspx')]
+)
+
+
+@lru_cache(maxsize=32)
+def _assets_postback(rows, broker_value):
+    return pages.assets_postback(rows, broker_value)
+
+
+class FakeCEIServer():
+    """
+    Serve the login, brokers, accounts and assets pages with ASP.NET like
+    sessions and form state validation.
+
+    `latency` seconds, or a `(min, max)` range, delay every response.
+    A `error_rate` fraction of the requests fail with 503, requests above
+    `max_concurrency` are throttled with 429, all of them when it is 0,
+    and sessions expire `session_ttl` seconds after login.
+    """
+
+    def __init__(
+        self,
+        rows=100,
+        brokers=pages.BROKERS,
+        accounts=pages.ACCOUNTS,
+        latency=0,
+        error_rate=0,
+        max_concurrency=None,
+        retry_after=1,
+        session_ttl=None,
+        seed=0
+    ):
+        self.rows = rows
+        self.brokers = tuple(brokers)
+        self.accounts = tuple(accounts)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.session_ttl = session_ttl
+        self.statuses = Counter()
+        self.timings = []
+        self._random = random.Random(seed)
+        self._sessions = {}
+        self._in_flight = 0
+        self._runner = None
+        self.base_url = None
+
+    def create_app(self):
+        app = web.Application(middlewares=[self._faults_middleware])
+        app.router.add_get(LOGIN_PATH, self._get_login)
+        app.router.add_post(LOGIN_PATH, self._post_login)
+        app.router.add_get(ASSETS_PATH, self._get_assets_page)
+        app.router.add_post(ASSETS_PATH, self._post_assets_page)
+
+        return app
+
+    async def start(self, host='localhost', port=0):
+        """ Listen on `host` and return the base url for the backends. """
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.base_url = f'http://{host}:{port}{BASE_PATH}'
+
+        return self.base_url
+
+    async def close(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def expire_sessions(self):
+        self._sessions.clear()
+
+    @web.middleware
+    async def _faults_middleware(self, request, handler):
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        try:
+            response = await self._handle_with_faults(request, handler)
+        finally:
+            self._in_flight -= 1
+
+        self.statuses[response.status] += 1
+        self.timings.append(time.perf_counter() - started_at)
+
+        return response
+
+    async def _handle_with_faults(self, request, handler):
+        if (
+            self.max_concurrency is not None and
+            self._in_flight > self.max_concurrency
+        ):
+            return web.Response(
+                status=429, headers={'Retry-After': str(self.retry_after)}
+            )
+
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self._random.uniform(*latency)
+        if latency:
+            await asyncio.sleep(latency)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=503, text='Service Unavailable')
+
+        return await handler(request)
+
+    def _is_logged(self, request):
+        logged_at = self._sessions.get(request.cookies.get(SESSION_COOKIE))
+        if logged_at is None:
+            return False
+
+        if self.session_ttl is not None:
+            return time.monotonic() - logged_at < self.session_ttl
+
+        return True
+
+    @staticmethod
+    def _html(body):
+        return web.Response(body=body, content_type='text/html')
+
+    @staticmethod
+    def _delta(body):
+        return web.Response(body=body, content_type='text/plain')
+
+    def _has_valid_form_state(self, form):
+        broker_values = [''] + [value for value, _ in self.brokers]
+        return (
+            form.get('__VIEWSTATEGENERATOR') == pages.VIEW_STATE_GENERATOR and
+            form.get('__VIEWSTATE') in {
+                f'{pages.VIEW_STATE}{value}' for value in broker_values
+            } and
+            form.get('__EVENTVALIDATION') in {
+                f'{pages.EVENT_VALIDATION}{value}' for value in broker_values
+            }
+        )
+
+    async def _get_login(self, request):
+        return self._html(pages.login_page())
+
+    async def _post_login(self, request):
+        form = await request.post()
+        if not self._has_valid_form_state(form):
+            return web.Response(status=500, text='Invalid viewstate')
+
+        if not form.get('ctl00$ContentPlaceHolder1$txtLogin'):
+            return self._delta(LOGIN_REDIRECT)
+
+        session_id = secrets.token_hex(12)
+        self._sessions[session_id] = time.monotonic()
+        response = self._delta(HOME_REDIRECT)
+        response.set_cookie(SESSION_COOKIE, session_id, path='/')
+
+        return response
+
+    async def _get_assets_page(self, request):
+        if not self._is_logged(request):
+            return web.Response(status=302, headers={'Location': LOGIN_PATH})
+
+        return self._html(pages.brokers_page(self.brokers))
+
+    async def _post_assets_page(self, request):
+        if not self._is_logged(request):
+            return self._delta(LOGIN_REDIRECT)
+
+        form = await request.post()
+        if not self._has_valid_form_state(form):
+            return web.Response(status=500, text='Invalid viewstate')
+
+        broker_value = form.get('ctl00$ContentPlaceHolder1$ddlAgentes')
+        if 'ctl00$ContentPlaceHolder1$btnConsultar' in form:
+            return self._delta(_assets_postback(self.rows, broker_value))
+
+        return self._delta(
+            pages.accounts_postback(broker_value, self.accounts)
+        )
@@ -0,0 +1,254 @@
+"""
+Anonymized CEI pages, rebuilt from recorded responses with fake personal
+data, for tests, benchmarks and the fake CEI server.
+"""
+import random
+from datetime import date, timedelta
+
+SITE_KEY = '6LfAnonymizedSiteKey0000000000000000000000'
+VIEW_STATE = '/wEPDwUKLTI2MTA0ODczNg9kFgJmD2QWAgIDD2QWCAIBDw8WAh4EVGV4dAU' * 8
+VIEW_STATE_GENERATOR = 'B345DEBA'
+EVENT_VALIDATION = '/wEdAA1HJ2+J0WZq5G92xJM7n1xbkdMq+p9EbLSDyFDpFsJg30jW' * 4
+START_DATE = '15/03/2019'
+END_DATE = '04/09/2020'
+
+BROKERS = (
+    ('3', '3 - XP INVESTIMENTOS CCTVM S/A'),
+    ('90', '90 - EASYNVEST - TITULO CV S.A.'),
+    ('308', '308 - CLEAR CORRETORA - GRUPO XP'),
+    ('386', '386 - RICO INVESTIMENTOS - GRUPO XP'),
+)
+ACCOUNTS = ('123456', '654321')
+ASSETS_TABLE_ID = (
+    'ctl00_ContentPlaceHolder1_rptAgenteBolsa_ctl00_rptContaBolsa_ctl00_'
+    'pnAtivosNegociados'
+)
+ASSETS = (
+    ('AZUL4', 'AZUL        PN      N2'),
+    ('BIDI11', 'BANCO INTER UNT        N2'),
+    ('ITSA4', 'ITAUSA      PN      N1'),
+    ('MGLU3', 'MAGAZ LUIZA ON      NM'),
+    ('PETR4', 'PETROBRAS   PN      N2'),
+    ('VALE3', 'VALE        ON      NM'),
+    ('WEGE3', 'WEG         ON      NM'),
+    ('XPML11', 'XP MALLS    CI'),
+)
+
+# Menus, scripts and styles surrounding the forms in the real pages.
+PAGE_HEADER = (
+    '<!DOCTYPE html><html><head><title>CEI - Canal Eletrônico do '
+    'Investidor</title>' +
+    ''.join(
+        f'<link rel="stylesheet" href="/CEI_Responsivo/css/style{index}.css"'
+        f' />'
+        for index in range(10)
+    ) +
+    '<script type="text/javascript">' +
+    'var theForm = document.forms["aspnetForm"];' * 200 +
+    '</script></head><body><nav><ul>' +
+    ''.join(
+        f'<li class="menu-item"><a href="/CEI_Responsivo/pagina-{index}.aspx"'
+        f'>Extratos e Informativos {index}</a></li>'
+        for index in range(60)
+    ) +
+    '</ul></nav>'
+)
+PAGE_FOOTER = (
+    '<footer><p>B3 S.A. - Brasil, Bolsa, Balcão</p></footer>' +
+    '<script src="/CEI_Responsivo/ScriptResource.axd?d=anonymized"></script>'
+    * 20 +
+    '</body></html>'
+)
+
+
+def _hidden_inputs(view_state, event_validation):
+    return (
+        f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" '
+        f'value="{view_state}" />'
+        f'<input type="hidden" name="__VIEWSTATEGENERATOR" '
+        f'id="__VIEWSTATEGENERATOR" value="{VIEW_STATE_GENERATOR}" />'
+        f'<input type="hidden" name="__EVENTVALIDATION" '
+        f'id="__EVENTVALIDATION" value="{event_validation}" />'
+    )
+
+
+def _options(options):
+    return ''.join(
+        f'<option value="{value}">{text}</option>' for value, text in options
+    )
+
+
+def async_postback(entries):
+    """ Build an async postback delta from `(type, id, content)` entries. """
+    return ''.join(
+        f'{len(content)}|{entry_type}|{entry_id}|{content}|'
+        for entry_type, entry_id, content in entries
+    ).encode()
+
+
+def _form_state_entries(view_state, event_validation):
+    return [
+        ('hiddenField', '__EVENTTARGET', ''),
+        ('hiddenField', '__EVENTARGUMENT', ''),
+        ('hiddenField', '__VIEWSTATE', view_state),
+        ('hiddenField', '__VIEWSTATEGENERATOR', VIEW_STATE_GENERATOR),
+        ('hiddenField', '__EVENTVALIDATION', event_validation),
+        ('asyncPostBackControlIDs', '', ''),
+        ('pageTitle', '', 'CEI - Negociação de ativos'),
+    ]
+
+
+def login_page():
+    return (
+        PAGE_HEADER +
+        '<form method="post" action="./login.aspx" id="aspnetForm">' +
+        _hidden_inputs(VIEW_STATE, EVENT_VALIDATION) +
+        '<input name="ctl00$ContentPlaceHolder1$txtLogin" type="text" '
+        'id="ctl00_ContentPlaceHolder1_txtLogin" />'
+        '<input name="ctl00$ContentPlaceHolder1$txtSenha" type="password" '
+        'id="ctl00_ContentPlaceHolder1_txtSenha" />'
+        f'<div id="ctl00_ContentPlaceHolder1_dvCaptcha" class="g-recaptcha" '
+        f'data-sitekey="{SITE_KEY}"></div>'
+        '<input type="submit" name="ctl00$ContentPlaceHolder1$btnLogar" '
+        'value="Entrar" id="ctl00_ContentPlaceHolder1_btnLogar" />'
+        '</form>' +
+        PAGE_FOOTER
+    ).encode()
+
+
+def brokers_page(brokers=BROKERS):
+    return (
+        PAGE_HEADER +
+        '<form method="post" action="./negociacao-de-ativos.aspx" '
+        'id="aspnetForm">' +
+        _hidden_inputs(VIEW_STATE, EVENT_VALIDATION) +
+        '<div id="ctl00_ContentPlaceHolder1_updFiltro">'
+        '<select name="ctl00$ContentPlaceHolder1$ddlAgentes" '
+        'id="ctl00_ContentPlaceHolder1_ddlAgentes">' +
+        _options((('-1', 'Selecione'),) + tuple(brokers)) +
+        '</select>'
+        '<select name="ctl00$ContentPlaceHolder1$ddlContas" '
+        'id="ctl00_ContentPlaceHolder1_ddlContas" disabled="disabled">'
+        '<option value="0">Selecione...</option></select>'
+        '<input name="ctl00$ContentPlaceHolder1$txtDataDeBolsa" '
+        f'id="ctl00_ContentPlaceHolder1_txtDataDeBolsa" value="{START_DATE}"'
+        ' />'
+        '<input name="ctl00$ContentPlaceHolder1$txtDataAteBolsa" '
+        f'id="ctl00_ContentPlaceHolder1_txtDataAteBolsa" value="{END_DATE}"'
+        ' />'
+        '</div></form>' +
+        PAGE_FOOTER
+    ).encode()
+
+
+def _filter_panel(broker_value, accounts):
+    return (
+        '<select name="ctl00$ContentPlaceHolder1$ddlAgentes" '
+        'id="ctl00_ContentPlaceHolder1_ddlAgentes">' +
+        _options(BROKERS).replace(
+            f'value="{broker_value}"',
+            f'selected="selected" value="{broker_value}"'
+        ) +
+        '</select>'
+        '<select name="ctl00$ContentPlaceHolder1$ddlContas" '
+        'id="ctl00_ContentPlaceHolder1_ddlContas">' +
+        _options((account, account) for account in accounts) +
+        '</select>'
+        '<input name="ctl00$ContentPlaceHolder1$txtDataDeBolsa" '
+        f'id="ctl00_ContentPlaceHolder1_txtDataDeBolsa" value="{START_DATE}"'
+        ' />'
+        '<input name="ctl00$ContentPlaceHolder1$txtDataAteBolsa" '
+        f'id="ctl00_ContentPlaceHolder1_txtDataAteBolsa" value="{END_DATE}"'
+        ' />'
+    )
+
+
+def accounts_postback(broker_value='386', accounts=ACCOUNTS):
+    return async_postback(
+        [(
+            'updatePanel',
+            'ctl00_ContentPlaceHolder1_updFiltro',
+            _filter_panel(broker_value, accounts)
+        )] +
+        _form_state_entries(
+            f'{VIEW_STATE}{broker_value}', f'{EVENT_VALIDATION}{broker_value}'
+        )
+    )
+
+
+def assets_rows(rows_count, seed=0):
+    """ Return `rows_count` table rows with the cell texts of CEI. """
+    generator = random.Random(seed)
+    start = date(2019, 3, 15)
+    rows = []
+    for index in range(rows_count):
+        ticker, specification = generator.choice(ASSETS)
+        fractional = generator.random() < 0.3
+        unit_amount = generator.randint(1, 99 if fractional else 1000)
+        unit_price = generator.randint(100, 50000)
+        total_price = unit_amount * unit_price
+        operation_date = start + timedelta(days=index * 540 // rows_count)
+        rows.append([
+            operation_date.strftime('%d/%m/%Y'),
+            generator.choice('CV'),
+            'Merc. Fracionário' if fractional else 'Mercado a Vista',
+            '',
+            f'{ticker}F' if fractional else ticker,
+            specification,
+            str(unit_amount),
+            _format_price(unit_price),
+            _format_price(total_price),
+            '1',
+        ])
+
+    return rows
+
+
+def _format_price(cents):
+    integer = f'{cents // 100:,}'.replace(',', '.')
+    return f'{integer},{cents % 100:02d}'
+
+
+def _assets_table(rows):
+    header = ''.join(
+        f'<th>{title}</th>'
+        for title in (
+            'Data do Negócio', 'Compra/Venda', 'Mercado', 'Prazo',
+            'Código Negociação', 'Especificação do Ativo', 'Quantidade',
+            'Preço (R$)', 'Valor Total (R$)', 'Fator de Cotação'
+        )
+    )
+    body = ''.join(
+        '<tr>' +
+        ''.join(
+            f'<td class="text-center">\n    {cell}\n</td>' for cell in row
+        ) +
+        '</tr>'
+        for row in rows
+    )
+
+    return (
+        f'<div id="{ASSETS_TABLE_ID}">'
+        '<table class="responsive"><thead><tr>' + header + '</tr></thead>'
+        '<tbody>' + body + '</tbody>'
+        '<tfoot><tr><td colspan="10"></td></tr></tfoot></table></div>'
+    )
+
+
+def assets_postback(rows_count=10, broker_value='386', seed=0):
+    rows = assets_rows(rows_count, seed)
+    return async_postback(
+        [
+            (
+                'updatePanel',
+                'ctl00_ContentPlaceHolder1_updFiltro',
+                _filter_panel(broker_value, ACCOUNTS)
+            ),
+            (
+                'updatePanel',
+                'ctl00_ContentPlaceHolder1_updAtivos',
+                _assets_table(rows)
+            ),
+        ] +
+        _form_state_entries(VIEW_STATE, EVENT_VALIDATION)
+    )
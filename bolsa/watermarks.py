@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+from abc import ABCMeta, abstractmethod
+from datetime import date
+
+from bolsa.converters import format_cei_date, parse_cei_date
+from bolsa.session_store import username_key
+
+
+def sync_start_date(window_start_date, watermark):
+    """
+    Return the first date to fetch, as a CEI date string.
+
+    The watermark day itself is fetched again, since CEI may publish more
+    trades of that day after the last sync.
+    """
+    if watermark is None:
+        return window_start_date
+
+    return format_cei_date(max(parse_cei_date(window_start_date), watermark))
+
+
+def merge_assets_extract(previous_assets_extract, assets_extract, start_date):
+    """
+    Replace every previous row from `start_date` onwards by the rows just
+    fetched for that range.
+
+    Rows have no identifier and identical trades in the same day are
+    legit, so deduping works by range instead of by row.
+    """
+    start_date = parse_cei_date(start_date)
+
+    return [
+        asset_extract
+        for asset_extract in previous_assets_extract
+        if asset_extract.operation_date < start_date
+    ] + list(assets_extract)
+
+
+class WatermarkStoreInterface(metaclass=ABCMeta):
+
+    @abstractmethod
+    async def get(self, username, broker_value, account_id):
+        """ Return the last synced date of the account or None. """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, username, broker_value, account_id, synced_date):
+        """ Save the last synced date of the account. """
+        raise NotImplementedError
+
+    async def commit(self, watermarks):
+        """
+        Save every `Watermark` returned by a sync. Call it only after the
+        synced rows are persisted, so a failure never skips rows.
+        """
+        for watermark in watermarks:
+            await self.set(
+                watermark.username,
+                watermark.broker_value,
+                watermark.account_id,
+                watermark.synced_date
+            )
+
+
+class MemoryWatermarkStore(WatermarkStoreInterface):
+
+    def __init__(self):
+        self._watermarks = {}
+
+    async def get(self, username, broker_value, account_id):
+        return self._watermarks.get((username, broker_value, account_id))
+
+    async def set(self, username, broker_value, account_id, synced_date):
+        self._watermarks[(username, broker_value, account_id)] = synced_date
+
+
+class FileWatermarkStore(WatermarkStoreInterface):
+    """
+    Keep every watermark in a single JSON file, keyed by the hashed
+    username.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._watermarks = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as watermarks_file:
+                return json.load(watermarks_file)
+        except FileNotFoundError:
+            return {}
+
+    def _dump(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, 'w') as watermarks_file:
+            json.dump(self._watermarks, watermarks_file)
+
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def _key(username, broker_value, account_id):
+        return f'{username_key(username)}|{broker_value}|{account_id}'
+
+    async def get(self, username, broker_value, account_id):
+        synced_date = self._watermarks.get(
+            self._key(username, broker_value, account_id)
+        )
+        return date.fromisoformat(synced_date) if synced_date else None
+
+    def _update(self, username, broker_value, account_id, synced_date):
+        self._watermarks[
+            self._key(username, broker_value, account_id)
+        ] = synced_date.isoformat()
+
+    async def set(self, username, broker_value, account_id, synced_date):
+        self._update(username, broker_value, account_id, synced_date)
+        self._dump()
+
+    async def commit(self, watermarks):
+        for watermark in watermarks:
+            self._update(
+                watermark.username,
+                watermark.broker_value,
+                watermark.account_id,
+                watermark.synced_date
+            )
+        self._dump()
@@ -31,6 +31,14 @@ setuptools.setup(
     long_description_content_type='text/markdown',
     url='https://github.com/gicornachini/bolsa',
     install_requires=install_requires,
+    extras_require={
+        'parquet': ['pyarrow>=1.0.0'],
+    },
+    entry_points={
+        'console_scripts': [
+            'bolsa=bolsa.cli:main',
+        ],
+    },
     classifiers=[
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python',